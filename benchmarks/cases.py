@@ -0,0 +1,184 @@
+'''Define the models and cases of the benchmark suite.'''
+
+
+import os
+import tempfile
+from etfba import Model, generate_model
+
+
+DIR = os.path.dirname(os.path.abspath(__file__))
+ECOLI_MODEL_FILE = os.path.join(
+    DIR, os.pardir, 'models', 'e_coli', 'etfba_iML1515.bin'
+)
+
+SYNTHETIC_SEED = 0
+
+
+def build_synthetic_model(n_reactions):
+    '''
+    Return a synthetic model generated with a fixed seed along with its
+    optimization settings.
+
+    Parameters
+    ----------
+    n_reactions: int
+        Number of reactions.
+    '''
+
+    model = generate_model(n_reactions, seed=SYNTHETIC_SEED)
+    settings = {
+        'objective': {rxnid: 1 for rxnid, rxn in model.reactions.items()
+                      if rxn.is_biomass_formation},
+        'spec_flux_bound': {rxnid: (0, 10) for rxnid in model.reactions
+                            if rxnid.startswith('EX_S')},
+        'inc_enz_cons': [rxnid for rxnid, rxn in model.reactions.items()
+                         if rxn.forward_kcat is not None],
+        'enz_prot_lb': 0.1
+    }
+
+    return model, settings
+
+
+def load_ecoli_model():
+    '''
+    Return the bundled iML1515 model along with its optimization settings.
+    '''
+
+    model = Model.load(ECOLI_MODEL_FILE)
+    settings = {
+        'objective': {'BIOMASS_Ec_iML1515_core_75p37M': 1},
+        'spec_flux_bound': {'EX_glc__D_e_b': (0, 10)},
+        'inc_enz_cons': [rxnid for rxnid, rxn in model.reactions.items()
+                         if not rxn.is_exch_reaction
+                         and not rxn.is_biomass_formation],
+        'enz_prot_lb': 0.19
+    }
+
+    return model, settings
+
+
+MODELS = {
+    'synthetic_200': lambda: build_synthetic_model(200),
+    'synthetic_1000': lambda: build_synthetic_model(1000),
+    'synthetic_3000': lambda: build_synthetic_model(3000),
+    'iML1515': load_ecoli_model
+}
+SUITES = {
+    'quick': ['synthetic_200', 'synthetic_1000'],
+    'full': ['synthetic_200', 'synthetic_1000', 'synthetic_3000', 'iML1515']
+}
+
+
+def _load(model_file):
+    return Model.load(model_file)
+
+
+def _load_with_matrices(model_file):
+    model = Model.load(model_file)
+    model.total_stoichiometric_matrix
+    model.transformation_matrix
+
+    return model
+
+
+def _get_optimize_args(kind, settings):
+    args = {
+        'objective': settings['objective'],
+        'spec_flux_bound': settings['spec_flux_bound']
+    }
+    if kind in ['efba', 'etfba', 'eva']:
+        args['inc_enz_cons'] = settings['inc_enz_cons']
+        args['enz_prot_lb'] = settings['enz_prot_lb']
+
+    return args
+
+
+def bench_load(model_file, settings, solver):
+    return lambda: _load(model_file)
+
+
+def bench_matrices(model_file, settings, solver):
+    model = _load(model_file)
+
+    def run():
+        model.stoichiometric_matrix
+        model.total_stoichiometric_matrix
+        model.transformation_matrix
+
+    return run
+
+
+def make_bench_optimize(kind, **options):
+    def bench_optimize(model_file, settings, solver):
+        model = _load_with_matrices(model_file)
+        optimArgs = _get_optimize_args(kind, settings)
+        optimArgs.update(options)
+
+        return lambda: model.optimize(kind, **optimArgs).solve(solver=solver)
+
+    return bench_optimize
+
+
+VA_OBJECTIVE_KINDS = {'fva': 'fba', 'tva': 'tfba', 'eva': 'efba'}
+
+
+def make_bench_variability(kind):
+    def bench_variability(model_file, settings, solver, n_jobs=1):
+        model = _load_with_matrices(model_file)
+        optimArgs = _get_optimize_args(kind, settings)
+        objValue = model.optimize(
+            VA_OBJECTIVE_KINDS[kind], **optimArgs
+        ).solve(solver=solver).opt_objective
+
+        return lambda: model.evaluate_variability(
+            kind, obj_value=objValue, gamma=0.9, **optimArgs
+        ).solve(solver=solver, n_jobs=n_jobs)
+
+    return bench_variability
+
+
+N_KNOCKOUTS = 20   # Number of reactions knocked out in the knockout scan
+
+
+def bench_knockouts(model_file, settings, solver, n_jobs=1):
+    model = _load_with_matrices(model_file)
+    knockouts = [rxnid for rxnid, rxn in model.reactions.items()
+                 if not rxn.is_exch_reaction
+                 and not rxn.is_biomass_formation][:N_KNOCKOUTS]
+    optimArgs = _get_optimize_args('fba', settings)
+
+    return lambda: model.evaluate_knockouts(
+        'fba', knockouts, **optimArgs
+    ).solve(solver=solver, n_jobs=n_jobs)
+
+
+def bench_export(model_file, settings, solver):
+    model = _load_with_matrices(model_file)
+    res = model.optimize(
+        'fba', **_get_optimize_args('fba', settings)
+    ).solve(solver=solver)
+    outDir = tempfile.mkdtemp()
+
+    def run():
+        for ext in ['tsv', 'xlsx', 'bin']:
+            res.opt_fluxes.save(os.path.join(outDir, f'fluxes.{ext}'))
+        model.save(os.path.join(outDir, 'model.bin'))
+
+    return run
+
+
+CASES = {   # case name: (setup function, whether run at several n_jobs)
+    'load': (bench_load, False),
+    'matrices': (bench_matrices, False),
+    'fba': (make_bench_optimize('fba'), False),
+    'tfba': (make_bench_optimize('tfba'), False),
+    'efba': (make_bench_optimize('efba'), False),
+    'etfba': (make_bench_optimize('etfba'), False),
+    'fba_loopless': (make_bench_optimize('fba', loopless=True), False),
+    'efba_loopless': (make_bench_optimize('efba', loopless=True), False),
+    'fva': (make_bench_variability('fva'), True),
+    'tva': (make_bench_variability('tva'), True),
+    'eva': (make_bench_variability('eva'), True),
+    'knockouts': (bench_knockouts, True),
+    'export': (bench_export, False)
+}
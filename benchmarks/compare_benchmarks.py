@@ -0,0 +1,103 @@
+'''Compare two runs of the benchmark suite and report regressions.
+
+Usage:
+python /path/to/etfba-main/benchmarks/compare_benchmarks.py BASELINE CURRENT
+[--threshold 0.2]
+
+Exits with status 1 if any benchmark slowed down by more than the threshold.
+'''
+
+
+import sys
+import json
+import argparse
+
+
+DEFAULT_THRESHOLD = 0.2   # Relative slowdown of the median time reported as
+                          # a regression
+MIN_TIME = 0.01           # Benchmarks faster than this (in seconds) in both
+                          # runs are too noisy to compare
+
+
+def _get_key(record):
+    return (record['model'], record['case'],
+            json.dumps(record['params'], sort_keys=True))
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD):
+    '''
+    Return a list of (model, case, params, baseline median, current median,
+    ratio, status) for benchmarks in both runs, where status is "regression",
+    "improvement" or "ok".
+
+    Parameters
+    ----------
+    baseline: dict
+        Output of run_benchmarks of the baseline run.
+    current: dict
+        Output of run_benchmarks of the current run.
+    threshold: float
+        Relative change of the median time beyond which a benchmark is
+        reported as a regression or an improvement.
+    '''
+
+    # failed benchmarks have no timings
+    baseRecords = {_get_key(record): record for record in baseline['results']
+                   if 'median' in record}
+
+    rows = []
+    for record in current['results']:
+        key = _get_key(record)
+        if key not in baseRecords or 'median' not in record:
+            continue
+
+        baseTime = baseRecords[key]['median']
+        curTime = record['median']
+        ratio = curTime/baseTime if baseTime > 0 else float('inf')
+        if max(baseTime, curTime) < MIN_TIME:
+            status = 'ok'
+        elif ratio > 1 + threshold:
+            status = 'regression'
+        elif ratio < 1/(1 + threshold):
+            status = 'improvement'
+        else:
+            status = 'ok'
+        rows.append((record['model'], record['case'], record['params'],
+                     baseTime, curTime, ratio, status))
+
+    return rows
+
+
+def print_comparison(rows):
+    print(f'{"model":<16}{"case":<12}{"params":<16}{"baseline":>10}'
+          f'{"current":>10}{"ratio":>8}  status')
+    for model, case, params, baseTime, curTime, ratio, status in rows:
+        paramsStr = ','.join(f'{key}={value}' for key, value in params.items())
+        print(f'{model:<16}{case:<12}{paramsStr:<16}{baseTime:>10.3f}'
+              f'{curTime:>10.3f}{ratio:>8.2f}  {status}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('baseline', help='output file of the baseline run')
+    parser.add_argument('current', help='output file of the current run')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='relative slowdown reported as a regression')
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    rows = compare(baseline, current, args.threshold)
+    print_comparison(rows)
+
+    if any(row[-1] == 'regression' for row in rows):
+        sys.exit(1)
+
+
+
+
+if __name__ == '__main__':
+    main()
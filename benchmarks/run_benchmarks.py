@@ -0,0 +1,145 @@
+'''Run the benchmark suite and save timings as JSON.
+
+Usage:
+python /path/to/etfba-main/benchmarks/run_benchmarks.py [--suite quick]
+[--models synthetic_200 iML1515] [--cases fba fva] [--solver highs]
+[--n-jobs 1 2 4] [--repeat 3] [--output results.json]
+[--compare baseline.json]
+
+Each benchmark is set up from a freshly loaded model in each repeat, and only
+the benchmarked step is timed. Solves of the "fba", "tfba", "efba", "etfba"
+and variability cases include building the problem.
+'''
+
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import subprocess
+import numpy as np
+import etfba
+from cases import DIR, MODELS, SUITES, CASES
+from compare_benchmarks import DEFAULT_THRESHOLD, compare, print_comparison
+
+
+def get_environment(solver):
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=DIR, capture_output=True,
+            text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        'etfba': etfba.__version__,
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'solver': solver,
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S')
+    }
+
+
+def run_case(model_name, model_file, settings, case, params, solver, repeat):
+    setup, _ = CASES[case]
+    record = {'model': model_name, 'case': case, 'params': params}
+
+    times = []
+    try:
+        for _ in range(repeat):
+            run = setup(model_file, settings, solver, **params)
+            start = time.perf_counter()
+            result = run()
+            times.append(time.perf_counter() - start)
+    except Exception as e:
+        record['error'] = f'{type(e).__name__}: {e}'
+        print(f'{model_name} {case} {params}: failed, {record["error"]}')
+        return record
+
+    record['times'] = times
+    record['min'] = min(times)
+    record['median'] = float(np.median(times))
+    if hasattr(result, 'metrics'):
+        record['metrics'] = result.metrics
+    print(f'{model_name} {case} {params}: {record["median"]:.3f} s')
+
+    return record
+
+
+def run_benchmarks(model_names, cases, solver, n_jobs_list, repeat):
+    results = []
+    with tempfile.TemporaryDirectory() as tmpDir:
+        for model_name in model_names:
+            model, settings = MODELS[model_name]()
+            model_file = os.path.join(tmpDir, f'{model_name}.bin')
+            model.save(model_file)
+            print(f'\n{model}')
+
+            for case in cases:
+                _, byJobs = CASES[case]
+                paramsList = ([{'n_jobs': n_jobs} for n_jobs in n_jobs_list]
+                              if byJobs else [{}])
+                for params in paramsList:
+                    results.append(run_case(
+                        model_name, model_file, settings, case, params, solver,
+                        repeat
+                    ))
+
+    return {'environment': get_environment(solver), 'results': results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--suite', choices=list(SUITES), default='quick',
+                        help='set of models benchmarked')
+    parser.add_argument('--models', nargs='+', choices=list(MODELS),
+                        help='models benchmarked, overriding suite')
+    parser.add_argument('--cases', nargs='+', choices=list(CASES),
+                        default=list(CASES), help='cases benchmarked')
+    parser.add_argument('--solver', choices=['glpk', 'highs', 'gurobi'],
+                        default='highs')
+    parser.add_argument('--n-jobs', nargs='+', type=int, default=[1, 2],
+                        help='numbers of jobs of variability analyses and '
+                             'knockout scans')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='number of runs of each benchmark')
+    parser.add_argument('--output', default=os.path.join(
+                            DIR, 'results',
+                            f'benchmarks_{time.strftime("%Y%m%d_%H%M%S")}.json'
+                        ), help='output JSON file')
+    parser.add_argument('--compare', metavar='BASELINE',
+                        help='output file of a previous run to compare with')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='relative slowdown reported as a regression')
+    args = parser.parse_args()
+
+    output = run_benchmarks(
+        args.models or SUITES[args.suite], args.cases, args.solver,
+        args.n_jobs, args.repeat
+    )
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(output, f, indent=2)
+    print(f'\nresults saved to {args.output}')
+
+    if args.compare is not None:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        rows = compare(baseline, output, args.threshold)
+        print()
+        print_comparison(rows)
+        if any(row[-1] == 'regression' for row in rows):
+            sys.exit(1)
+
+
+
+
+if __name__ == '__main__':
+    main()
@@ -7,7 +7,7 @@ molecular weight (MW), and standard reaction Gibbs energy.
 import os
 import re
 from cobra.io import load_json_model
-from etfba import Model, Metabolite, Reaction
+from etfba import Model, Reaction
 
 
 COBRA_MODEL_FILE = './iML1515.json'
@@ -79,7 +79,7 @@ def main():
             else:
                 is_h2o = False
             
-            reac = Metabolite(
+            reac = model.get_metabolite(
                 cobra_metab.id, 
                 cobra_metab.name, 
                 cobra_metab.compartment, 
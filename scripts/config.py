@@ -74,4 +74,4 @@ ETFBA_FLUX_FILE = f'{DIR}/simulation/{GROWTH_TYPE}/metabolic_fluxes.xlsx'
 PERTURB_DIRECTION = 'downregulation'   # {'upregulation', 'downregulation'}
 PERTURB_FOLD = 5
 
-N_JOBS = 100   
+N_JOBS = 100   # or 'auto' to choose jobs and solver threads per job by model size
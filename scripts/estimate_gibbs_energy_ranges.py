@@ -10,7 +10,7 @@ import pandas as pd
 from etfba import Model
 from helper import (get_internal_ph, add_H_leak_rxn, set_kcat_and_MW, 
                     get_default_KaC_and_KdC, set_deltaGprimem, get_H_leak_flux, 
-                    set_adjusted_kcat, reset_kcat)
+                    set_adjusted_kcat)
 from config import (DIR, MODEL_FILE, MW_FILE, GIBBS_ENERGY_FILE, KCAT_FILE, 
                     CORR_KAPP, KD_FILE, SEP_RXNS, ETFBA_FLUX_FILE, OBJECTIVE, 
                     GROWTH_TYPE, PRESET_FLUXES, FLUX_BOUNDS, SPEC_FLUX_BOUNDS, 
@@ -44,19 +44,20 @@ def etva(out_dir):
     for ph_out, dgpms in dgpms_info[[LOW_PH, NEUTRAL_PH]].items():
         print('\nEstimate Gibbs energy variability at external pH', ph_out)
 
-        set_deltaGprimem(model, dgpms)
+        ph_model = model.fork()
+        set_deltaGprimem(ph_model, dgpms)
         ph_in = get_internal_ph(ph_out)
         preset_flux = PRESET_FLUXES.copy()
         preset_flux.update(get_H_leak_flux(ph_in, ph_out))
         preset_conc = PRESET_CONCS.copy()
         preset_conc.update({'h_c': 10**(-ph_in+3)})   
         
-        old_kcats = set_adjusted_kcat(
-            model, kd_data, inc_enz_cons, SEP_RXNS, ph_in, 
+        set_adjusted_kcat(
+            ph_model, kd_data, inc_enz_cons, SEP_RXNS, ph_in, 
             KaC_default, KdC_default
         )
 
-        res = model.evaluate_variability(
+        res = ph_model.evaluate_variability(
             'etva',
             objective=OBJECTIVE,
             obj_value=etfba_bioms[ph_out],
@@ -79,8 +80,6 @@ def etva(out_dir):
             )
         )
 
-        reset_kcat(model, old_kcats, inc_enz_cons)
-
     pd.concat(dgp_ranges).T.to_excel(f'{out_dir}/gibbs_energy_ranges.xlsx')
 
 
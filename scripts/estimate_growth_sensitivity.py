@@ -10,9 +10,10 @@ import numpy as np
 import pandas as pd
 from multiprocess import Pool
 from etfba import Model
+from etfba.optim.parallel import plan_workers, partition_cores
 from helper import (get_internal_ph, add_H_leak_rxn, set_kcat_and_MW, 
                     get_default_KaC_and_KdC, set_deltaGprimem, get_H_leak_flux, 
-                    set_adjusted_kcat, reset_kcat, set_cpu_affinity)
+                    set_adjusted_kcat, set_cpu_affinity)
 from config import (DIR, MODEL_FILE, MW_FILE, GIBBS_ENERGY_FILE, KCAT_FILE, 
                     CORR_KAPP, KD_FILE, SEP_RXNS, OBJECTIVE, PRESET_FLUXES, 
                     FLUX_BOUNDS, SPEC_FLUX_BOUNDS, PRESET_CONCS, CONC_BOUNDS, 
@@ -33,13 +34,6 @@ def perturb_kcat(model, enzyme):
         _change_kcat(model, enzyme, PERTURB_FOLD)
 
 
-def restore_kcat(model, enzyme):
-    if PERTURB_DIRECTION == 'downregulation':
-        _change_kcat(model, enzyme, PERTURB_FOLD)
-    elif PERTURB_DIRECTION == 'upregulation':
-        _change_kcat(model, enzyme, 1/PERTURB_FOLD)
-
-
 def etfba_worker(
         out_dir, 
         model, 
@@ -49,15 +43,18 @@ def etfba_worker(
         KaC_default, 
         KdC_default, 
         inc_enz_cons, 
-        ex_thermo_cons
+        ex_thermo_cons,
+        cores,
+        threads
     ):
-    set_cpu_affinity()
+    set_cpu_affinity(cores)
 
     for enzyme in pert_enzymes:
         enz_out_dir = f'{out_dir}/{enzyme}'
         os.makedirs(enz_out_dir, exist_ok=True)
 
-        perturb_kcat(model, enzyme)
+        enz_model = model.fork()
+        perturb_kcat(enz_model, enzyme)
 
         fluxes = []
         dgps = []
@@ -66,19 +63,20 @@ def etfba_worker(
         for ph_out, dgpms in sel_dgpms_info.items():
             print(f'{enzyme} {PERTURB_DIRECTION} at external pH {ph_out}')
 
-            set_deltaGprimem(model, dgpms)
+            ph_model = enz_model.fork()
+            set_deltaGprimem(ph_model, dgpms)
             ph_in = get_internal_ph(ph_out)
             preset_flux = PRESET_FLUXES.copy()
             preset_flux.update(get_H_leak_flux(ph_in, ph_out))
             preset_conc = PRESET_CONCS.copy()
             preset_conc.update({'h_c': 10**(-ph_in+3)})   
             
-            old_kcats = set_adjusted_kcat(
-                model, kd_data, inc_enz_cons, SEP_RXNS, ph_in, 
+            set_adjusted_kcat(
+                ph_model, kd_data, inc_enz_cons, SEP_RXNS, ph_in, 
                 KaC_default, KdC_default
             )
 
-            res = model.optimize(
+            res = ph_model.optimize(
                 'etfba', 
                 objective=OBJECTIVE, 
                 flux_bound=FLUX_BOUNDS, 
@@ -91,6 +89,7 @@ def etfba_worker(
                 inc_enz_cons=inc_enz_cons,
                 enz_prot_lb=Q,
                 parsimonious=True,
+                solver_options={'Threads': threads}
             ).solve(solver='gurobi')
 
             if res.optimization_successful:
@@ -98,10 +97,6 @@ def etfba_worker(
                 dgps.append(pd.Series(res.opt_gibbs_energy))
                 epcs.append(pd.Series(res.opt_enzyme_costs))
 
-            reset_kcat(model, old_kcats, inc_enz_cons)
-
-        restore_kcat(model, enzyme)
-
         pd.DataFrame(
             fluxes, index=sel_dgpms_info.columns
         ).T.to_excel(f'{enz_out_dir}/metabolic_fluxes.xlsx')
@@ -128,8 +123,13 @@ def etfba_sensitivity(out_dir):
     kd_data = pd.read_excel(KD_FILE, header=0, index_col=0)
     KaC_default, KdC_default = get_default_KaC_and_KdC(kd_data)
     
-    pool = Pool(processes=N_JOBS)
-    for pert_enzymes in np.array_split(inc_enz_cons, N_JOBS):
+    n_jobs, threads = plan_workers(N_JOBS, len(inc_enz_cons))
+    core_sets = partition_cores(n_jobs, threads)
+
+    pool = Pool(processes=n_jobs)
+    for pert_enzymes, cores in zip(
+        np.array_split(inc_enz_cons, n_jobs), core_sets
+    ):
         res = pool.apply_async(
             func=etfba_worker,
             args=(
@@ -141,7 +141,9 @@ def etfba_sensitivity(out_dir):
                 KaC_default, 
                 KdC_default, 
                 inc_enz_cons,
-                ex_thermo_cons
+                ex_thermo_cons,
+                cores,
+                threads
             )
         )
     
@@ -25,7 +25,7 @@ import sys
 from etfba import Model
 sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
 from utils import (add_H_leak_rxn, set_kcat_and_MW, get_default_KaC_and_KdC, 
-                   set_deltaGprimem, get_H_leak_flux, set_adjusted_kcat, reset_kcat,
+                   set_deltaGprimem, get_H_leak_flux, set_adjusted_kcat,
                    set_cpu_affinity)
 from constants import (WORKING_DIR, MODEL_FILE, MW_FILE, 
                        GIBBS_ENERGY_FILE,
@@ -162,7 +162,8 @@ def etfba_worker(
         dgpms = dgpms_info.iloc[2:, DGMP_COL_IDX]
 
         # set standard Gibbs energy
-        set_deltaGprimem(model, dgpms)
+        mut_model = model.fork()
+        set_deltaGprimem(mut_model, dgpms)
 
         # set fluxes
         preset_flux = {}
@@ -178,8 +179,8 @@ def etfba_worker(
 
         # set adjusted Kcat
         if ADJUST_KCAT:
-            old_kcats = set_adjusted_kcat(
-                model, 
+            set_adjusted_kcat(
+                mut_model, 
                 kd_data, 
                 inc_enz_cons, 
                 SEP_RXNS,  
@@ -189,7 +190,7 @@ def etfba_worker(
             )
         
         try:
-            res = model.optimize(
+            res = mut_model.optimize(
                 'etfba', 
                 objective=OBJECTIVE, 
                 flux_bound=FLUX_BOUNDS, 
@@ -211,10 +212,6 @@ def etfba_worker(
 
         finally:
             fluxes_all[mut_id] = pd.Series(fluxes)
-
-            # reset kcat
-            if ADJUST_KCAT:
-                reset_kcat(model, old_kcats, inc_enz_cons)
     
     return fluxes_all
 
@@ -125,16 +125,7 @@ def set_adjusted_kcat(model, kd_data, included_epcs, sep_rxns, cyto_ph,
     return old_kcats
 
 
-def reset_kcat(model, old_kcats, included_epcs):
-    for rxnid in included_epcs:
-        model.reactions[rxnid].forward_kcat = old_kcats[rxnid][0]
-        if model.reactions[rxnid].reversible:
-            model.reactions[rxnid].backward_kcat = old_kcats[rxnid][1]
-
+def set_cpu_affinity(cores=None):
+    from etfba.optim.parallel import set_cpu_affinity as _set_cpu_affinity
 
-def set_cpu_affinity():
-    import platform
-    
-    if platform.system() == 'Linux':
-        import os
-        os.sched_setaffinity(os.getpid(), range(os.cpu_count()))
+    _set_cpu_affinity(cores)
@@ -10,7 +10,7 @@ import pandas as pd
 from etfba import Model
 from helper import (get_internal_ph, add_H_leak_rxn, set_kcat_and_MW, 
                     get_default_KaC_and_KdC, set_deltaGprimem, get_H_leak_flux, 
-                    set_adjusted_kcat, reset_kcat)
+                    set_adjusted_kcat)
 from config import (DIR, MODEL_FILE, MW_FILE, GIBBS_ENERGY_FILE, KCAT_FILE, 
                     CORR_KAPP, KD_FILE, SEP_RXNS, OBJECTIVE, 
                     GROWTH_TYPE, PRESET_FLUXES, FLUX_BOUNDS, SPEC_FLUX_BOUNDS, 
@@ -40,19 +40,20 @@ def etfba(out_dir):
     for ph_out, dgpms in dgpms_info.items():
         print('\nRun simulation at external pH', ph_out)
         
-        set_deltaGprimem(model, dgpms)
+        ph_model = model.fork()
+        set_deltaGprimem(ph_model, dgpms)
         ph_in = get_internal_ph(ph_out)
         preset_flux = PRESET_FLUXES.copy()
         preset_flux.update(get_H_leak_flux(ph_in, ph_out))
         preset_conc = PRESET_CONCS.copy()
         preset_conc.update({'h_c': 10**(-ph_in+3)})   
         
-        old_kcats = set_adjusted_kcat(
-            model, kd_data, inc_enz_cons, SEP_RXNS, ph_in, 
+        set_adjusted_kcat(
+            ph_model, kd_data, inc_enz_cons, SEP_RXNS, ph_in, 
             KaC_default, KdC_default
         )
 
-        res = model.optimize(
+        res = ph_model.optimize(
             'etfba', 
             objective=OBJECTIVE, 
             flux_bound=FLUX_BOUNDS, 
@@ -79,8 +80,6 @@ def etfba(out_dir):
             fluxes.append(pd.Series(res.opt_fluxes))
             dgps.append(pd.Series(res.opt_gibbs_energy))
             epcs.append(pd.Series(res.opt_enzyme_costs))
-
-        reset_kcat(model, old_kcats, inc_enz_cons)
     
     pd.DataFrame(
         fluxes, index=dgpms_info.columns
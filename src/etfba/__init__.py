@@ -5,4 +5,17 @@ __version__ = '0.2.0'
 
 from .core.model import Model
 from .core.metabolite import Metabolite
-from .core.reaction import Reaction
\ No newline at end of file
+from .core.reaction import Reaction
+from .core.generator import generate_model
+from .io.cache import ResultCache
+
+
+def __getattr__(name):
+    # the solver pool pulls in multiprocess and dill, so it is imported on 
+    # first access rather than with etfba
+    if name == 'AsyncSolverPool':
+        from .optim.aio import AsyncSolverPool
+
+        return AsyncSolverPool
+    
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
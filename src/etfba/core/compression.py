@@ -0,0 +1,472 @@
+'''Define the compression of models.'''
+
+
+import re
+from math import sqrt
+from copy import copy
+from .reaction import Reaction, ReactantDict
+from ..optim.consistency import ConsistencyOptimizer
+
+
+LUMP_TOL = 1e-9   # Stoichiometric coefficients below this value in magnitude
+                  # are considered cancelled in lumped reactions
+
+
+class ModelCompression():
+    '''
+    Compression of a model, where reactions which can not carry flux are
+    removed, reversible reactions which can only carry flux forward are made
+    irreversible, and linear pathways are lumped into single reactions. The
+    compressed model is solved in place of the original one, and results are
+    expanded back to reactions of the original model.
+
+    Attributes
+    ----------
+    model: Model
+        The compressed model.
+    original_model: Model
+        The model compressed.
+    blocked_reactions: list
+        IDs of reactions which can not carry flux, removed from the compressed
+        model.
+    irreversible_reactions: list
+        IDs of reversible reactions which can only carry flux forward, made
+        irreversible in the compressed model.
+    lumped_reactions: dict
+        Mapping of IDs of lumped reactions to dicts, which map IDs of their
+        steps to fluxes of steps per unit flux of the lumped reaction.
+    '''
+
+    def __init__(
+            self,
+            model,
+            original_model,
+            blocked_reactions,
+            irreversible_reactions,
+            lumped_reactions
+    ):
+        '''
+        Parameters
+        ----------
+        model: Model
+            The compressed model.
+        original_model: Model
+            The model compressed.
+        blocked_reactions: list
+            IDs of reactions removed.
+        irreversible_reactions: list
+            IDs of reversible reactions made irreversible.
+        lumped_reactions: dict
+            Mapping of IDs of lumped reactions to dicts mapping IDs of their
+            steps to fluxes per unit flux of the lumped reaction.
+        '''
+
+        self.model = model
+        self.original_model = original_model
+        self.blocked_reactions = blocked_reactions
+        self.irreversible_reactions = irreversible_reactions
+        self.lumped_reactions = lumped_reactions
+
+        self._steps = {stepid: (lumpid, factor)
+                       for lumpid, steps in lumped_reactions.items()
+                       for stepid, factor in steps.items()}
+
+
+    def map_reactions(self, rxnids):
+        '''
+        Return IDs of reactions in the compressed model corresponding to
+        reactions of the original model, e.g., to translate inc_enz_cons or
+        ex_thermo_cons. Blocked reactions are dropped, and steps of a lumped
+        reaction are mapped to the lumped reaction.
+
+        Parameters
+        ----------
+        rxnids: list
+            Reaction IDs of the original model.
+        '''
+
+        blocked = set(self.blocked_reactions)
+
+        mapped = []
+        for rxnid in rxnids:
+            if rxnid in blocked:
+                continue
+            mappedid = self._steps[rxnid][0] if rxnid in self._steps else rxnid
+            if mappedid not in mapped:
+                mapped.append(mappedid)
+
+        return mapped
+
+
+    def expand_fluxes(self, fluxes):
+        '''
+        Return net fluxes of reactions of the original model.
+
+        Parameters
+        ----------
+        fluxes: dict
+            Net fluxes of reactions of the compressed model.
+        '''
+
+        blocked = set(self.blocked_reactions)
+
+        expanded = {}
+        for rxnid in self.original_model.reactions:
+            if rxnid in blocked:
+                expanded[rxnid] = 0.0
+            elif rxnid in self._steps:
+                lumpid, factor = self._steps[rxnid]
+                flux = fluxes[lumpid]
+                expanded[rxnid] = None if flux is None else factor*flux
+            else:
+                expanded[rxnid] = fluxes[rxnid]
+
+        return expanded
+
+
+    def _expand_enzyme_costs(self, costs):
+        '''
+        Split enzyme costs of lumped reactions into their steps in proportion
+        to the kcat based costs of steps.
+
+        Parameters
+        ----------
+        costs: dict
+            Enzyme costs of reactions of the compressed model.
+        '''
+
+        rxns = self.original_model.reactions
+
+        expanded = {}
+        for rxnid, cost in costs.items():
+            if rxnid in self.lumped_reactions:
+                weights = {stepid: factor*rxns[stepid].mw/rxns[stepid].fkcat
+                           for stepid, factor
+                           in self.lumped_reactions[rxnid].items()}
+                total = sum(weights.values())
+                for stepid, weight in weights.items():
+                    expanded[stepid] = cost*weight/total
+            else:
+                expanded[rxnid] = cost
+
+        return expanded
+
+
+    def expand_results(self, results):
+        '''
+        Return a copy of results of the compressed model with fluxes (and
+        enzyme costs if any) of reactions of the original model. Other
+        attributes, e.g., Gibbs energies and reduced costs, are kept as those
+        of the compressed model.
+
+        Parameters
+        ----------
+        results: FBAResults, TFBAResults, EFBAResults or ETFBAResults
+            Results of the compressed model.
+        '''
+
+        expanded = copy(results)
+        expanded._opt_fluxes = self.expand_fluxes(results._opt_fluxes)
+        expanded._stoy_mat = self.original_model.stoichiometric_matrix
+        if getattr(results, '_opt_epcs', None) is not None:
+            expanded._opt_epcs = self._expand_enzyme_costs(results._opt_epcs)
+
+        return expanded
+
+
+    def __repr__(self):
+        return (f'{self.original_model} compressed to {self.model}, '
+                f'{len(self.blocked_reactions)} blocked, '
+                f'{len(self.irreversible_reactions)} made irreversible and '
+                f'{len(self._steps)} lumped into '
+                f'{len(self.lumped_reactions)} reactions')
+
+
+def _get_flux_bound(fluxid, flux_bound, spec_flux_bound, preset_flux):
+    if fluxid in preset_flux:
+        return (preset_flux[fluxid],)*2
+    elif fluxid in spec_flux_bound:
+        return spec_flux_bound[fluxid]
+    else:
+        return flux_bound
+
+
+def _lump_reactions(groups, lumpable, balanced_metabids):
+    '''
+    Lump linear pathways, i.e., groups of reactions linked by metabolites
+    produced by exactly one group and consumed by exactly another group.
+    Groups are modified in place.
+
+    Parameters
+    ----------
+    groups: dict
+        Mapping of group IDs to (steps, stoichiometry), where steps map
+        reaction IDs to fluxes per unit flux of the group, and stoichiometry
+        maps metabolite IDs to coefficients.
+    lumpable: dict
+        Mapping of group IDs to keys of groups which can be lumped together
+        (e.g., whether catalyzed by enzymes), None if not lumpable.
+    balanced_metabids: set
+        IDs of metabolites which can be lumped out, i.e., constrained by mass
+        balance and not protected.
+    '''
+
+    metabGroups = {}
+    for groupid, (_, stoy) in groups.items():
+        for metabid in stoy:
+            metabGroups.setdefault(metabid, set()).add(groupid)
+
+    queue = set(metabGroups) & balanced_metabids
+    while queue:
+        metabid = queue.pop()
+        if len(metabGroups.get(metabid, ())) != 2:
+            continue
+
+        gid1, gid2 = metabGroups[metabid]
+        if groups[gid1][1][metabid] < 0:
+            gid1, gid2 = gid2, gid1
+        coe1 = groups[gid1][1][metabid]
+        coe2 = groups[gid2][1][metabid]
+        if (coe1 <= 0 or coe2 >= 0 or lumpable[gid1] is None
+            or lumpable[gid1] != lumpable[gid2]):
+            continue
+
+        # the flux of group 2 is determined by that of group 1 through the
+        # balance of the metabolite
+        factor = coe1/-coe2
+        steps1, stoy1 = groups[gid1]
+        steps2, stoy2 = groups[gid2]
+
+        stoy = dict(stoy1)
+        for reacid, coe in stoy2.items():
+            stoy[reacid] = stoy.get(reacid, 0) + factor*coe
+        stoy = {reacid: coe for reacid, coe in stoy.items()
+                if reacid != metabid and abs(coe) > LUMP_TOL}
+        if not stoy:
+            continue
+
+        steps = dict(steps1)
+        for stepid, stepFactor in steps2.items():
+            steps[stepid] = factor*stepFactor
+
+        groups[gid1] = (steps, stoy)
+        del groups[gid2]
+        del lumpable[gid2]
+
+        for reacid in set(stoy1) | set(stoy2):
+            metabGroups[reacid].discard(gid2)
+            if reacid in stoy:
+                metabGroups[reacid].add(gid1)
+            else:
+                metabGroups[reacid].discard(gid1)
+            if reacid in balanced_metabids:
+                queue.add(reacid)
+
+
+def _build_lumped_reaction(model, lumpid, steps, stoy):
+    '''
+    Parameters
+    ----------
+    model: Model
+        The model compressed.
+    lumpid: str
+        ID of the lumped reaction.
+    steps: dict
+        Mapping of IDs of steps to fluxes per unit flux of the lumped reaction.
+    stoy: dict
+        Mapping of metabolite IDs to stoichiometric coefficients of the lumped
+        reaction.
+    '''
+
+    rxns = [model.reactions[stepid] for stepid in steps]
+    factors = list(steps.values())
+
+    # the enzyme cost per unit flux of the lumped reaction is the sum over
+    # steps, and its Gibbs energy is the sum over steps with intermediates
+    # cancelled
+    if all(rxn.fkcat is not None and rxn.mw is not None for rxn in rxns):
+        fkcat = rxns[0].fkcat
+        mw = fkcat*sum(factor*rxn.mw/rxn.fkcat
+                       for factor, rxn in zip(factors, rxns))
+    else:
+        fkcat = mw = None
+
+    if all(rxn.dgpm is not None for rxn in rxns):
+        dgpm = sum(factor*rxn.dgpm for factor, rxn in zip(factors, rxns))
+    else:
+        dgpm = None
+
+    if all(rxn.dgpm_error is not None for rxn in rxns):
+        dgpmError = sqrt(sum((factor*rxn.dgpm_error)**2
+                             for factor, rxn in zip(factors, rxns)))
+    else:
+        dgpmError = None
+
+    return Reaction(
+        lumpid,
+        forward_kcat=fkcat,
+        molecular_weight=mw,
+        standard_gibbs_energy=dgpm,
+        standard_gibbs_energy_error=dgpmError,
+        reversible=False
+    )
+
+
+def _get_km(model, metabid, stepids):
+    # Km of a reactant in the first step involving it
+    kms = model.metabolites[metabid].kms
+    for stepid in stepids:
+        if stepid in kms:
+            return kms[stepid]
+
+
+def compress_model(
+        model,
+        flux_bound,
+        spec_flux_bound,
+        preset_flux,
+        irr_reactions,
+        ex_mass_bal_cons,
+        protected_reactions,
+        protected_metabolites,
+        lump,
+        check_reversible,
+        solver
+):
+    '''
+    Return the compression of a model. Parameters are the same as
+    Model.compress.
+    '''
+
+    spec_flux_bound = {} if spec_flux_bound is None else spec_flux_bound
+    preset_flux = {} if preset_flux is None else preset_flux
+    ex_mass_bal_cons = [] if ex_mass_bal_cons is None else ex_mass_bal_cons
+    protectedRxnIDs = set(protected_reactions or [])
+    protectedMetabIDs = set(protected_metabolites or [])
+
+    rxnIndex = model.reaction_index
+    metabIndex = model.metabolite_index
+    if irr_reactions is None:
+        revs = [model.reactions[rxnid].rev for rxnid in rxnIndex]
+    else:
+        irrIDs = set(irr_reactions)
+        revs = [rxnid not in irrIDs for rxnid in rxnIndex]
+
+    # reactions with bounds specified are kept as they are
+    for fluxid in [*spec_flux_bound, *preset_flux]:
+        protectedRxnIDs.update([fluxid, re.sub(r'_[fb]$', '', fluxid)])
+
+    # directions of reactions allowed by flux bounds
+    allowed = []
+    for rxnid, rev in zip(rxnIndex, revs):
+        if rev:
+            fluxids = {1: rxnid+'_f', -1: rxnid+'_b'}
+        else:
+            fluxids = {1: rxnid}
+        allowed.append({
+            sign for sign, fluxid in fluxids.items()
+            if _get_flux_bound(
+                fluxid, flux_bound, spec_flux_bound, preset_flux
+            )[1] > 0
+        })
+
+    directions = [(rxnid, sign) for rxnid, signs in zip(rxnIndex, allowed)
+                  for sign in sorted(signs, reverse=True)]
+    if directions:
+        blocked = ConsistencyOptimizer(
+            model, flux_bound, spec_flux_bound, preset_flux, irr_reactions,
+            ex_mass_bal_cons, directions
+        ).find_blocked(solver, check_reversible)
+        for rxnid, sign in blocked:
+            allowed[rxnIndex.get_position(rxnid)].discard(sign)
+
+    blockedRxnIDs = []
+    irrRxnIDs = []
+    compRevs = {}
+    for rxnid, rev, signs in zip(rxnIndex, revs, allowed):
+        if rxnid in protectedRxnIDs:
+            compRevs[rxnid] = rev
+        elif not signs:
+            blockedRxnIDs.append(rxnid)
+        elif rev and signs == {1}:
+            irrRxnIDs.append(rxnid)
+            compRevs[rxnid] = False
+        else:
+            compRevs[rxnid] = rev
+
+    # each remaining reaction starts as a group of its own
+    stoyMat = model.reaction_adjacency
+    metabIDs = metabIndex.ids
+    groups = {}
+    lumpable = {}
+    for rxnid in compRevs:
+        col = rxnIndex.get_position(rxnid)
+        start, end = stoyMat.indptr[col], stoyMat.indptr[col+1]
+        groups[rxnid] = (
+            {rxnid: 1.0},
+            {metabIDs[row]: float(coe) for row, coe
+             in zip(stoyMat.indices[start:end], stoyMat.data[start:end])}
+        )
+
+        rxn = model.reactions[rxnid]
+        if (lump and not compRevs[rxnid] and rxnid not in protectedRxnIDs
+            and not any([rxn.is_biomass_formation, rxn.is_exch_reaction,
+                         rxn.is_h_transport, rxn.is_h2o_transport])):
+            lumpable[rxnid] = rxn.fkcat is not None and rxn.mw is not None
+        else:
+            lumpable[rxnid] = None
+
+    if lump:
+        balanced = ~metabIndex.get_mask(ex_mass_bal_cons)
+        balancedMetabIDs = (set(metabIndex.get_ids(balanced))
+                            - protectedMetabIDs)
+        _lump_reactions(groups, lumpable, balancedMetabIDs)
+
+    # build the compressed model
+    compressed = type(model)(model.name)
+
+    rxnPositions = {rxnid: pos for pos, rxnid in enumerate(rxnIndex)}
+    lumpedRxns = {}
+    rxns = []
+    for steps, stoy in groups.values():
+        stepids = sorted(steps, key=rxnPositions.get)
+        if len(stepids) == 1:
+            rxnid = stepids[0]
+            rxn = copy(model.reactions[rxnid])
+            rxn._substrates = ReactantDict()
+            rxn._products = ReactantDict()
+            rxn.rev = compRevs[rxnid]
+        else:
+            rxnid = '+'.join(stepids)
+            steps = {stepid: steps[stepid] for stepid in stepids}
+            rxn = _build_lumped_reaction(model, rxnid, steps, stoy)
+            lumpedRxns[rxnid] = steps
+
+        subs = {}
+        pros = {}
+        kms = {}
+        for metabid, coe in stoy.items():
+            metab = model.metabolites[metabid]
+            newMetab = compressed.get_metabolite(
+                metabid, metab.name, metab.compartment, is_h=metab.is_h,
+                is_h2o=metab.is_h2o
+            )
+            if coe < 0:
+                subs[newMetab] = -coe
+            else:
+                pros[newMetab] = coe
+            km = _get_km(model, metabid, stepids)
+            if km is not None:
+                kms[newMetab] = km
+
+        rxn.add_substrates(subs, {metab: kms[metab] for metab in subs
+                                  if metab in kms})
+        rxn.add_products(pros, {metab: kms[metab] for metab in pros
+                                if metab in kms})
+        rxns.append(rxn)
+
+    compressed.add_reactions(rxns)
+
+    return ModelCompression(
+        compressed, model, blockedRxnIDs, irrRxnIDs, lumpedRxns
+    )
@@ -0,0 +1,257 @@
+'''Define the generator of synthetic models for scaling and stress tests.'''
+
+
+import numpy as np
+from .model import Model
+from .reaction import Reaction
+from .metabolite import Metabolite
+
+
+RT = 8.315e-3*298.15   # kJ/mol
+MAX_CONC_RATIO = 1e5     # Ratio of concentration bounds (e.g., 0.001 to 100 mM)
+                         # at which backbone reactions stay forward feasible
+THERMO_MARGIN = RT*np.log(MAX_CONC_RATIO)
+
+
+def _draw_lognormal(rng, median_sigma, size=None):
+    median, sigma = median_sigma
+
+    return median*np.exp(sigma*rng.standard_normal(size))
+
+
+def _build_member(
+        rng,
+        prefix,
+        uptake_metabs,
+        n_reactions,
+        n_metabolites,
+        n_secretions,
+        compartments,
+        reversible_fraction,
+        branching,
+        kcat,
+        mw,
+        km,
+        dgpm
+):
+    '''
+    Return reactions of a member network. Metabolites form a forest rooted at
+    metabolites taken up from uptake_metabs, each produced by one backbone
+    reaction from its parent, and the leaves are precursors of the biomass
+    formation, so that biomass can be formed at any rate up to the uptake.
+    The rest of reactions are random cross links which may carry no flux.
+    '''
+
+    nCrossLinks = n_reactions - n_metabolites - 1 - n_secretions
+    if nCrossLinks < 0:
+        raise ValueError(
+            'n_reactions should be no less than n_metabolites + n_secretions + '
+            '1 (per member) plus the number of uptakes'
+        )
+
+    metabs = []
+    for i in range(n_metabolites):
+        comp = compartments[rng.integers(len(compartments))]
+        metabid = f'{prefix}M{i}_{comp}'
+        metabs.append(Metabolite(metabid, metabid, comp))
+
+    def new_reaction(rxnid, rev, backbone=False):
+        dgpmValue = dgpm[0] + dgpm[1]*rng.standard_normal()
+        if backbone:
+            dgpmValue = -THERMO_MARGIN - abs(dgpmValue)
+        return Reaction(
+            rxnid,
+            forward_kcat=float(_draw_lognormal(rng, kcat)),
+            backward_kcat=float(_draw_lognormal(rng, kcat)) if rev else None,
+            molecular_weight=float(_draw_lognormal(rng, mw)),
+            standard_gibbs_energy=float(dgpmValue),
+            reversible=rev
+        )
+
+    def draw_kms(reactants):
+        return {reac: float(_draw_lognormal(rng, km)) for reac in reactants}
+
+    rxns = []
+
+    # backbone, each metabolite is produced from its parent, which is the
+    # preceding one (forming linear chains) unless branching
+    nRoots = min(len(uptake_metabs), n_metabolites)
+    hasChild = np.zeros(n_metabolites, dtype=bool)
+    for i in range(n_metabolites):
+        if i < nRoots:
+            parent = uptake_metabs[i]
+        else:
+            if rng.random() < branching:
+                parentIdx = int(rng.integers(i))
+            else:
+                parentIdx = i - 1
+            hasChild[parentIdx] = True
+            parent = metabs[parentIdx]
+
+        rxn = new_reaction(
+            f'{prefix}R{i}', bool(rng.random() < reversible_fraction),
+            backbone=True
+        )
+        rxn.add_substrates({parent: 1}, draw_kms([parent]))
+        rxn.add_products({metabs[i]: 1}, draw_kms([metabs[i]]))
+        rxns.append(rxn)
+
+    # cross links, which conserve the number of molecules so that no mass is
+    # created by internal reactions
+    for i in range(nCrossLinks):
+        nSubs = min(int(rng.integers(1, 3)), n_metabolites//2)
+        if nSubs == 0:
+            break
+        reacs = rng.choice(n_metabolites, size=2*nSubs, replace=False)
+        subs = [metabs[idx] for idx in reacs[:nSubs]]
+        pros = [metabs[idx] for idx in reacs[nSubs:]]
+
+        rxn = new_reaction(
+            f'{prefix}X{i}', bool(rng.random() < reversible_fraction)
+        )
+        rxn.add_substrates({sub: 1 for sub in subs}, draw_kms(subs))
+        rxn.add_products({pro: 1 for pro in pros}, draw_kms(pros))
+        rxns.append(rxn)
+
+    # secretions of random metabolites
+    for idx in rng.choice(n_metabolites, size=min(n_secretions, n_metabolites),
+                          replace=False):
+        rxn = Reaction(f'{prefix}EX_M{idx}', reversible=False,
+                       is_exch_reaction=True)
+        rxn.add_substrates({metabs[idx]: 1})
+        rxns.append(rxn)
+
+    # biomass formation drains the leaves of the backbone
+    biom = Reaction(f'{prefix}BIOMASS', reversible=False,
+                    is_biomass_formation=True)
+    biom.add_substrates({
+        metabs[idx]: round(float(rng.uniform(0.01, 1)), 3)
+        for idx in np.flatnonzero(~hasChild)
+    })
+    rxns.append(biom)
+
+    return rxns
+
+
+def generate_model(
+        n_reactions=1000,
+        n_metabolites=None,
+        *,
+        n_members=1,
+        n_uptakes=1,
+        n_secretions=None,
+        compartments=('c',),
+        reversible_fraction=0.3,
+        branching=0.2,
+        kcat=(10, 1.5),
+        mw=(40, 0.5),
+        km=(0.1, 1.5),
+        dgpm=(-5, 15),
+        seed=None,
+        name=None
+):
+    '''
+    Generate a random model with realistic structure and parameters for
+    scaling and stress tests.
+
+    Each member of the model (a community if more than one) is a network whose
+    metabolites form a forest rooted at metabolites taken up from the shared
+    extracellular pool: each metabolite is produced from its parent by one
+    irreversible or reversible backbone reaction, and the leaves are
+    precursors of the member's biomass formation reaction "BIOMASS" (prefixed
+    by "S{k}_" for the k-th member). Backbone reactions have standard Gibbs
+    energies negative enough to be forward feasible at any concentrations
+    within a ratio of 1e5, so FBA, TFBA, EFBA and ETFBA problems maximizing
+    biomass formation are feasible with a positive optimum as long as uptake
+    is allowed. The remaining reactions are random cross links between
+    metabolites of the member conserving the number of molecules, and 
+    secretions of random metabolites.
+
+    The model is built in memory, and can be saved by Model.save.
+
+    Parameters
+    ----------
+    n_reactions: int
+        Total number of reactions.
+    n_metabolites: int
+        Total number of metabolites, including n_uptakes extracellular ones.
+        If None, 0.7*n_reactions.
+    n_members: int
+        Number of members of the community, which share the extracellular
+        metabolites taken up.
+    n_uptakes: int
+        Number of extracellular metabolites taken up by exchange reactions
+        "EX_S{i}".
+    n_secretions: int
+        Number of secretion reactions per member. If None, 5% of reactions.
+    compartments: tuple
+        Compartments intracellular metabolites are randomly assigned to.
+        Reactions between compartments act as transports.
+    reversible_fraction: float
+        Fraction of reversible reactions.
+    branching: float
+        Probability that a metabolite is produced from a random preceding
+        metabolite rather than the last one, lower values giving longer
+        unbranched pathways.
+    kcat: tuple
+        Median (1/s) and log-scale standard deviation of the log-normal
+        distribution of kcats.
+    mw: tuple
+        Median (kDa) and log-scale standard deviation of enzyme molecular
+        weights.
+    km: tuple
+        Median (mM) and log-scale standard deviation of Km values.
+    dgpm: tuple
+        Mean and standard deviation (kJ/mol) of the normal distribution of
+        standard reaction Gibbs energies of cross links.
+    seed: int
+        Seed of the random generator, the same seed giving the same model.
+    name: str
+        Model name.
+    '''
+
+    if n_metabolites is None:
+        n_metabolites = int(0.7*n_reactions)
+    if n_secretions is None:
+        n_secretions = max(int(0.05*n_reactions/n_members), 1)
+    if n_members < 1 or n_uptakes < 1:
+        raise ValueError('n_members and n_uptakes should be positive')
+    if not 0 <= reversible_fraction <= 1 or not 0 <= branching <= 1:
+        raise ValueError('reversible_fraction and branching should be in [0, 1]')
+
+    rng = np.random.default_rng(seed)
+
+    uptakeMetabs = [Metabolite(f'S{i}_e', f'S{i}_e', 'e')
+                    for i in range(n_uptakes)]
+    rxns = []
+    for i, metab in enumerate(uptakeMetabs):
+        rxn = Reaction(f'EX_S{i}', reversible=False, is_exch_reaction=True)
+        rxn.add_products({metab: 1})
+        rxns.append(rxn)
+
+    memberRxns = np.array_split(np.arange(n_reactions - n_uptakes), n_members)
+    memberMetabs = np.array_split(np.arange(n_metabolites - n_uptakes),
+                                  n_members)
+    for k in range(n_members):
+        rxns.extend(_build_member(
+            rng,
+            f'S{k}_' if n_members > 1 else '',
+            uptakeMetabs,
+            len(memberRxns[k]),
+            len(memberMetabs[k]),
+            n_secretions,
+            compartments,
+            reversible_fraction,
+            branching,
+            kcat,
+            mw,
+            km,
+            dgpm
+        ))
+
+    if name is None:
+        name = f'synthetic_{n_reactions}'
+    model = Model(name)
+    model.add_reactions(rxns)
+
+    return model
@@ -0,0 +1,157 @@
+'''Define the IdIndex class.'''
+
+
+import numpy as np
+
+
+class IdIndex():
+    '''
+    Immutable mapping between IDs (e.g., of reactions, fluxes or metabolites)
+    and their positions, i.e., consecutive integers in the order of IDs.
+    Lookups of many IDs return integer arrays or boolean masks which can be
+    used to index rows or columns of matrices directly.
+
+    Attributes
+    ----------
+    ids: tuple
+        IDs in the order of positions.
+    '''
+
+    __slots__ = ('_ids', '_positions')
+
+    def __init__(self, ids):
+        '''
+        Parameters
+        ----------
+        ids: iterable
+            Unique IDs.
+        '''
+
+        ids = tuple(ids)
+        positions = {id_: pos for pos, id_ in enumerate(ids)}
+        if len(positions) != len(ids):
+            raise ValueError('IDs of IdIndex should be unique')
+
+        object.__setattr__(self, '_ids', ids)
+        object.__setattr__(self, '_positions', positions)
+
+
+    def __setattr__(self, name, value):
+        raise AttributeError('IdIndex is immutable')
+
+
+    def __getstate__(self):
+        return self._ids
+
+
+    def __setstate__(self, state):
+        self.__init__(state)
+
+
+    @property
+    def ids(self):
+        return self._ids
+
+
+    def get_position(self, id_):
+        '''
+        Return the position of an ID.
+
+        Parameters
+        ----------
+        id_: str
+            ID in the index.
+        '''
+
+        try:
+            return self._positions[id_]
+        except KeyError:
+            raise KeyError(f'{id_} not found in the index') from None
+
+
+    def get_positions(self, ids, ignore_missing=False):
+        '''
+        Return an integer array of positions of IDs.
+
+        Parameters
+        ----------
+        ids: iterable
+            IDs to look up.
+        ignore_missing: bool
+            Whether IDs not in the index are skipped rather than raising
+            KeyError.
+        '''
+
+        if ignore_missing:
+            positions = [self._positions[id_] for id_ in ids
+                         if id_ in self._positions]
+        else:
+            positions = [self.get_position(id_) for id_ in ids]
+
+        return np.array(positions, dtype=int)
+
+
+    def get_mask(self, ids):
+        '''
+        Return a boolean array which is True at positions of IDs. IDs not in
+        the index are ignored.
+
+        Parameters
+        ----------
+        ids: iterable
+            IDs to look up.
+        '''
+
+        mask = np.zeros(len(self._ids), dtype=bool)
+        mask[self.get_positions(ids, ignore_missing=True)] = True
+
+        return mask
+
+
+    def get_ids(self, selector):
+        '''
+        Return a list of IDs at given positions.
+
+        Parameters
+        ----------
+        selector: array
+            Integer array of positions, or boolean mask of the index length.
+        '''
+
+        selector = np.asarray(selector)
+        if selector.dtype == bool:
+            if selector.size != len(self._ids):
+                raise ValueError('mask should have the same length as the index')
+            selector = np.flatnonzero(selector)
+
+        return [self._ids[pos] for pos in selector]
+
+
+    def __len__(self):
+        return len(self._ids)
+
+
+    def __iter__(self):
+        return iter(self._ids)
+
+
+    def __contains__(self, id_):
+        return id_ in self._positions
+
+
+    def __getitem__(self, pos):
+        return self._ids[pos]
+
+
+    def __eq__(self, other):
+        return isinstance(other, IdIndex) and self._ids == other._ids
+
+
+    def __hash__(self):
+        return hash(self._ids)
+
+
+    def __repr__(self):
+        plural = 's' if len(self._ids) != 1 else ''
+
+        return f'IdIndex with {len(self._ids)} ID{plural}'
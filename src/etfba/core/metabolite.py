@@ -1,31 +1,15 @@
-'''Difine the Metabolite class.'''
+'''Difine the Metabolite and MetaboliteRegistry classes.'''
 
 
+import warnings
+from weakref import WeakValueDictionary
 from ..io.results import PrettyDict
 
 
-class Singleton(type):
+class Metabolite():
     '''
-    Make a singleton metaclass. 
-    '''
-    
-    def __init__(cls, name, bases, attrs):
-        cls._instances = {}
-        
-    def __call__(cls, *args, **kwargs):
-        key = (sum(hash(argv) for argv in args) 
-               + sum(hash(argv) for argv in kwargs.values()))
-        instance = cls._instances.setdefault(
-            key, super().__call__(*args, **kwargs)
-        )
-        
-        return instance
-
-
-class Metabolite(metaclass=Singleton):
-    '''
-    Metabolite instances created with identical IDs, names, and all other attributes 
-    are treated as a singular instance.
+    Metabolites with identical IDs and all other attributes are interned as a 
+    single instance within a model, see MetaboliteRegistry.
 
     Attributes
     ----------
@@ -45,7 +29,8 @@ class Metabolite(metaclass=Singleton):
     is_h2o: bool
         Indicates whether it is water.
     is_constrained_by_mass_balance: bool
-        Indicates whether it appears in the mass balance constraints.
+        Deprecated, always False. Optimizers no longer modify the model, use 
+        the cstrMetabIDs attribute of the optimizer instead.
     host: Reaction
         The host reaction of the metabolite.
     role: {'substrate', 'product'}
@@ -86,8 +71,6 @@ class Metabolite(metaclass=Singleton):
 
         self.kms = PrettyDict()
         self.coes = PrettyDict()
-
-        self.is_constrained_by_mass_balance = False
         
         self.host = None
         self.role = None
@@ -142,8 +125,95 @@ class Metabolite(metaclass=Singleton):
                     self.coes[host.rxnid] = value
         else:
             raise AttributeError('host reaction not found, can not set coe')    
+
+
+    @property
+    def is_constrained_by_mass_balance(self):
+        warnings.warn(
+            'is_constrained_by_mass_balance is deprecated and always False, '
+            'since optimizers no longer modify the model, use cstrMetabIDs of '
+            'the optimizer instead', 
+            DeprecationWarning, 
+            stacklevel=2
+        )
+
+        return False
         
     
     def __repr__(self):
         return self.name if self.name else self.metabid
-        
\ No newline at end of file
+
+
+
+class MetaboliteRegistry():
+    '''
+    Registry interning Metabolite instances by the tuple of their IDs and all 
+    other attributes, so that metabolites with identical attributes are a 
+    single instance. Each model owns a registry. Metabolites are weakly 
+    referenced, i.e., released with the model or reactions using them.
+    '''
+
+    def __init__(self):
+        self._metabolites = WeakValueDictionary()
+
+
+    @staticmethod
+    def get_key(metab):
+        '''
+        Return the tuple of the ID and all other attributes of a metabolite.
+
+        Parameters
+        ----------
+        metab: Metabolite
+            Metabolite to identify.
+        '''
+        
+        return (metab.metabid, metab.name, metab.compartment, metab.is_h, 
+                metab.is_h2o)
+
+
+    def get(
+            self, 
+            metabid, 
+            name=None, 
+            compartment=None, 
+            *, 
+            is_h=False, 
+            is_h2o=False
+    ):
+        '''
+        Return the interned metabolite with given attributes, created if not 
+        in the registry. Parameters are the same as Metabolite.
+        '''
+
+        key = (metabid, name, compartment, is_h, is_h2o)
+        metab = self._metabolites.get(key)
+        if metab is None:
+            metab = Metabolite(
+                metabid, name, compartment, is_h=is_h, is_h2o=is_h2o
+            )
+            self._metabolites[key] = metab
+
+        return metab
+
+
+    def intern(self, metab):
+        '''
+        Return the interned metabolite identical to metab, which is metab 
+        itself if none is in the registry.
+
+        Parameters
+        ----------
+        metab: Metabolite
+            Metabolite to intern.
+        '''
+
+        return self._metabolites.setdefault(self.get_key(metab), metab)
+
+
+    def __len__(self):
+        return len(self._metabolites)
+
+
+    def __contains__(self, metab):
+        return self._metabolites.get(self.get_key(metab)) is metab
@@ -2,17 +2,97 @@
 
 
 import re
-from functools import lru_cache
+from copy import copy
+from functools import wraps
 from collections.abc import Iterable
-import pandas as pd
-from .reaction import Reaction, DEFAULT_MW, DEFAULT_KCAT, DEFAULT_KM, DEFAULT_DGPM
-from .metabolite import Metabolite
-from ..optim.optim import FBAOptimizer, TFBAOptimizer, EFBAOptimizer, ETFBAOptimizer
-from ..optim.variability import (FVAOptimizer, TFVAOptimizer, EFVAOptimizer, 
-                                 ETFVAOptimizer, TVAOptimizer, ETVAOptimizer, 
-                                 EVAOptimizer, TEVAOptimizer)
+import numpy as np
+from .reaction import (Reaction, ReactantDict, DEFAULT_MW, DEFAULT_KCAT, 
+                       DEFAULT_KM, DEFAULT_DGPM)
+from .metabolite import MetaboliteRegistry
+from .index import IdIndex
 from ..io.results import PrettyDict
 from ..io.io import load_model, save_model
+from ..io.cache import ResultCache, make_key
+
+
+NULL_SPACE_TOL = 1e-10   # Entries of null space basis below it are set to zero
+
+
+def _cached_by_version(method):
+    '''
+    Cache results of a method taking the model version as the first argument 
+    on the model itself, so that the cache is freed along with the model. 
+    Results of earlier versions are dropped once the version changes.
+    '''
+
+    @wraps(method)
+    def wrapper(self, version, *args):
+        cache = self.__dict__.get('_cache')
+        if cache is None or cache[0] != version:
+            cache = self._cache = (version, {})
+
+        key = (method.__name__,) + args
+        if key not in cache[1]:
+            cache[1][key] = method(self, version, *args)
+
+        return cache[1][key]
+
+    return wrapper
+
+
+def _get_rref_null_space(mat, tol=NULL_SPACE_TOL):
+    '''
+    Return the basis of the null space of mat given by its reduced row 
+    echelon form, i.e., one basis vector for each free column, which is 
+    sparse and exact up to rounding for the integer-like stoichiometric 
+    coefficients, unlike the dense orthonormal basis from SVD.
+
+    Parameters
+    ----------
+    mat: array
+        Matrix whose null space is computed.
+    tol: float
+        Entries below it are taken as zero.
+    '''
+
+    mat = np.array(mat, dtype=float)
+    nrows, ncols = mat.shape
+
+    pivotCols = []
+    row = 0
+    for col in range(ncols):
+        if row == nrows:
+            break
+
+        pivot = row + np.argmax(np.abs(mat[row:, col]))
+        if abs(mat[pivot, col]) <= tol:
+            continue
+        mat[[row, pivot]] = mat[[pivot, row]]
+        mat[row] /= mat[row, col]
+
+        # eliminate the column from other rows, only over nonzero entries
+        factors = mat[:, col].copy()
+        factors[row] = 0
+        otherRows = np.flatnonzero(np.abs(factors) > tol)
+        rowCols = np.flatnonzero(mat[row])
+        block = (mat[np.ix_(otherRows, rowCols)] 
+                 - np.outer(factors[otherRows], mat[row, rowCols]))
+        block[np.abs(block) <= tol] = 0
+        mat[np.ix_(otherRows, rowCols)] = block
+
+        pivotCols.append(col)
+        row += 1
+
+    freeMask = np.ones(ncols, dtype=bool)
+    freeMask[pivotCols] = False
+    freeCols = np.flatnonzero(freeMask)
+
+    basis = np.zeros((ncols, freeCols.size))
+    basis[freeCols, np.arange(freeCols.size)] = 1
+    basis[pivotCols] = -mat[:len(pivotCols)][:, freeCols]
+    basis[np.abs(basis) < tol] = 0
+
+    return basis
 
 
 class Model():
@@ -26,6 +106,9 @@ class Model():
     end_metabolites : PrettyDict
         A dictionary mapping metabolite IDs to Metabolite objects representing 
         initial substrates or final products within the model.
+    end_metabolite_mask : array
+        Boolean array indicating end metabolites in the order of 
+        metabolite_index.
     stoichiometric_matrix : DataFrame
         Represents the stoichiometric matrix where rows correspond to metabolites 
         and columns correspond to net reactions. Negative values indicate 
@@ -37,6 +120,32 @@ class Model():
         while positive values denote products.
     transformation_matrix : DataFrame
         Matrix facilitating the conversion of total fluxes into net fluxes.
+    internal_null_space : DataFrame
+        Basis of the null space of the stoichiometric matrix of internal reactions 
+        (exchange and biomass formation reactions excluded), i.e., the internal 
+        cycles of the network. Rows correspond to internal reactions involved in 
+        at least one cycle and columns correspond to basis vectors, which are 
+        sparse, given by the reduced row echelon form.
+    metabolite_index : IdIndex
+        Positions of metabolites in rows of stoichiometric matrices.
+    reaction_index : IdIndex
+        Positions of reactions in columns of the stoichiometric matrix.
+    flux_index : IdIndex
+        Positions of total fluxes in columns of the total stoichiometric matrix.
+    metabolite_adjacency : csr_matrix
+        Stoichiometric matrix in the CSR format, i.e., row slices give 
+        reactions involving each metabolite.
+    reaction_adjacency : csc_matrix
+        Stoichiometric matrix in the CSC format, i.e., column slices give 
+        metabolites involved in each reaction.
+    metabolite_degrees : array
+        Number of reactions involving each metabolite.
+    reaction_degrees : array
+        Number of metabolites involved in each reaction.
+    version : int
+        Incremented whenever reactions are added or removed. Indices and 
+        matrices are built once per version, and shared by forks of the model 
+        until either is modified.
     '''
     
     def __init__(self, name=None):
@@ -51,6 +160,8 @@ class Model():
         
         self._metabolites = PrettyDict()
         self._reactions = PrettyDict()
+        self._registry = MetaboliteRegistry()
+        self._version = 0
         
     
     @classmethod
@@ -108,7 +219,9 @@ class Model():
             else:
                 coe, reacid = coe_reac
             
-            reac = self._metabolites.setdefault(reacid, Metabolite(reacid))
+            reac = self._metabolites.get(reacid)
+            if reac is None:
+                reac = self._metabolites[reacid] = self._registry.get(reacid)
             if label == 'substrate':
                 reac.coes[rxn.rxnid] = -float(coe)
             elif label == 'product':
@@ -140,6 +253,8 @@ class Model():
             Enzyme, Substrates, Products, Sub Kms (mM), Pro Kms (mM), 
             Fwd kcat (1/s), Bwd kcat (1/s), MW (kDa), and ΔrG'm (kJ/mol).
         '''
+
+        import pandas as pd
         
         data = pd.read_excel(
             filename, 
@@ -181,6 +296,8 @@ class Model():
             self._build_reactant(rxn, prosStr, prokms, 'product')
             
             self._reactions[rxnid] = rxn
+
+        self._bump_version()
     
     
     def add_reactions(self, reactions):
@@ -193,15 +310,71 @@ class Model():
 
         if not isinstance(reactions, Iterable):
             reactions = [reactions]
+        reactions = list(reactions)
+
+        self._check_reactants(reactions)
 
         for rxn in reactions:
             self._reactions[rxn.rxnid] = rxn
 
-            for subid in rxn.substrates:
-                self._metabolites[subid] = rxn.substrates[subid]
+            for reactants in [rxn._substrates, rxn._products]:
+                for metabid, metab in list(dict.items(reactants)):
+                    reactants[metabid] = self._intern_metabolite(metab, rxn)
+
+        self._bump_version()
 
-            for proid in rxn.products:
-                self._metabolites[proid] = rxn.products[proid]
+
+    def _check_reactants(self, reactions):
+        '''
+        Raise ValueError if reactants of reactions differ from metabolites with 
+        the same IDs in the model or in other reactions.
+
+        Parameters
+        ----------
+        reactions: list of Reactions
+            Reactions to be added into the model.
+        '''
+
+        keys = {}
+        for rxn in reactions:
+            for reactants in [rxn._substrates, rxn._products]:
+                for metabid, metab in dict.items(reactants):
+                    key = MetaboliteRegistry.get_key(metab)
+                    if metabid not in keys:
+                        interned = self._metabolites.get(metabid)
+                        keys[metabid] = (key if interned is None else 
+                                         MetaboliteRegistry.get_key(interned))
+                    if keys[metabid] != key:
+                        raise ValueError(
+                            f'metabolite {metabid} in {rxn.rxnid} differs '
+                            f'from the one with the same ID in the model'
+                        )
+
+
+    def _intern_metabolite(self, metab, rxn):
+        '''
+        Return the metabolite of the model identical to metab, which takes the 
+        stoichiometric coefficient and Km of metab in rxn if it is another 
+        instance.
+
+        Parameters
+        ----------
+        metab: Metabolite
+            Reactant of rxn.
+        rxn: Reaction
+            Reaction added into the model.
+        '''
+
+        interned = self._metabolites.get(metab.metabid)
+        if interned is None:
+            interned = self._registry.intern(metab)
+            self._metabolites[metab.metabid] = interned
+        
+        if interned is not metab:
+            interned.coes[rxn.rxnid] = metab.coes[rxn.rxnid]
+            interned.kms[rxn.rxnid] = metab.kms.get(rxn.rxnid)
+
+        return interned
 
 
     def remove_reactions(self, reactions):
@@ -214,15 +387,119 @@ class Model():
         
         if not isinstance(reactions, Iterable):
             reactions = [reactions]
+        reactions = list(reactions)
         
         for rxn in reactions:
             del self._reactions[rxn.rxnid]
 
-            for subid in rxn.substrates:
-                del self._metabolites[subid]
+        # metabolites still involved in other reactions are kept
+        for rxn in reactions:
+            for metabid in [*rxn._substrates, *rxn._products]:
+                metab = self._metabolites.get(metabid)
+                if metab is not None and not any(
+                    rxnid in self._reactions for rxnid in metab.coes
+                ):
+                    del self._metabolites[metabid]
+
+        self._bump_version()
+
+
+    def fork(self, name=None):
+        '''
+        Return a copy of the model which can be modified (e.g., kinetic and 
+        thermodynamic parameters, reactions) without affecting this model, 
+        e.g., to set up a scenario. Reactions and metabolites are copied 
+        shallowly, i.e., only their parameters and stoichiometric 
+        coefficients, while stoichiometric matrices, indices and the null 
+        space are shared with this model until reactions of either model are 
+        added or removed.
+
+        Parameters
+        ----------
+        name: str
+            Name of the fork. If None, the name of this model.
+        '''
+
+        forked = Model(self.name if name is None else name)
+
+        for metabid, metab in self._metabolites.items():
+            forkedMetab = copy(metab)
+            forkedMetab.coes = copy(metab.coes)
+            forkedMetab.kms = copy(metab.kms)
+            forked._metabolites[metabid] = forked._registry.intern(forkedMetab)
+
+        for rxnid, rxn in self._reactions.items():
+            forkedRxn = copy(rxn)
+            forkedRxn._substrates = ReactantDict(
+                (subid, forked._metabolites[subid]) for subid in rxn._substrates
+            )
+            forkedRxn._products = ReactantDict(
+                (proid, forked._metabolites[proid]) for proid in rxn._products
+            )
+            forked._reactions[rxnid] = forkedRxn
+
+        forked._version = self.version
+        forked._origin = (self, self.version)
+
+        return forked
+
 
-            for proid in rxn.products:
-                del self._metabolites[proid]
+    def _get_cache_owner(self):
+        '''
+        Return the model whose cached indices and matrices are used, i.e., the 
+        model this one was forked from if neither has been modified since.
+        '''
+
+        origin = getattr(self, '_origin', None)
+        if origin is not None:
+            model, version = origin
+            if self.version == version and model.version == version:
+                return model._get_cache_owner()
+            else:
+                self._origin = None
+
+        return self
+
+
+    def __getstate__(self):
+        # the model forked from and cached matrices are not pickled along 
+        # with the model, and the registry of weak references is rebuilt on 
+        # unpickling
+        state = self.__dict__.copy()
+        state.pop('_origin', None)
+        state.pop('_registry', None)
+        state.pop('_cache', None)
+
+        return state
+
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
+        self._registry = MetaboliteRegistry()
+        for metab in self._metabolites.values():
+            self._registry.intern(metab)
+
+
+    def get_metabolite(
+            self, 
+            metabid, 
+            name=None, 
+            compartment=None, 
+            *, 
+            is_h=False, 
+            is_h2o=False
+    ):
+        '''
+        Return the metabolite of the model with given attributes, created if 
+        not existing, so that reactions built with it share a single instance. 
+        The metabolite is added into the model along with its reactions. 
+        Parameters are the same as Metabolite.
+        '''
+
+        return self._registry.get(
+            metabid, name, compartment, is_h=is_h, is_h2o=is_h2o
+        )
 
 
     @property
@@ -241,29 +518,128 @@ class Model():
             return self._reactions
             
     
-    @lru_cache()
-    def _get_stoichiometric_matrix(self, metabolites, reactions):
+    @property
+    def version(self):
+        # models saved by earlier versions have no version
+        return getattr(self, '_version', 0)
+
+
+    def _bump_version(self):
+        self._version = self.version + 1
+
+
+    @_cached_by_version
+    def _get_indices(self, version):
+        '''
+        Parameters
+        ----------
+        version: int
+            Version of the model.
+        '''
+
+        metabIndex = IdIndex(sorted(self._metabolites))
+        rxnIndex = IdIndex(self._reactions.keys())
+
+        return metabIndex, rxnIndex
+
+
+    @staticmethod
+    def _map_fluxes(rxnids, reversibilities):
+        '''
+        Return the index of total fluxes (reversible reactions are split into 
+        forward and backward fluxes), and positions of reactions and signs 
+        (1 or -1) of total fluxes.
+
+        Parameters
+        ----------
+        rxnids: iterable
+            Reaction IDs.
+        reversibilities: iterable
+            Whether each reaction is reversible.
+        '''
+
+        fluxids = []
+        rxnPositions = []
+        signs = []
+        for pos, (rxnid, rev) in enumerate(zip(rxnids, reversibilities)):
+            if rev:
+                fluxids.extend([rxnid+'_f', rxnid+'_b'])
+                rxnPositions.extend([pos, pos])
+                signs.extend([1, -1])
+            else:
+                fluxids.append(rxnid)
+                rxnPositions.append(pos)
+                signs.append(1)
+
+        return (IdIndex(fluxids), np.array(rxnPositions, dtype=int), 
+                np.array(signs))
+
+
+    @_cached_by_version
+    def _get_flux_mapping(self, version):
+        '''
+        Parameters
+        ----------
+        version: int
+            Version of the model.
+        '''
+
+        return self._map_fluxes(
+            self._reactions.keys(), 
+            [rxn.rev for rxn in self._reactions.values()]
+        )
+
+
+    @property
+    def metabolite_index(self):
+        owner = self._get_cache_owner()
+
+        return owner._get_indices(owner.version)[0]
+
+
+    @property
+    def reaction_index(self):
+        owner = self._get_cache_owner()
+
+        return owner._get_indices(owner.version)[1]
+
+
+    @property
+    def flux_index(self):
+        owner = self._get_cache_owner()
+
+        return owner._get_flux_mapping(owner.version)[0]
+
+    
+    @_cached_by_version
+    def _get_stoichiometric_matrix(self, version):
         '''
         Parameters
         ----------
-        metabolites: tuple
-            A tuple of metabolite IDs.
-        reactions: tuple
-            A tuple of reaction IDs.
+        version: int
+            Version of the model.
         '''
+
+        import pandas as pd
         
-        stoyMat_net = pd.DataFrame(0.0, index=metabolites, columns=reactions)
-        for rxnid in self.reactions:
+        metabIndex, rxnIndex = self._get_indices(version)
+
+        stoyMat_net = np.zeros((len(metabIndex), len(rxnIndex)))
+        for col, rxn in enumerate(self._reactions.values()):
             
-            for metabid in self.reactions[rxnid].substrates:
-                sub_coe = -self.reactions[rxnid].substrates[metabid].coe
-                stoyMat_net.loc[metabid, rxnid] = sub_coe
+            for metabid in rxn.substrates:
+                row = metabIndex.get_position(metabid)
+                stoyMat_net[row, col] = -rxn.substrates[metabid].coe
                 
-            for metabid in self.reactions[rxnid].products:
-                pro_coe = self.reactions[rxnid].products[metabid].coe
-                stoyMat_net.loc[metabid, rxnid] = pro_coe
+            for metabid in rxn.products:
+                row = metabIndex.get_position(metabid)
+                stoyMat_net[row, col] = rxn.products[metabid].coe
                 
-        return stoyMat_net    
+        return pd.DataFrame(
+            stoyMat_net, 
+            index=metabIndex.ids, 
+            columns=rxnIndex.ids
+        )
     
     
     @property
@@ -274,42 +650,49 @@ class Model():
                 "no metabolite or reaction found, model empty"
             )
         
-        stoyMat_net = self._get_stoichiometric_matrix(
-            tuple(sorted(self._metabolites)), 
-            tuple(self._reactions.keys())
-        )
-            
-        return stoyMat_net
+        owner = self._get_cache_owner()
+
+        return owner._get_stoichiometric_matrix(owner.version)
             
     
-    @lru_cache()
-    def _get_total_stoichiometric_matrix(self, metabolites, reactions):
+    @_cached_by_version
+    def _get_total_stoichiometric_matrix(self, version):
         '''
         Parameters
         ----------
-        metabolites: tuple
-            A tuple of metabolite IDs.
-        reactions: tuple
-            A tuple of reaction IDs.
+        version: int
+            Version of the model.
         '''
 
-        stoyMat_net = self._get_stoichiometric_matrix(metabolites, reactions)
-        
-        stoyMat_total = []
-        total_rxnids = []
-        for rxnid, col in stoyMat_net.items():
-            if self.reactions[rxnid].rev:
-                stoyMat_total.append(col)
-                stoyMat_total.append(-col+0.0)
-                total_rxnids.append(rxnid+'_f')
-                total_rxnids.append(rxnid+'_b')
-            else:
-                stoyMat_total.append(col)
-                total_rxnids.append(rxnid)
+        return self._build_total_stoichiometric_matrix(
+            self._get_stoichiometric_matrix(version), 
+            self._get_flux_mapping(version)
+        )
+
+
+    @staticmethod
+    def _build_total_stoichiometric_matrix(stoy_mat_net, flux_mapping):
+        '''
+        Parameters
+        ----------
+        stoy_mat_net: df
+            Stoichiometric matrix of net fluxes.
+        flux_mapping: tuple
+            Index of total fluxes, positions of reactions and signs of total 
+            fluxes.
+        '''
+
+        import pandas as pd
+
+        fluxIndex, rxnPositions, signs = flux_mapping
         
-        stoyMat_total = pd.DataFrame(stoyMat_total, index=total_rxnids).T
+        stoyMat_total = stoy_mat_net.values[:, rxnPositions]*signs + 0.0
         
-        return stoyMat_total    
+        return pd.DataFrame(
+            stoyMat_total, 
+            index=stoy_mat_net.index, 
+            columns=fluxIndex.ids
+        )
     
     
     @property
@@ -320,38 +703,50 @@ class Model():
                 "no metabolite or reaction found, model empty"
             )
         
-        stoyMat_total = self._get_total_stoichiometric_matrix(
-            tuple(sorted(self._metabolites)), 
-            tuple(self._reactions.keys())
-        )
-            
-        return stoyMat_total    
+        owner = self._get_cache_owner()
+
+        return owner._get_total_stoichiometric_matrix(owner.version)
     
 
-    @lru_cache()
-    def _get_transformation_matrix(self, metabolites, reactions):
+    @_cached_by_version
+    def _get_transformation_matrix(self, version):
         '''
         Parameters
         ----------
-        metabolites: tuple
-            A tuple of metabolite IDs.
-        reactions: tuple
-            A tuple of reaction IDs.
+        version: int
+            Version of the model.
         '''
 
-        transMat = pd.DataFrame(
-            0, 
-            index=self.stoichiometric_matrix.columns,
-            columns=self.total_stoichiometric_matrix.columns
+        return self._build_transformation_matrix(
+            self._get_indices(version)[1], 
+            self._get_flux_mapping(version)
         )
-        for rxnid in transMat.index:
-            if self.reactions[rxnid].rev:
-                transMat.loc[rxnid, rxnid+'_f'] = 1
-                transMat.loc[rxnid, rxnid+'_b'] = -1
-            else:
-                transMat.loc[rxnid, rxnid] = 1
 
-        return transMat
+
+    @staticmethod
+    def _build_transformation_matrix(rxn_index, flux_mapping):
+        '''
+        Parameters
+        ----------
+        rxn_index: IdIndex
+            Index of reactions.
+        flux_mapping: tuple
+            Index of total fluxes, positions of reactions and signs of total 
+            fluxes.
+        '''
+
+        import pandas as pd
+
+        fluxIndex, rxnPositions, signs = flux_mapping
+
+        transMat = np.zeros((len(rxn_index), len(fluxIndex)), dtype=int)
+        transMat[rxnPositions, np.arange(len(fluxIndex))] = signs
+
+        return pd.DataFrame(
+            transMat, 
+            index=rxn_index.ids, 
+            columns=fluxIndex.ids
+        )
 
 
     @property
@@ -362,20 +757,183 @@ class Model():
                 "no metabolite or reaction found, model empty"
             )
 
-        transMat = self._get_transformation_matrix(
-            tuple(sorted(self._metabolites)), 
-            tuple(self._reactions.keys())
+        owner = self._get_cache_owner()
+
+        return owner._get_transformation_matrix(owner.version)
+
+    
+    @_cached_by_version
+    def _get_flux_structure(self, version, irr_reactions):
+        '''
+        Parameters
+        ----------
+        version: int
+            Version of the model.
+        irr_reactions: frozenset
+            IDs of irreversible reactions, other reactions are reversible.
+        '''
+
+        _, rxnIndex = self._get_indices(version)
+        fluxMapping = self._map_fluxes(
+            rxnIndex.ids, 
+            [rxnid not in irr_reactions for rxnid in rxnIndex.ids]
+        )
+
+        return (
+            fluxMapping[0],
+            self._build_total_stoichiometric_matrix(
+                self._get_stoichiometric_matrix(version), fluxMapping
+            ),
+            self._build_transformation_matrix(rxnIndex, fluxMapping)
         )
 
-        return transMat
+
+    def get_flux_structure(self, irr_reactions=None):
+        '''
+        Return the index of total fluxes, the total stoichiometric matrix and 
+        the transformation matrix with reversibilities overridden by 
+        irr_reactions. The model, including reversibilities of its reactions, 
+        is not modified, so that problems with different reversibilities can 
+        be built on the same model concurrently.
+
+        Parameters
+        ----------
+        irr_reactions: list
+            IDs of irreversible reactions, other reactions are taken as 
+            reversible. If None, reversibilities of reactions are used.
+        '''
+
+        owner = self._get_cache_owner()
+        
+        if irr_reactions is not None:
+            irr_reactions = frozenset(irr_reactions)
+            if any(rxn.rev == (rxnid in irr_reactions) 
+                   for rxnid, rxn in self._reactions.items()):
+                return owner._get_flux_structure(owner.version, irr_reactions)
+
+        return (self.flux_index, self.total_stoichiometric_matrix, 
+                self.transformation_matrix)
+
+
+    @_cached_by_version
+    def _get_internal_null_space(self, version):
+        '''
+        Parameters
+        ----------
+        version: int
+            Version of the model.
+        '''
+
+        import pandas as pd
+
+        stoyMat_net = self._get_stoichiometric_matrix(version)
+
+        intRxnIDs = [rxnid for rxnid in stoyMat_net.columns 
+                     if not self.reactions[rxnid].is_exch_reaction 
+                     and not self.reactions[rxnid].is_biomass_formation]
+        stoyMat_int = stoyMat_net[intRxnIDs].values
+
+        # reactions with a metabolite involved in no other internal reaction 
+        # carry no flux in internal cycles
+        inCycles = np.ones(len(intRxnIDs), dtype=bool)
+        while True:
+            nonzeros = stoyMat_int[:, inCycles] != 0
+            deadRows = nonzeros.sum(axis=1) == 1
+            deadCols = (stoyMat_int[deadRows] != 0).any(axis=0) & inCycles
+            if not deadCols.any():
+                break
+            inCycles &= ~deadCols
+
+        stoyMat_cyc = stoyMat_int[:, inCycles]
+        stoyMat_cyc = stoyMat_cyc[(stoyMat_cyc != 0).any(axis=1)]
+
+        nullSpace = pd.DataFrame(
+            _get_rref_null_space(stoyMat_cyc), 
+            index=[rxnid for rxnid, inCycle in zip(intRxnIDs, inCycles) 
+                   if inCycle]
+        )
+        
+        return nullSpace[~(nullSpace == 0).all(axis=1)]
+
+
+    @property
+    def internal_null_space(self):
+        if len(self._metabolites) == 0 and len(self._reactions) == 0:
+            raise AttributeError(
+                "can't compute internal null space, "
+                "no metabolite or reaction found, model empty"
+            )
+
+        owner = self._get_cache_owner()
+        nullSpace = owner._get_internal_null_space(owner.version)
+
+        return nullSpace
 
     
+    @_cached_by_version
+    def _get_adjacency(self, version):
+        '''
+        Return the stoichiometric matrix in CSR and CSC formats, numbers of 
+        reactions of metabolites and numbers of metabolites of reactions.
+
+        Parameters
+        ----------
+        version: int
+            Version of the model.
+        '''
+
+        # imported here to keep scipy out of the import of etfba
+        from scipy.sparse import csr_matrix
+
+        metabAdj = csr_matrix(self._get_stoichiometric_matrix(version).values)
+        rxnAdj = metabAdj.tocsc()
+        
+        return (metabAdj, rxnAdj, np.diff(metabAdj.indptr), 
+                np.diff(rxnAdj.indptr))
+
+
+    def _get_shared_adjacency(self):
+        if len(self._metabolites) == 0 and len(self._reactions) == 0:
+            raise AttributeError(
+                "can't compute adjacency, "
+                "no metabolite or reaction found, model empty"
+            )
+
+        owner = self._get_cache_owner()
+
+        return owner._get_adjacency(owner.version)
+
+
+    @property
+    def metabolite_adjacency(self):
+        return self._get_shared_adjacency()[0]
+
+
+    @property
+    def reaction_adjacency(self):
+        return self._get_shared_adjacency()[1]
+
+
+    @property
+    def metabolite_degrees(self):
+        return self._get_shared_adjacency()[2]
+
+
+    @property
+    def reaction_degrees(self):
+        return self._get_shared_adjacency()[3]
+
+
+    @property
+    def end_metabolite_mask(self):
+        return self.metabolite_degrees == 1
+
+
     @property
     def end_metabolites(self):
         endsDict = PrettyDict()
-        for metabid, row in self.stoichiometric_matrix.iterrows():
-            if row[row!=0].size == 1:
-                endsDict[metabid] = self.metabolites[metabid]
+        for metabid in self.metabolite_index.get_ids(self.end_metabolite_mask):
+            endsDict[metabid] = self._metabolites[metabid]
                 
         return endsDict
     
@@ -400,6 +958,17 @@ class Model():
             enz_prot_lb=1.0,
             parsimonious=False,
             slack=1e-3,
+            loopless=False,
+            dgpm_conf_level=None,
+            dgpm_error_basis=None,
+            kinetic_enz_cost=False,
+            lazy_thermo=False,
+            presolve=False,
+            solver_options=None,
+            time_limit=None,
+            mip_gap=None,
+            cache=None,
+            metrics_log=None
     ):
         '''
         Perform constraint-based optimization considering various constraints such 
@@ -451,7 +1020,8 @@ class Model():
             format "metabid:metabid". Valid in 'tfba' and 'etfba'.
         irr_reactions: list
             List of irreversible reaction IDs. irr_reactions is prioritized in 
-            defining reversibilities. Valid in 'fba', 'tfba', 'efba', and 'etfba'.
+            defining reversibilities, reactions of the model are not modified. 
+            Valid in 'fba', 'tfba', 'efba', and 'etfba'.
         ex_conc: list
             List of metabolite IDs excluded from optimization. Valid in 'tfba' and 
             'etfba'.
@@ -480,12 +1050,81 @@ class Model():
             (1-slack)*opt_obj. Considering adjusting slack if parsimonious 
             FBA encounters difficulties in finding feasible solutions. Valid in 
             'fba', 'tfba', 'efba' and 'etfba'.
+        loopless: bool
+            Whether to eliminate thermodynamically infeasible internal cycles 
+            using loop law constraints (ll-FBA). The null space of internal 
+            reactions is computed once and cached with the model, so no 
+            metabolite concentration variables are needed. If no flux in 
+            internal cycles is in the objective or bounded below by a positive 
+            value, cycles are instead removed from the optimum by a second LP 
+            (CycleFreeFlux) without any binary variable. Thermodynamic 
+            constraints in 'tfba' and 'etfba' already prevent such cycles. Valid 
+            in 'fba' and 'efba'.
+        dgpm_conf_level: float in (0, 1)
+            Confidence level of standard reaction Gibbs energies. If set, the 
+            uncertainty given by standard_gibbs_energy_error of reactions is 
+            taken into account with one error variable per reaction bounded by 
+            the confidence interval. Valid in 'tfba' and 'etfba'.
+        dgpm_error_basis: dict or DataFrame
+            Mapping of reaction IDs to rows of a low-rank square root Q of the 
+            covariance matrix of standard reaction Gibbs energies (cov = Q*Q^T), 
+            used to model correlated errors with one variable per column of Q. 
+            Reactions absent from the basis are assumed to have no error. Only 
+            used if dgpm_conf_level is set. Valid in 'tfba' and 'etfba'.
+        kinetic_enz_cost: bool
+            Whether to scale the kcat based enzyme cost of each reaction by 
+            substrate saturation, 1 + Km/c for each substrate, and thermodynamic 
+            reversibility, 1/(1 - exp(dG'/RT)), which is extended linearly in 
+            log scale beyond 100 near equilibrium. The cost is handled in log 
+            scale by outer approximation cuts at candidate solutions, added 
+            iteratively (mostly by LPs with flux directions fixed) until the 
+            cost is no longer underestimated. time_limit applies to all the 
+            iterations. Valid in 'etfba'.
+        lazy_thermo: bool
+            Whether to generate thermodynamic constraints lazily. The problem is 
+            first solved without thermodynamic constraints, then the 
+            thermodynamic feasibility of active fluxes is checked by a linear 
+            program over metabolite concentrations, and direction binaries and 
+            Gibbs energy constraints are added only for reactions involved in 
+            violations until the solution is feasible. Faster if most reaction 
+            directions are not bound by thermodynamics. Valid in 'tfba' and 
+            'etfba'.
+        presolve: bool
+            Whether to tighten flux bounds by propagating them through mass 
+            balance constraints and the enzyme protein cost constraint before 
+            solving. Fluxes implied to be zero are fixed and dropped from 
+            constraints, and the tighter upper bounds are used in big-M 
+            constraints of thermodynamics and loop law. Not supported by 
+            compile. Valid in 'fba', 'tfba', 'efba', and 'etfba'.
+        solver_options: dict
+            Options passed to the solver as is, e.g., {"Threads": 4} or 
+            {"FeasibilityTol": 1e-8} for gurobi.
+        time_limit: float
+            Time limit in seconds of each solver call. If reached, the best 
+            solution found so far is reported as unsuccessful.
+        mip_gap: float
+            Relative MIP gap at which the solver stops.
+        cache: ResultCache or str
+            Cache (or its directory) where results of solve are looked up and 
+            saved. Results are keyed by the model fingerprint, all arguments 
+            here and arguments of solve.
+        metrics_log: str
+            File where the timings of phases, problem size and solver 
+            statistics of each solve are appended as JSON lines. They are also 
+            available as the metrics of results.
         '''
         
+        optimArgs = {name: arg for name, arg in locals().items() 
+                     if name not in ('self', 'cache', 'metrics_log')}
         direction = 'max'
 
+        # optimizers (and pyomo with them) are imported on first use to keep 
+        # the import of etfba fast
+        from ..optim.optim import (FBAOptimizer, TFBAOptimizer, EFBAOptimizer, 
+                                   ETFBAOptimizer)
+
         if kind.lower() == 'fba':
-            return FBAOptimizer(
+            optimizer = FBAOptimizer(
                 self, 
                 objective, 
                 direction, 
@@ -495,11 +1134,12 @@ class Model():
                 irr_reactions, 
                 ex_mass_bal_cons,
                 parsimonious,
-                slack
+                slack,
+                loopless
             )
             
         elif kind.lower() == 'tfba':
-            return TFBAOptimizer(
+            optimizer = TFBAOptimizer(
                 self, 
                 objective, 
                 direction, 
@@ -516,7 +1156,9 @@ class Model():
                 ex_thermo_cons,
                 parsimonious,
                 slack, 
-                None
+                dgpm_conf_level,
+                dgpm_error_basis,
+                lazy_thermo
             )
         
         elif kind.lower() == 'efba':
@@ -528,7 +1170,7 @@ class Model():
                     'enz_prot_lb argument should be set for ETFBA'
                 )
             
-            return EFBAOptimizer(
+            optimizer = EFBAOptimizer(
                 self, 
                 objective, 
                 direction, 
@@ -540,7 +1182,8 @@ class Model():
                 inc_enz_cons, 
                 enz_prot_lb,
                 parsimonious,
-                slack
+                slack,
+                loopless
             ) 
 
         elif kind.lower() == 'etfba':
@@ -552,7 +1195,7 @@ class Model():
                     'enz_prot_lb argument should be set for ETFBA'
                 )    
 
-            return ETFBAOptimizer(
+            optimizer = ETFBAOptimizer(
                 self, 
                 objective, 
                 direction, 
@@ -571,13 +1214,22 @@ class Model():
                 enz_prot_lb,
                 parsimonious,
                 slack,
-                None
+                dgpm_conf_level,
+                dgpm_error_basis,
+                kinetic_enz_cost,
+                lazy_thermo
             )    
         
         else:
             raise ValueError(
                 'kind should be one of {"fba", "tfba", "efba", "etfba"}'
             )
+
+        optimizer.set_solver_options(solver_options, time_limit, mip_gap)
+        optimizer.metrics_log = metrics_log
+        optimizer.presolve = presolve
+
+        return self._attach_cache(optimizer, cache, optimArgs)
         
 
     def evaluate_variability(
@@ -600,6 +1252,13 @@ class Model():
             ex_thermo_cons=None,
             inc_enz_cons=None, 
             enz_prot_lb=1.0,
+            dgpm_conf_level=None,
+            dgpm_error_basis=None,
+            solver_options=None,
+            time_limit=None,
+            mip_gap=None,
+            cache=None,
+            metrics_log=None
     ):
         '''
         Perform variability analysis to assess the feasible range of derived 
@@ -667,8 +1326,9 @@ class Model():
             'teva'.
         irr_reactions: list of reaction ID
             List of irreversible reaction IDs. irr_reactions is prioritized in 
-            defining reversibilities. Valid in 'fva', 'tfva', 'efva', 'etfva', 
-            'tva', 'etva', 'eva', 'teva'.
+            defining reversibilities, reactions of the model are not modified. 
+            Valid in 'fva', 'tfva', 'efva', 'etfva', 'tva', 'etva', 'eva', 
+            'teva'.
         ex_conc: list of metabolite ID
             List of metabolite IDs excluded from optimization. Valid in 'tfva', 
             'etfva', 'tva', 'etva' and 'teva'.
@@ -686,10 +1346,45 @@ class Model():
         enz_prot_lb: float
             Upper bound of enzyme protein fraction in g/gCDW. Valid in 'etva', 
             'teva', 'efva' and 'etfva'.
+
+        dgpm_conf_level: float in (0, 1)
+            Confidence level of standard reaction Gibbs energies. If set, the 
+            uncertainty given by standard_gibbs_energy_error of reactions is 
+            taken into account. Valid in 'tfva', 'etfva', 'tva', 'etva' and 
+            'teva'.
+        dgpm_error_basis: dict or DataFrame
+            Mapping of reaction IDs to rows of a low-rank square root of the 
+            covariance matrix of standard reaction Gibbs energies, used to model 
+            correlated errors. Only used if dgpm_conf_level is set. Valid in 
+            'tfva', 'etfva', 'tva', 'etva' and 'teva'.
+        solver_options: dict
+            Options passed to the solver as is, e.g., {"Threads": 4} or 
+            {"FeasibilityTol": 1e-8} for gurobi.
+        time_limit: float
+            Time limit in seconds of estimating each bound of each item. If 
+            reached, the best bound found is reported and the item is recorded 
+            as timed out.
+        mip_gap: float
+            Relative MIP gap at which the solver stops.
+        cache: ResultCache or str
+            Cache (or its directory) where results of solve are looked up and 
+            saved. Results are keyed by the model fingerprint, all arguments 
+            here and arguments of solve.
+        metrics_log: str
+            File where the timings of phases, problem size and solver 
+            statistics of each solve are appended as JSON lines. They are also 
+            available as the metrics of results.
         '''
         
+        optimArgs = {name: arg for name, arg in locals().items() 
+                     if name not in ('self', 'cache', 'metrics_log')}
         direction = 'max'
 
+        from ..optim.variability import (FVAOptimizer, TFVAOptimizer, 
+                                         EFVAOptimizer, ETFVAOptimizer, 
+                                         TVAOptimizer, ETVAOptimizer, 
+                                         EVAOptimizer, TEVAOptimizer)
+
         if kind.lower() == 'tva':
             if obj_value is None:
                 raise ValueError(
@@ -697,7 +1392,7 @@ class Model():
                     'call optimize(kind = "tfba") first to get this value'
                 ) 
 
-            return TVAOptimizer( 
+            optimizer = TVAOptimizer( 
                 self, 
                 objective, 
                 direction,
@@ -714,7 +1409,8 @@ class Model():
                 ex_conc, 
                 ex_mass_bal_cons, 
                 ex_thermo_cons, 
-                None
+                dgpm_conf_level,
+                dgpm_error_basis
             )
 
         elif kind.lower() == 'etva':
@@ -730,7 +1426,7 @@ class Model():
             if enz_prot_lb is None:
                 raise TypeError('enz_prot_lb argument should be set for ETVA')
 
-            return ETVAOptimizer(
+            optimizer = ETVAOptimizer(
                 self, 
                 objective, 
                 direction,
@@ -749,7 +1445,8 @@ class Model():
                 ex_thermo_cons,
                 inc_enz_cons,
                 enz_prot_lb, 
-                None
+                dgpm_conf_level,
+                dgpm_error_basis
             )   
 
         elif kind.lower() == 'eva':
@@ -765,7 +1462,7 @@ class Model():
             if enz_prot_lb is None:
                 raise TypeError('enz_prot_lb argument should be set for EVA')
             
-            return EVAOptimizer(
+            optimizer = EVAOptimizer(
                 self,
                 objective, 
                 direction,
@@ -793,7 +1490,7 @@ class Model():
             if enz_prot_lb is None:
                 raise TypeError('enz_prot_lb argument should be set for TEVA')
             
-            return TEVAOptimizer(
+            optimizer = TEVAOptimizer(
                 self,
                 objective, 
                 direction,
@@ -812,7 +1509,8 @@ class Model():
                 ex_thermo_cons,
                 inc_enz_cons,
                 enz_prot_lb, 
-                None
+                dgpm_conf_level,
+                dgpm_error_basis
             )
 
         elif kind.lower() == 'fva':
@@ -822,7 +1520,7 @@ class Model():
                     'call optimize(kind = "fba") first to get this value'
                 )
             
-            return FVAOptimizer(
+            optimizer = FVAOptimizer(
                 self,
                 objective, 
                 direction,
@@ -842,7 +1540,7 @@ class Model():
                     'call optimize(kind = "tfba") first to get this value'
                 )
             
-            return TFVAOptimizer(
+            optimizer = TFVAOptimizer(
                 self, 
                 objective, 
                 direction,
@@ -859,7 +1557,8 @@ class Model():
                 ex_conc, 
                 ex_mass_bal_cons, 
                 ex_thermo_cons, 
-                None
+                dgpm_conf_level,
+                dgpm_error_basis
             )
         
         elif kind.lower() == 'efva':
@@ -877,7 +1576,7 @@ class Model():
                     'enz_prot_lb argument should be set for EFVA'
                 ) 
             
-            return EFVAOptimizer(
+            optimizer = EFVAOptimizer(
                 self,
                 objective, 
                 direction,
@@ -907,7 +1606,7 @@ class Model():
                     'enz_prot_lb argument should be set for ETFVA'
                 )
 
-            return ETFVAOptimizer(
+            optimizer = ETFVAOptimizer(
                 self, 
                 objective, 
                 direction,
@@ -926,8 +1625,272 @@ class Model():
                 ex_thermo_cons,
                 inc_enz_cons,
                 enz_prot_lb, 
-                None
+                dgpm_conf_level,
+                dgpm_error_basis
+            )
+
+        else:
+            raise ValueError(
+                'kind should be one of {"fva", "tfva", "efva", "etfva", "tva", '
+                '"etva", "eva", "teva"}'
             )
+        
+        optimizer.set_solver_options(solver_options, time_limit, mip_gap)
+        optimizer.metrics_log = metrics_log
+
+        return self._attach_cache(optimizer, cache, optimArgs)
+    
+
+    def compile(self, kind, **kwargs):
+        '''
+        Build the problem of optimize once as a template which is solved 
+        repeatedly with bounds of fluxes and concentrations overridden, e.g., 
+        template.solve({"preset_flux": {...}}).
+
+        Parameters
+        ----------
+        kind: {'fba', 'tfba', 'efba', 'etfba'}
+            Type of optimization to perform, see optimize.
+        kwargs: 
+            Arguments of optimize defining the structure of the problem and the 
+            default bounds.
+        '''
+
+        from ..optim.template import ProblemTemplate
+
+        return ProblemTemplate(self.optimize(kind, **kwargs))
+    
+
+    def scan(self, kind, scenarios, **kwargs):
+        '''
+        Perform a batch of optimizations of the same kind under different 
+        scenarios, e.g., media, pH values or kinetic parameters.
+
+        Parameters
+        ----------
+        kind: {'fba', 'tfba', 'efba', 'etfba'}
+            Type of optimization to perform, see optimize.
+        scenarios: dict
+            Mapping of scenario IDs (str) to dicts of arguments of optimize. 
+            Dict arguments (e.g., preset_flux) update those in kwargs, while 
+            others replace those in kwargs.
+        kwargs: 
+            Arguments of optimize shared by all scenarios.
+        '''
+
+        if kind.lower() not in ['fba', 'tfba', 'efba', 'etfba']:
+            raise ValueError(
+                'kind should be one of {"fba", "tfba", "efba", "etfba"}'
+            )
+
+        from ..optim.scan import ScanOptimizer
+
+        return ScanOptimizer(self, kind, scenarios, kwargs)
+    
+
+    def evaluate_knockouts(self, kind, knockouts=None, n_references=1, 
+                           **kwargs):
+        '''
+        Perform optimizations with reactions knocked out (fluxes fixed at 0).
+
+        The problem without knockouts is solved first as the reference. 
+        Knockouts whose reactions carry no flux in the reference optimum can 
+        not change the optimal objective, so they are not solved and the 
+        reference results are copied instead, which skips most knockouts of 
+        genome-scale models. Knockouts actually solved are reported by the 
+        solved attribute of the returned ScanResults. With parsimonious and a 
+        nonzero slack, the objectives of copied results are exact within slack.
+
+        Parameters
+        ----------
+        kind: {'fba', 'tfba', 'efba', 'etfba'}
+            Type of optimization to perform, see optimize.
+        knockouts: list or dict
+            List of reaction IDs knocked out one at a time, or mapping of 
+            knockout IDs (e.g., gene IDs) to lists of reaction IDs knocked out 
+            together. If None, all reactions except exchange and biomass 
+            formation reactions are knocked out one at a time.
+        n_references: int
+            Maximum number of reference optima. Alternative optima after the 
+            first minimize fluxes of reactions in knockouts not skipped yet 
+            with the objective within a relative 1e-6 of its optimum, which 
+            costs two solves each and skips more knockouts. Only one 
+            reference is used with parsimonious. If 0, all knockouts are 
+            solved.
+        kwargs: 
+            Arguments of optimize shared by all knockouts.
+        '''
+
+        if knockouts is None:
+            knockouts = [rxnid for rxnid, rxn in self.reactions.items() 
+                         if not rxn.is_exch_reaction 
+                         and not rxn.is_biomass_formation]
+        if not isinstance(knockouts, dict):
+            knockouts = {rxnid: [rxnid] for rxnid in knockouts}
+
+        # fluxes of reactions follow reversibilities overridden by 
+        # irr_reactions
+        fluxIndex = self.get_flux_structure(kwargs.get('irr_reactions'))[0]
+
+        scenarios = {}
+        for koid, rxnids in knockouts.items():
+            preset_flux = {}
+            for rxnid in rxnids:
+                if rxnid in fluxIndex:
+                    preset_flux[rxnid] = 0.0
+                elif rxnid+'_f' in fluxIndex and rxnid+'_b' in fluxIndex:
+                    preset_flux[rxnid+'_f'] = 0.0
+                    preset_flux[rxnid+'_b'] = 0.0
+                else:
+                    raise ValueError(
+                        f'reaction {rxnid} of knockout {koid} not found in '
+                        'the model'
+                    )
+            scenarios[koid] = {'preset_flux': preset_flux}
+
+        if kind.lower() not in ['fba', 'tfba', 'efba', 'etfba']:
+            raise ValueError(
+                'kind should be one of {"fba", "tfba", "efba", "etfba"}'
+            )
+
+        from ..optim.scan import KnockoutScanOptimizer
+
+        return KnockoutScanOptimizer(
+            self, kind, scenarios, kwargs, knockouts, n_references
+        )
+    
+
+    def compress(
+            self, 
+            *, 
+            flux_bound=(0, 1000), 
+            spec_flux_bound=None, 
+            preset_flux=None, 
+            irr_reactions=None, 
+            ex_mass_bal_cons=None, 
+            protected_reactions=None, 
+            protected_metabolites=None, 
+            lump=True, 
+            check_reversible=False, 
+            solver='glpk'
+    ):
+        '''
+        Return a ModelCompression whose model attribute is a smaller model 
+        with the same feasible fluxes, which can be solved in place of this 
+        model. Dead-end and blocked reactions (found by network topology and 
+        then linear programming) are removed, reversible reactions which can 
+        only carry flux forward are made irreversible (if check_reversible), 
+        and linear pathways, i.e., irreversible reactions linked by 
+        metabolites with exactly one producer and one consumer, are lumped 
+        into single reactions. Results of the compressed model are mapped back 
+        to reactions of this model by expand_results or expand_fluxes of the 
+        ModelCompression.
+
+        Lumping is exact for mass balance and enzyme protein cost constraints, 
+        while thermodynamic constraints are only applied to the overall Gibbs 
+        energy of lumped reactions, i.e., relaxed. Set lump to False for exact 
+        'tfba' and 'etfba'.
+
+        Parameters
+        ----------
+        flux_bound: 2-tuple
+            Lower and upper bounds of metabolic fluxes in mmol/gCDW/h, the same 
+            as optimize.
+        spec_flux_bound: dict
+            Mapping of flux IDs to their bounds (lb, ub), the same as optimize. 
+            Reactions with bounds specified are neither removed nor lumped.
+        preset_flux: dict
+            Mapping of flux IDs to fixed metabolic fluxes, the same as 
+            optimize. Reactions with fluxes preset are neither removed nor 
+            lumped.
+        irr_reactions: list
+            List of irreversible reaction IDs, the same as optimize.
+        ex_mass_bal_cons: list
+            List of metabolite IDs excluded from mass balance constraints, the 
+            same as optimize. 
+        protected_reactions: list
+            List of reaction IDs neither removed nor lumped, e.g., those in 
+            the objective.
+        protected_metabolites: list
+            List of metabolite IDs not lumped out.
+        lump: bool
+            Whether to lump linear pathways.
+        check_reversible: bool
+            Whether to check each direction of reversible reactions not 
+            blocked by dead ends by linear programming, which finds more 
+            reactions blocked or irreversible at the cost of one solve per 
+            direction.
+        solver: {"glpk", "gurobi", "highs"}
+            Solver used to find blocked reactions.
+        '''
+
+        from .compression import compress_model
+
+        return compress_model(
+            self, flux_bound, spec_flux_bound, preset_flux, irr_reactions, 
+            ex_mass_bal_cons, protected_reactions, protected_metabolites, 
+            lump, check_reversible, solver
+        )
+    
+
+    @staticmethod
+    def _attach_cache(optimizer, cache, optim_args):
+        '''
+        Parameters
+        ----------
+        optimizer: optimizer
+            Optimizer returned by optimize or evaluate_variability.
+        cache: ResultCache or str
+            Cache or its directory.
+        optim_args: dict
+            Arguments used to build the optimizer, which identify the problem 
+            in cache and checkpoint files.
+        '''
+
+        optimizer.optimArgs = optim_args
+        if cache is not None:
+            if isinstance(cache, str):
+                cache = ResultCache(cache)
+            optimizer.cache = cache
+
+        return optimizer
+
+
+    def fingerprint(self):
+        '''
+        Return a stable hash of the model content, i.e., reactions with their 
+        reactants, stoichiometric coefficients, kinetic and thermodynamic 
+        parameters, and metabolite properties. The hash changes whenever any 
+        of them is modified.
+        '''
+
+        content = []
+        for rxnid, rxn in self._reactions.items():
+            reacs = {}
+            for reacid in list(rxn.substrates) + list(rxn.products):
+                reac = self._metabolites[reacid]
+                reacs[reacid] = (
+                    reac.coes.get(rxnid), 
+                    reac.kms.get(rxnid), 
+                    reac.is_h, 
+                    reac.is_h2o
+                )
+            content.append((
+                rxnid, 
+                reacs, 
+                rxn.fkcat, 
+                rxn.bkcat, 
+                rxn.mw, 
+                rxn.dgpm, 
+                rxn.dgpm_error, 
+                rxn.rev, 
+                rxn.is_biomass_formation, 
+                rxn.is_exch_reaction, 
+                rxn.is_h_transport, 
+                rxn.is_h2o_transport
+            ))
+
+        return make_key(content)
     
 
     def __repr__(self):
@@ -1,6 +1,7 @@
 '''Difine the Reaction class.'''
 
 
+import warnings
 from collections.abc import Iterable
 from ..io.results import PrettyDict
 
@@ -61,7 +62,8 @@ class Reaction():
     is_h2o_transport: bool
         Indicates if it's a water transport reaction.
     is_constrained_by_thermodynamics: bool
-        Indicates if it's constrained by thermodynamics.
+        Deprecated, always False. Optimizers no longer modify the model, use 
+        the cstrRxnIDs attribute of the optimizer instead.
     '''
     
     def __init__(
@@ -131,8 +133,6 @@ class Reaction():
 
         self._substrates = ReactantDict()
         self._products = ReactantDict()
-        
-        self.is_constrained_by_thermodynamics = False
 
 
     def _add_reactants(self, coes, kms, label):
@@ -316,6 +316,19 @@ class Reaction():
     @reversible.setter
     def reversible(self, value):
         self.rev = value
+
+
+    @property
+    def is_constrained_by_thermodynamics(self):
+        warnings.warn(
+            'is_constrained_by_thermodynamics is deprecated and always False, '
+            'since optimizers no longer modify the model, use cstrRxnIDs of '
+            'the optimizer instead', 
+            DeprecationWarning, 
+            stacklevel=2
+        )
+
+        return False
     
         
     def __repr__(self):
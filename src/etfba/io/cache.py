@@ -0,0 +1,282 @@
+'''Define the on-disk cache of optimization results.'''
+
+
+import os
+import sys
+import json
+import hashlib
+import logging
+from functools import wraps
+from inspect import signature
+from pickle import dumps, loads
+from copy import copy
+import numpy as np
+
+
+DEFAULT_CACHE_SIZE = 2**30   # Default maximum size of cache directory in bytes
+CACHE_EXT = '.bin'
+NON_KEY_ARGS = ('self', 'n_jobs', 'threads', 'checkpoint', 'resume', 
+                'time_budget', 'executor')
+
+
+def _canonicalize(obj):
+    '''
+    Convert an object into a JSON serializable structure independent of the
+    order of dict and set items.
+
+    Parameters
+    ----------
+    obj: object
+        Object to convert.
+    '''
+
+    # objects can only be DataFrames or Series if pandas has been imported, 
+    # which is kept out of the import of etfba
+    pd = sys.modules.get('pandas')
+
+    if isinstance(obj, dict):
+        return sorted([str(key), _canonicalize(value)]
+                      for key, value in obj.items())
+    elif isinstance(obj, (set, frozenset)):
+        return sorted((_canonicalize(item) for item in obj), key=repr)
+    elif isinstance(obj, (list, tuple)):
+        return [_canonicalize(item) for item in obj]
+    elif pd is not None and isinstance(obj, pd.DataFrame):
+        return _canonicalize(obj.to_dict(orient='index'))
+    elif pd is not None and isinstance(obj, pd.Series):
+        return _canonicalize(obj.to_dict())
+    elif isinstance(obj, np.ndarray):
+        return _canonicalize(obj.tolist())
+    elif isinstance(obj, np.generic):
+        return _canonicalize(obj.item())
+    elif isinstance(obj, float):
+        return repr(obj)
+    elif obj is None or isinstance(obj, (bool, int, str)):
+        return obj
+    else:
+        return repr(obj)
+
+
+def make_key(*parts):
+    '''
+    Return a stable hash of parts.
+
+    Parameters
+    ----------
+    parts: objects
+        Objects composed of dicts, lists, tuples, sets, numbers, strings, and
+        pandas objects.
+    '''
+
+    content = json.dumps(_canonicalize(parts), separators=(',', ':'))
+
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+class ResultCache():
+    '''
+    On-disk cache of optimization results. Each entry is stored as a file
+    named by its key, along with the key and a checksum of the content which are
+    verified on hit. The least recently used entries are evicted once the total
+    size exceeds max_size.
+
+    Attributes
+    ----------
+    directory: str
+        Directory where entries are stored.
+    max_size: int
+        Maximum total size of entries in bytes.
+    '''
+
+    def __init__(self, directory, max_size=DEFAULT_CACHE_SIZE):
+        '''
+        Parameters
+        ----------
+        directory: str
+            Directory where entries are stored. Created if not exist.
+        max_size: int
+            Maximum total size of entries in bytes.
+        '''
+
+        self.directory = directory
+        self.max_size = max_size
+
+        os.makedirs(self.directory, exist_ok=True)
+
+
+    def _get_path(self, key):
+        return os.path.join(self.directory, key+CACHE_EXT)
+
+
+    def get(self, key):
+        '''
+        Return the cached result of key, or None if missing or corrupted.
+
+        Parameters
+        ----------
+        key: str
+            Key of the entry.
+        '''
+
+        path = self._get_path(key)
+        try:
+            with open(path, 'rb') as f:
+                entry = loads(f.read())
+
+            payload = entry['payload']
+            if (entry['key'] != key
+                or entry['digest'] != hashlib.sha256(payload).hexdigest()):
+                raise ValueError('verification failed')
+
+            result = loads(payload)
+
+        except FileNotFoundError:
+            return None
+
+        except Exception as e:
+            logging.warning(f'cache entry {key} discarded: {e}')
+            self.remove(key)
+            return None
+
+        os.utime(path)
+
+        return result
+
+
+    def put(self, key, result):
+        '''
+        Store the result under key and evict least recently used entries if the
+        cache exceeds its maximum size.
+
+        Parameters
+        ----------
+        key: str
+            Key of the entry.
+        result: object
+            Picklable result.
+        '''
+
+        payload = dumps(result)
+        entry = dumps({
+            'key': key,
+            'digest': hashlib.sha256(payload).hexdigest(),
+            'payload': payload
+        })
+
+        path = self._get_path(key)
+        tmpPath = f'{path}.{os.getpid()}.tmp'
+        with open(tmpPath, 'wb') as f:
+            f.write(entry)
+        os.replace(tmpPath, path)
+
+        self._evict()
+
+
+    def remove(self, key):
+        '''
+        Parameters
+        ----------
+        key: str
+            Key of the entry.
+        '''
+
+        try:
+            os.remove(self._get_path(key))
+        except FileNotFoundError:
+            pass
+
+
+    def clear(self):
+        for key in self.keys():
+            self.remove(key)
+
+
+    def keys(self):
+        return [os.path.splitext(filename)[0]
+                for filename in os.listdir(self.directory)
+                if filename.endswith(CACHE_EXT)]
+
+
+    @property
+    def size(self):
+        return sum(os.path.getsize(self._get_path(key)) for key in self.keys())
+
+
+    def _evict(self):
+        entries = []
+        for key in self.keys():
+            try:
+                stat = os.stat(self._get_path(key))
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, key))
+
+        totalSize = sum(size for _, size, _ in entries)
+        for _, size, key in sorted(entries):
+            if totalSize <= self.max_size:
+                break
+            self.remove(key)
+            totalSize -= size
+
+
+    def __repr__(self):
+        return (f'result cache at {self.directory} with {len(self.keys())} '
+                f'entries')
+
+
+def cached(solve):
+    '''
+    Decorate the solve method of optimizers so that results are looked up in
+    and saved to the cache attached to the optimizer. The key is built from the
+    model fingerprint, the optimizer class, arguments passed to the optimizer,
+    and arguments of solve (except those not affecting results, e.g., n_jobs
+    and checkpoint files). Incomplete results, e.g., those with items timed out, 
+    unsuccessful results, e.g., of infeasible problems, and results not proven 
+    optimal, e.g., stopped by time_limit or mip_gap, are not saved.
+    '''
+
+    solveSig = signature(solve)
+
+    @wraps(solve)
+    def wrapper(self, *args, **kwargs):
+        if getattr(self, 'cache', None) is None:
+            return solve(self, *args, **kwargs)
+
+        solveArgs = solveSig.bind(self, *args, **kwargs)
+        solveArgs.apply_defaults()
+        solveArgs = {name: arg for name, arg in solveArgs.arguments.items()
+                     if name not in NON_KEY_ARGS}
+
+        key = make_key(
+            self.model.fingerprint(),
+            self.__class__.__name__,
+            self.optimArgs,
+            solveArgs
+        )
+
+        result = self.cache.get(key)
+        if result is not None:
+            if hasattr(result, '_stoy_mat'):
+                result._stoy_mat = self.model.stoichiometric_matrix
+            return result
+
+        result = solve(self, *args, **kwargs)
+        # results of failed (e.g., infeasible) solves are not saved either
+        if (not getattr(result, 'is_complete', True) 
+            or not getattr(result, 'optimization_successful', True)):
+            return result
+        # nor are results of solves stopped by time limits or MIP gaps
+        if (hasattr(result, 'optimization_successful') 
+            and not self._optimization_optimal()):
+            return result
+
+        if hasattr(result, '_stoy_mat'):
+            stripped = copy(result)
+            stripped._stoy_mat = None
+            self.cache.put(key, stripped)
+        else:
+            self.cache.put(key, result)
+
+        return result
+
+    return wrapper
@@ -0,0 +1,151 @@
+'''Define the checkpoint file of long running analyses.'''
+
+
+import os
+import json
+import logging
+from base64 import b64encode, b64decode
+from pickle import dumps, loads
+
+
+class Checkpoint():
+    '''
+    Append-only record of completed items. The first line of the file is a
+    header holding the key of the problem, and each following line holds one
+    item as JSON with its ID and pickled value. Each line is written by a
+    single append, so the file can be shared by worker processes, and an
+    incomplete last line left by an interrupted run is skipped on loading.
+
+    Attributes
+    ----------
+    file: str
+        Path of the checkpoint file.
+    key: str
+        Key identifying the problem.
+    '''
+
+    def __init__(self, file, key):
+        '''
+        Parameters
+        ----------
+        file: str
+            Path of the checkpoint file.
+        key: str
+            Key identifying the problem, e.g., built by io.cache.make_key.
+        '''
+
+        self.file = file
+        self.key = key
+
+
+    def create(self, records=None):
+        '''
+        Create (or truncate) the file and write the header.
+
+        Parameters
+        ----------
+        records: dict
+            Mapping of item IDs to values which are written after the header.
+        '''
+
+        with open(self.file, 'w') as f:
+            f.write(json.dumps({'key': self.key})+'\n')
+
+        if records is not None:
+            for itemid, value in records.items():
+                self.write(itemid, value)
+
+
+    def write(self, itemid, value):
+        '''
+        Parameters
+        ----------
+        itemid: str
+            Item ID.
+        value: object
+            Picklable value of the item.
+        '''
+
+        line = json.dumps({
+            'id': str(itemid),
+            'value': b64encode(dumps(value)).decode()
+        })+'\n'
+
+        fd = os.open(self.file, os.O_WRONLY | os.O_APPEND | os.O_CREAT)
+        try:
+            os.write(fd, line.encode())
+        finally:
+            os.close(fd)
+
+
+    def load(self):
+        '''
+        Return the mapping of completed item IDs to values.
+        '''
+
+        with open(self.file) as f:
+            lines = f.read().splitlines()
+
+        if not lines or json.loads(lines[0]).get('key') != self.key:
+            raise ValueError(
+                f'checkpoint {self.file} was created for a different problem'
+            )
+
+        records = {}
+        for line in lines[1:]:
+            try:
+                entry = json.loads(line)
+                records[entry['id']] = loads(b64decode(entry['value']))
+            except Exception:
+                logging.warning(
+                    f'incomplete record in checkpoint {self.file} skipped'
+                )
+
+        return records
+
+
+    @classmethod
+    def open(cls, key, checkpoint=None, resume=None):
+        '''
+        Return the checkpoint to record items in and the completed items.
+
+        Parameters
+        ----------
+        key: str
+            Key identifying the problem.
+        checkpoint: str
+            File where completed items are recorded. If None, resume is used.
+        resume: str
+            File of a previous run whose completed items are skipped.
+        '''
+
+        records = {}
+        if resume is not None and os.path.exists(resume):
+            records = cls(resume, key).load()
+            logging.info(f'{len(records)} completed items loaded from {resume}')
+
+        file = checkpoint if checkpoint is not None else resume
+        if file is None:
+            return None, records
+
+        ckpt = cls(file, key)
+        if file != resume or not os.path.exists(file):
+            ckpt.create(records)
+        else:
+            ckpt._terminate_last_line()
+
+        return ckpt, records
+    
+
+    def _terminate_last_line(self):
+        '''
+        Terminate the incomplete last line left by an interrupted run so that 
+        new records start on their own lines.
+        '''
+
+        with open(self.file, 'rb+') as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    f.write(b'\n')
@@ -5,7 +5,6 @@ from os.path import splitext
 import re
 from pickle import dump, load
 from math import log, exp
-import pandas as pd
 
 
 def read_values(source, log_transform = False):
@@ -22,6 +21,8 @@ def read_values(source, log_transform = False):
     -------
     data: dict
     '''
+
+    import pandas as pd
     
     if isinstance(source, dict):
         data = source
@@ -75,6 +76,8 @@ def save_values(file, data, exp_transform=False):
     log_transform: bool
         Indicates whether to perform natural exponential transformation on the data.
     '''
+
+    import pandas as pd
     
     if exp_transform:
         data = {key: exp(value) for key, value in data.items()}
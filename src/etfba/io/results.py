@@ -2,6 +2,7 @@
 
 
 from math import exp
+import numpy as np
 from .io import save_values
 
 
@@ -52,9 +53,27 @@ class FBAResults:
         Dictionary mapping reaction ID to its optimal flux value.
     optimization_successful: bool
         Indicates whether the optimization process was successful.
+    shadow_prices: dict
+        Dictionary mapping metabolite ID to the dual value of its mass balance 
+        constraint.
+    reduced_costs: dict
+        Dictionary mapping flux ID (with "_f" and "_b" suffixes for reversible 
+        reactions) to its reduced cost.
+    metrics: dict
+        Timings in seconds of phases ("build", "translate", "solve", "extract" 
+        and "total"), problem size ("rows", "columns", "nonzeros" and 
+        "binaries") and solver statistics ("calls" and "nodes") of the solve.
     '''
     
-    def __init__(self, opt_obj, opt_fluxes, opt_success, stoy_mat):
+    def __init__(
+            self, 
+            opt_obj, 
+            opt_fluxes, 
+            opt_success, 
+            stoy_mat, 
+            shadow_prices=None, 
+            reduced_costs=None
+    ):
         '''
         Parameters
         ----------
@@ -67,12 +86,19 @@ class FBAResults:
             successful).
         stoy_mat: DataFrame
             Stoichiometric matrix.
+        shadow_prices: dict
+            Dictionary mapping metabolite ID to the dual value of its mass 
+            balance constraint.
+        reduced_costs: dict
+            Dictionary mapping flux ID to its reduced cost.
         '''
         
         self._opt_obj = opt_obj
         self._opt_fluxes = opt_fluxes
         self._opt_success = opt_success
         self._stoy_mat = stoy_mat
+        self._shadow_prices = shadow_prices
+        self._reduced_costs = reduced_costs
     
     
     @property
@@ -88,6 +114,34 @@ class FBAResults:
     @property
     def optimization_successful(self):
         return self._opt_success
+    
+
+    @property
+    def shadow_prices(self):
+        if self._shadow_prices is None:
+            raise ValueError(
+                'shadow prices are not available, call solve with '
+                'sensitivity=True'
+            )
+        
+        return PrettyDict(self._shadow_prices, ndigits=5)
+    
+
+    @property
+    def reduced_costs(self):
+        if self._reduced_costs is None:
+            raise ValueError(
+                'reduced costs are not available, call solve with '
+                'sensitivity=True'
+            )
+        
+        return PrettyDict(self._reduced_costs, ndigits=5)
+
+
+    @property
+    def metrics(self):
+        # results pickled before metrics were recorded have none
+        return getattr(self, '_metrics', {})
 
     
     def statement(self, metabid):
@@ -98,14 +152,82 @@ class FBAResults:
             Metabolite ID.
         '''
 
+        row = self._stoy_mat.loc[metabid].values
+        cols = np.flatnonzero(row)
+        rxnids = self._stoy_mat.columns[cols]
+        fluxes = self._get_flux_array(rxnids)
+
+        return self._get_statement(
+            rxnids, fluxes, np.arange(cols.size), row[cols]*fluxes
+        )
+    
+
+    def statements(self, metabids=None):
+        '''
+        Return statements of metabolites at once, computed by one sparse 
+        product of the stoichiometric matrix and fluxes.
+
+        Parameters
+        ----------
+        metabids: list
+            Metabolite IDs. If None, all metabolites.
+        '''
+
+        # imported here to keep scipy out of the import of etfba
+        from scipy.sparse import csr_matrix, diags
+
+        if metabids is None:
+            stoyMat = self._stoy_mat
+        else:
+            stoyMat = self._stoy_mat.loc[metabids]
+        rxnids = stoyMat.columns
+        fluxes = self._get_flux_array(rxnids)
+
+        # rates of metabolites (rows) produced (positive) or consumed 
+        # (negative) by reactions (columns)
+        rates = csr_matrix(csr_matrix(stoyMat.values)@diags(fluxes))
+        rates.eliminate_zeros()
+        rates.sort_indices()
+
+        statements = PrettyDict()
+        for row, metabid in enumerate(stoyMat.index):
+            start, end = rates.indptr[row], rates.indptr[row+1]
+            statements[metabid] = self._get_statement(
+                rxnids, fluxes, rates.indices[start:end], rates.data[start:end]
+            )
+
+        return statements
+
+
+    def _get_flux_array(self, rxnids):
+        return np.array([self._opt_fluxes[rxnid] for rxnid in rxnids], 
+                        dtype=float)
+
+
+    @staticmethod
+    def _get_statement(rxnids, fluxes, cols, rates):
+        '''
+        Parameters
+        ----------
+        rxnids: Index
+            Reaction IDs.
+        fluxes: array
+            Net fluxes of reactions in rxnids.
+        cols: array
+            Positions in rxnids of reactions producing or consuming the 
+            metabolite.
+        rates: array
+            Rates of the metabolite produced (positive) or consumed (negative) 
+            by reactions at cols.
+        '''
+
         productions = PrettyDict()
         consumptions = PrettyDict()
-        for rxnid in self._stoy_mat.columns[self._stoy_mat.loc[metabid, :] != 0]:
-            
-            if self._stoy_mat.loc[metabid, rxnid]*self._opt_fluxes[rxnid] > 0:
-                productions[rxnid] = self._opt_fluxes[rxnid]
-            elif self._stoy_mat.loc[metabid, rxnid]*self._opt_fluxes[rxnid] < 0:
-                consumptions[rxnid] = self._opt_fluxes[rxnid]
+        for col, rate in zip(cols, rates):
+            if rate > 0:
+                productions[rxnids[col]] = float(fluxes[col])
+            elif rate < 0:
+                consumptions[rxnids[col]] = float(fluxes[col])
 
         return PrettyDict({
             'productions': productions, '\nconsumptions': consumptions
@@ -202,6 +324,8 @@ class EFBAResults(FBAResults):
         Optimal total enzyme protein cost achieved.
     opt_enzyme_costs: dict
         Dictionary mapping reaction ID to its optimal enzyme protein abundance.
+    enzyme_cost_shadow_price: float
+        Dual value of the enzyme protein cost constraint.
     '''
 
     def __init__(
@@ -212,6 +336,7 @@ class EFBAResults(FBAResults):
             opt_epcs, 
             opt_success, 
             stoy_mat,
+            epc_shadow_price=None,
             **kwargs
     ):
         '''
@@ -230,6 +355,8 @@ class EFBAResults(FBAResults):
             (False).
         stoy_mat: DataFrame
             Stoichiometric matrix.
+        epc_shadow_price: float
+            Dual value of the enzyme protein cost constraint.
         '''
 
         super().__init__(
@@ -242,6 +369,7 @@ class EFBAResults(FBAResults):
 
         self._opt_total_epc = opt_total_epc
         self._opt_epcs = opt_epcs
+        self._epc_shadow_price = epc_shadow_price
 
 
     @property
@@ -254,6 +382,39 @@ class EFBAResults(FBAResults):
         return PrettyDict(self._opt_epcs, ndigits=5)   
     
 
+    @property
+    def enzyme_cost_shadow_price(self):
+        if self._epc_shadow_price is None:
+            raise ValueError(
+                'shadow prices are not available, call solve with '
+                'sensitivity=True'
+            )
+        
+        return self._epc_shadow_price
+    
+
+    def flux_control_coefficients(self):
+        '''
+        Estimate flux control coefficients of enzymes on the objective, i.e., 
+        the relative change of the objective per relative change of kcat (or 
+        enzyme level). Increasing the kcat of enzyme j by a fraction saves 
+        epc_j times that fraction of protein, so the coefficient is 
+        |lambda|*epc_j/obj, where lambda is the shadow price of the enzyme 
+        protein cost constraint. The estimate is first-order and only holds 
+        while the set of active constraints (and directions) does not change.
+        '''
+
+        if self._opt_obj == 0:
+            raise ValueError(
+                'flux control coefficients are undefined for zero objective'
+            )
+
+        fccs = {rxnid: abs(self.enzyme_cost_shadow_price)*epc/self._opt_obj 
+                for rxnid, epc in self._opt_epcs.items()}
+        
+        return PrettyDict(fccs, ndigits=5)
+    
+
 class ETFBAResults(TFBAResults, EFBAResults):
     '''
     Attributes
@@ -270,7 +431,8 @@ class ETFBAResults(TFBAResults, EFBAResults):
             opt_total_epc, 
             opt_epcs, 
             opt_success,
-            stoy_mat
+            stoy_mat,
+            **kwargs
     ):
         '''
         Parameters
@@ -303,7 +465,8 @@ class ETFBAResults(TFBAResults, EFBAResults):
             opt_total_epc=opt_total_epc, 
             opt_epcs=opt_epcs,
             opt_success=opt_success,
-            stoy_mat=stoy_mat
+            stoy_mat=stoy_mat,
+            **kwargs
         )
         
 
@@ -315,9 +478,28 @@ class VariabilityResults():
         Objective value obtained from TFBA, EFBA, or ETFBA analysis.
     gamma: float
         Control parameter for the objective value.
+    status_table: DataFrame
+        Status of the lower ("min") and upper ("max") bound of each item, with
+        columns of status ("optimal", "time_limit", "infeasible", "unbounded" 
+        or "error"), value reported in the range, best bound found by the 
+        solver, relative gap, solver name and number of attempts.
+    timed_out: dict
+        Dictionary mapping IDs of items which reached the time limit to the 
+        bounds ("min", "max") reported as the best bounds found.
+    failed: dict
+        Dictionary mapping IDs of items which could not be solved to the 
+        failed bounds ("min", "max"), which are reported as nan.
+    unfinished: list
+        IDs of items left unsolved when the time budget ran out.
+    is_complete: bool
+        Whether all bounds of all items were solved to optimality.
+    metrics: dict
+        Timings, problem size and solver statistics of the analysis, see 
+        FBAResults. Timings and statistics of parallel workers are summed.
     '''
 
-    def __init__(self, obj_value, gamma, ranges):
+    def __init__(self, obj_value, gamma, ranges, statuses=None, 
+                 unfinished=None):
         '''
         Parameters
         ----------
@@ -330,11 +512,18 @@ class VariabilityResults():
         ranges: dict
             Dictionary containing reaction ID mapped to its corresponding flux 
             ranges [lb, ub].
+        statuses: dict
+            Dictionary mapping item IDs to dicts of status records of the 
+            "min" and "max" bounds.
+        unfinished: list
+            IDs of items left unsolved.
         '''
         
         self._obj_value = obj_value
         self._gamma = gamma
         self._ranges = ranges
+        self._statuses = {} if statuses is None else statuses
+        self._unfinished = [] if unfinished is None else unfinished
 
 
     @property
@@ -347,6 +536,62 @@ class VariabilityResults():
         return self._gamma
     
 
+    @property
+    def status_table(self):
+        import pandas as pd
+
+        records = {(itemid, bound): itemStatus[bound] 
+                   for itemid, itemStatus in self._statuses.items() 
+                   for bound in ['min', 'max']}
+        
+        return pd.DataFrame.from_dict(
+            records, 
+            orient='index', 
+            columns=['status', 'value', 'bound', 'gap', 'solver', 'attempts']
+        )
+    
+
+    def _get_bounds_with_status(self, statuses):
+        bounds = {}
+        for itemid, itemStatus in self._statuses.items():
+            selBounds = [bound for bound in ['min', 'max'] 
+                         if itemStatus[bound]['status'] in statuses]
+            if selBounds:
+                bounds[itemid] = selBounds
+
+        return bounds
+
+
+    @property
+    def timed_out(self):
+        return self._get_bounds_with_status(['time_limit'])
+    
+
+    @property
+    def failed(self):
+        return self._get_bounds_with_status(['infeasible', 'error'])
+    
+
+    @property
+    def unfinished(self):
+        return list(self._unfinished)
+    
+
+    @property
+    def is_complete(self):
+        return (
+            not self._unfinished 
+            and not self._get_bounds_with_status(
+                ['time_limit', 'infeasible', 'unbounded', 'error']
+            )
+        )
+
+
+    @property
+    def metrics(self):
+        return getattr(self, '_metrics', {})
+    
+
 class FVAResults(VariabilityResults):
     '''
     Attributes
@@ -389,4 +634,83 @@ class EVAResults(VariabilityResults):
 
     @property
     def protein_cost_ranges(self):
-        return PrettyDict(self._ranges)
\ No newline at end of file
+        return PrettyDict(self._ranges)    
+
+
+class ScanResults():
+    '''
+    Attributes
+    ----------
+    results: dict
+        Dictionary mapping scenario ID to its optimization results (None if the 
+        optimization failed).
+    opt_objectives: dict
+        Dictionary mapping scenario ID to its optimal objective value (None if 
+        the optimization failed).
+    optimization_successful: dict
+        Dictionary mapping scenario ID to whether its optimization was 
+        successful.
+    unfinished: list
+        IDs of scenarios left unsolved when the time budget ran out.
+    solved: list
+        IDs of scenarios actually solved, the others with results are copied 
+        from reference solutions (see Model.evaluate_knockouts).
+    is_complete: bool
+        Whether all scenarios were solved.
+    '''
+
+    def __init__(self, results, unfinished=None, solved=None):
+        '''
+        Parameters
+        ----------
+        results: dict
+            Dictionary mapping scenario ID to its optimization results.
+        unfinished: list
+            IDs of scenarios left unsolved.
+        solved: list
+            IDs of scenarios actually solved. If None, all with results.
+        '''
+
+        self._results = results
+        self._unfinished = [] if unfinished is None else unfinished
+        self._solved = list(results) if solved is None else solved
+
+
+    def __getitem__(self, scenid):
+        return self._results[scenid]
+    
+
+    @property
+    def results(self):
+        return dict(self._results)
+
+
+    @property
+    def opt_objectives(self):
+        return PrettyDict({
+            scenid: None if res is None else res.opt_objective 
+            for scenid, res in self._results.items()
+        })
+    
+
+    @property
+    def optimization_successful(self):
+        return PrettyDict({
+            scenid: res is not None and res.optimization_successful 
+            for scenid, res in self._results.items()
+        })
+    
+
+    @property
+    def unfinished(self):
+        return list(self._unfinished)
+    
+
+    @property
+    def solved(self):
+        return list(self._solved)
+    
+
+    @property
+    def is_complete(self):
+        return not self._unfinished
@@ -0,0 +1,215 @@
+'''Define the process pool running solves for asyncio applications.'''
+
+
+import os
+import atexit
+import asyncio
+import traceback
+import dill
+from multiprocess import Process, Pipe
+
+
+def _worker_loop(conn):
+    '''
+    Run functions received from conn and send back (success, result) until
+    an empty message is received.
+    '''
+
+    while True:
+        try:
+            payload = conn.recv_bytes()
+        except EOFError:
+            return
+        if not payload:
+            return
+
+        try:
+            func, args, kwargs = dill.loads(payload)
+            result = (True, func(*args, **kwargs))
+        except Exception:
+            result = (False, traceback.format_exc())
+        conn.send_bytes(dill.dumps(result))
+
+
+class _Worker():
+
+    def __init__(self):
+        self.conn, childConn = Pipe()
+        self.process = Process(target=_worker_loop, args=(childConn,))
+        self.process.start()
+        childConn.close()
+
+
+    def stop(self):
+        try:
+            self.conn.send_bytes(b'')
+        except OSError:
+            pass
+        self.process.join(timeout=1)
+        self.terminate()
+
+
+    def terminate(self):
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self.conn.close()
+
+
+class AsyncSolverPool():
+    '''
+    Pool of worker processes where solves are awaited without blocking the event
+    loop. Workers are started lazily and reused across requests. Cancelling a
+    request terminates the worker running it, which is replaced by a new one.
+
+    Attributes
+    ----------
+    max_workers: int
+        Maximum number of worker processes.
+    max_concurrency: int
+        Maximum number of requests admitted at a time, including those waiting
+        for a worker. Further requests wait until one finishes.
+    '''
+
+    def __init__(self, max_workers=None, max_concurrency=None):
+        '''
+        Parameters
+        ----------
+        max_workers: int
+            Maximum number of worker processes. If None, the CPU count.
+        max_concurrency: int
+            Maximum number of requests admitted at a time. If None, unlimited.
+        '''
+
+        self.max_workers = os.cpu_count() if max_workers is None else max_workers
+        self.max_concurrency = max_concurrency
+
+        self._idle = []
+        self._nWorkers = 0
+        self._loop = None
+        self._workerAvailable = None
+        self._admission = None
+        self._closed = False
+
+
+    def _init_sync_primitives(self):
+        # asyncio primitives are bound to the loop they are used in
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._workerAvailable = asyncio.Condition()
+            if self.max_concurrency is not None:
+                self._admission = asyncio.Semaphore(self.max_concurrency)
+
+
+    async def _acquire(self):
+        async with self._workerAvailable:
+            while not self._idle and self._nWorkers >= self.max_workers:
+                await self._workerAvailable.wait()
+
+            if self._idle:
+                return self._idle.pop()
+            self._nWorkers += 1
+
+        try:
+            return _Worker()
+        except BaseException:
+            await self._discard(None)
+            raise
+
+
+    async def _release(self, worker):
+        async with self._workerAvailable:
+            if self._closed:
+                worker.stop()
+            else:
+                self._idle.append(worker)
+            self._workerAvailable.notify()
+
+
+    async def _discard(self, worker):
+        if worker is not None:
+            worker.terminate()
+        async with self._workerAvailable:
+            self._nWorkers -= 1
+            self._workerAvailable.notify()
+
+
+    async def _run(self, payload):
+        loop = asyncio.get_running_loop()
+
+        worker = await self._acquire()
+        try:
+            await loop.run_in_executor(None, worker.conn.send_bytes, payload)
+            success, result = dill.loads(
+                await loop.run_in_executor(None, worker.conn.recv_bytes)
+            )
+        except BaseException:
+            await self._discard(worker)
+            raise
+        await self._release(worker)
+
+        if not success:
+            raise RuntimeError(f'solve failed in worker:\n{result}')
+
+        return result
+
+
+    async def run(self, func, *args, **kwargs):
+        '''
+        Run func(*args, **kwargs) in a worker process and return its result.
+
+        Parameters
+        ----------
+        func: callable
+            Function picklable by dill, e.g., the bound solve method of an
+            optimizer.
+        args, kwargs:
+            Arguments of func.
+        '''
+
+        if self._closed:
+            raise ValueError('pool is closed')
+        self._init_sync_primitives()
+
+        payload = dill.dumps((func, args, kwargs))
+
+        if self._admission is None:
+            return await self._run(payload)
+        async with self._admission:
+            return await self._run(payload)
+
+
+    def close(self):
+        '''
+        Stop idle workers. Busy workers are stopped once their requests finish.
+        '''
+
+        self._closed = True
+        while self._idle:
+            self._idle.pop().stop()
+
+
+    async def __aenter__(self):
+        return self
+
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+
+_defaultPool = None
+
+
+def get_default_pool():
+    '''
+    Return the pool shared by solve_async calls without a pool, which is
+    created on first use with one worker per CPU.
+    '''
+
+    global _defaultPool
+    if _defaultPool is None or _defaultPool._closed:
+        _defaultPool = AsyncSolverPool()
+        atexit.register(_defaultPool.close)
+
+    return _defaultPool
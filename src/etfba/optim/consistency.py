@@ -0,0 +1,268 @@
+'''Define the class for finding blocked reactions.'''
+
+
+import numpy as np
+from pyomo.environ import Var, Objective, Constraint, value, maximize
+from .optim import FBAOptimizer, FLUX_TOL
+
+
+class ConsistencyOptimizer(FBAOptimizer):
+    '''
+    Find directions of reactions which can not carry net flux under the
+    constraints of mass balance and flux bounds (i.e., blocked).
+
+    Directions involving dead-end metabolites, i.e., metabolites which can not
+    be both produced and consumed, are blocked first by network topology.
+    Irreversible reactions are then scored by their fluxes capped at 1, and
+    the sum of scores is maximized. Reactions with positive scores are
+    unblocked and their scores are fixed to 0 before the next solve, until no
+    unblocked reaction is found, so that the rest are blocked. The persistent
+    solvers only update bounds in between. Blocked irreversible reactions are
+    then propagated to dead ends again, which blocks most of the reversible
+    reactions blocked. The directions of reversible reactions left which
+    carry no net flux in any solution are optionally checked one at a time by
+    maximizing their net fluxes, otherwise they are taken as unblocked.
+    '''
+
+    def __init__(
+            self,
+            model,
+            flux_bound,
+            spec_flux_bound,
+            preset_flux,
+            irr_reactions,
+            ex_mass_bal_cons,
+            directions
+    ):
+        '''
+        Parameters
+        ----------
+        model: Model
+            The model that calls ConsistencyOptimizer.
+        flux_bound : tuple
+            Lower and upper bounds of metabolic flux.
+        spec_flux_bound : dict
+            Mapping of reaction IDs to their specific flux bounds (lb, ub).
+        preset_flux : dict
+            Mapping of reaction IDs to fixed metabolic fluxes.
+        irr_reactions : list
+            List of irreversible reaction IDs.
+        ex_mass_bal_cons : list
+            List of metabolites excluded from mass balance constraints.
+        directions : list
+            List of (reaction ID, 1 or -1) tuples, directions to check, with 1
+            for forward and -1 for backward.
+        '''
+
+        super().__init__(
+            model=model,
+            objective={},
+            direction='max',
+            flux_bound=flux_bound,
+            spec_flux_bound=spec_flux_bound,
+            preset_flux=preset_flux,
+            irr_reactions=irr_reactions,
+            ex_mass_bal_cons=ex_mass_bal_cons,
+            parsimonious=False,
+            slack=0
+        )
+
+        self.directions = list(directions)
+        self.scored = [idx for idx, (rxnid, _) in enumerate(self.directions)
+                       if not self._is_reversible(rxnid)]
+
+
+    def _get_net_flux(self, model, rxnid):
+        if self._is_reversible(rxnid):
+            return model.fluxes[rxnid+'_f'] - model.fluxes[rxnid+'_b']
+        else:
+            return model.fluxes[rxnid]
+
+
+    def _block_dead_ends(self, allowed):
+        '''
+        Remove directions blocked by dead-end metabolites from allowed until 
+        no more direction is blocked.
+
+        Parameters
+        ----------
+        allowed: dict
+            Mapping of reaction positions to sets of directions (1 or -1) 
+            which may carry flux. Modified in place.
+        '''
+
+        metabAdj = self.model.metabolite_adjacency
+        rxnAdj = self.model.reaction_adjacency
+
+        queue = set(np.flatnonzero(self.cstrMetabMask).tolist())
+        while queue:
+            row = queue.pop()
+            start, end = metabAdj.indptr[row], metabAdj.indptr[row+1]
+            cols = metabAdj.indices[start:end]
+            coes = metabAdj.data[start:end]
+
+            producers = set()
+            consumers = set()
+            for col, coe in zip(cols, coes):
+                for sign in allowed.get(col, ()):
+                    if coe*sign > 0:
+                        producers.add(col)
+                    else:
+                        consumers.add(col)
+
+            # a reversible reaction alone can not both produce and consume
+            if producers and consumers and len(producers | consumers) > 1:
+                continue
+
+            for col in cols:
+                if allowed.get(col):
+                    allowed[col].clear()
+                    start, end = rxnAdj.indptr[col], rxnAdj.indptr[col+1]
+                    queue.update(
+                        row for row in rxnAdj.indices[start:end].tolist() 
+                        if self.cstrMetabMask[row]
+                    )
+
+
+    def _get_allowed(self, candidates):
+        allowed = {}
+        for idx in candidates:
+            rxnid, sign = self.directions[idx]
+            allowed.setdefault(
+                self.rxnIndex.get_position(rxnid), set()
+            ).add(sign)
+
+        return allowed
+
+
+    def _filter_dead_ends(self, candidates):
+        '''
+        Return candidate directions not blocked by dead-end metabolites.
+
+        Parameters
+        ----------
+        candidates: set
+            Indices of directions not found blocked yet.
+        '''
+
+        allowed = self._get_allowed(candidates)
+        self._block_dead_ends(allowed)
+
+        return {idx for idx in candidates 
+                if self.directions[idx][1] 
+                in allowed[self.rxnIndex.get_position(self.directions[idx][0])]}
+
+
+    def _build_score_variables(self):
+        self.pyoModel.scores = Var(self.scored, bounds=(0, 1))
+
+        def score_rule(model, idx):
+            rxnid, _ = self.directions[idx]
+            return model.scores[idx] <= model.fluxes[rxnid]
+
+        self.pyoModel.SCOREcstrs = Constraint(self.scored, rule=score_rule)
+
+
+    def _build_objective(self):
+        def obj_rule(model):
+            return sum(model.scores[idx] for idx in self.scored)
+
+        self.pyoModel.obj = Objective(rule=obj_rule, sense=maximize)
+
+
+    def _build_direction_objective(self, idx):
+        rxnid, sign = self.directions[idx]
+
+        def obj_rule(model):
+            return sign*self._get_net_flux(model, rxnid)
+
+        self.pyoModel.obj = Objective(rule=obj_rule, sense=maximize)
+
+
+    def _build_problem(self):
+        self._build_flux_variables()
+        self._build_mass_balance_contraints()
+        self._build_score_variables()
+        self._build_objective()
+
+
+    def _solve_for_unblocked(self, sol, candidates):
+        '''
+        Solve the problem and return the set of candidate directions carrying
+        net flux in the solution.
+
+        Parameters
+        ----------
+        sol: solver
+            Solver returned by _get_solver.
+        candidates: set
+            Indices of directions not found unblocked yet.
+        '''
+
+        self.res = self._run_solver(sol)
+        if not self._optimization_successful():
+            raise ValueError(
+                'failed to find blocked reactions, the problem is infeasible '
+                'under the given flux bounds'
+            )
+
+        unblocked = set()
+        for idx in candidates:
+            rxnid, sign = self.directions[idx]
+            if sign*value(self._get_net_flux(self.pyoModel, rxnid)) > FLUX_TOL:
+                unblocked.add(idx)
+
+        return unblocked
+
+
+    def find_blocked(self, solver='glpk', check_reversible=False):
+        '''
+        Return the set of blocked directions in the form of (reaction ID, 1 or
+        -1) tuples.
+
+        Parameters
+        ----------
+        solver: {"glpk", "gurobi", "highs"}
+            Solver name.
+        check_reversible: bool
+            Whether to check directions of reversible reactions not blocked by 
+            dead ends one at a time, which takes one solve per direction. If 
+            False, they are taken as unblocked.
+        '''
+
+        unblocked = self._filter_dead_ends(set(range(len(self.directions))))
+        candidates = set(unblocked)
+        if candidates:
+            self._build_problem()
+            sol = self._get_solver(solver)
+
+        while candidates:
+            found = self._solve_for_unblocked(sol, candidates)
+            candidates.difference_update(found)
+
+            foundScored = found.intersection(self.scored)
+            if not foundScored:
+                break
+            for idx in foundScored:
+                self.pyoModel.scores[idx].fix(0)
+
+        # scores of irreversible reactions are exact, while net fluxes of 
+        # reversible reactions can not be scored without forcing directions
+        unblocked.difference_update(candidates.intersection(self.scored))
+        unblocked = self._filter_dead_ends(unblocked)
+        if check_reversible:
+            candidates.intersection_update(unblocked)
+        else:
+            candidates.clear()
+
+        for idx in sorted(candidates):
+            if idx not in candidates:
+                continue
+            self._remove_objective()
+            self._build_direction_objective(idx)
+            candidates.difference_update(
+                self._solve_for_unblocked(sol, candidates)
+            )
+
+        return {self.directions[idx] for idx in range(len(self.directions)) 
+                if idx not in unblocked or idx in candidates}
@@ -0,0 +1,356 @@
+'''Define executors which run chunks of variability analyses and scans in
+parallel.
+
+Workers of QueueExecutor on other nodes are started by:
+python -m etfba.optim.worker HOST:PORT
+with the authentication key of the executor in the ETFBA_AUTHKEY environment
+variable (hex encoded).
+'''
+
+
+import os
+import sys
+import time
+import queue
+import logging
+import threading
+import subprocess
+import concurrent.futures
+from abc import ABC, abstractmethod
+from multiprocessing.connection import Listener
+import dill
+from multiprocess import Pool
+from .parallel import plan_workers, partition_cores
+
+
+CHUNKS_PER_WORKER = 4   # Chunks per worker of executors without core binding,
+                        # which balance loads between workers
+AUTHKEY_ENV = 'ETFBA_AUTHKEY'
+POLL_INTERVAL = 0.1          # Seconds between checks for tasks to re-run
+WORKER_EXIT_TIMEOUT = 5      # Seconds to wait for local workers to exit
+WORKER_TIMEOUT = 60          # Seconds to wait for workers while none is 
+                             # connected or starting
+
+
+def _call_pickled(payload):
+    '''
+    Parameters
+    ----------
+    payload: bytes
+        Function and its arguments pickled by dill, which supports bound
+        methods and closures.
+    '''
+
+    func, args = dill.loads(payload)
+
+    return func(*args)
+
+
+class Executor(ABC):
+    '''
+    Interface of executors. Items are split into chunks by partition, then
+    run calls the function on each chunk and returns results in order.
+    Subclasses must implement run, and may override partition.
+
+    Attributes
+    ----------
+    n_workers: int
+        Number of workers.
+    '''
+
+    n_workers = 1
+
+
+    def partition(self, n_items, problem_size=None, threads=None):
+        '''
+        Return the number of chunks, the core IDs each chunk is bound to (None
+        if not bound), and the number of solver threads per chunk.
+
+        Parameters
+        ----------
+        n_items: int
+            Number of items.
+        problem_size: int
+            Number of variables of the problem.
+        threads: int
+            Number of solver threads per worker. If None, solver default.
+        '''
+
+        nChunks = min(max(n_items, 1), self.n_workers*CHUNKS_PER_WORKER)
+
+        return nChunks, [None]*nChunks, threads
+
+
+    @abstractmethod
+    def run(self, func, args_list):
+        '''
+        Parameters
+        ----------
+        func: callable
+            Function called on each chunk.
+        args_list: list of tuple
+            Arguments of each call.
+        '''
+
+
+class LocalExecutor(Executor):
+    '''
+    Executor running one chunk per process on the local machine, with cores
+    partitioned between processes.
+    '''
+
+    def __init__(self, n_jobs=1):
+        '''
+        Parameters
+        ----------
+        n_jobs: int or "auto"
+            Number of processes. If "auto", chosen by problem size, see
+            parallel.plan_workers.
+        '''
+
+        self.n_jobs = n_jobs
+
+
+    @property
+    def n_workers(self):
+        return self.n_jobs if isinstance(self.n_jobs, int) else os.cpu_count()
+
+
+    def partition(self, n_items, problem_size=None, threads=None):
+        nJobs, threads = plan_workers(self.n_jobs, n_items, problem_size, threads)
+
+        return nJobs, partition_cores(nJobs, threads), threads
+
+
+    def run(self, func, args_list):
+        pool = Pool(processes=len(args_list))
+
+        async_res = []
+        for args in args_list:
+            async_res.append(pool.apply_async(func=func, args=args))
+
+        pool.close()
+        pool.join()
+
+        return [res.get() for res in async_res]
+
+
+class FuturesExecutor(Executor):
+    '''
+    Executor submitting chunks to a concurrent.futures executor, e.g.,
+    ProcessPoolExecutor, or MPIPoolExecutor of mpi4py for multiple nodes.
+    '''
+
+    def __init__(self, executor=None, max_workers=None):
+        '''
+        Parameters
+        ----------
+        executor: concurrent.futures.Executor
+            Executor to submit chunks to, which is not shut down after runs. If
+            None, a ProcessPoolExecutor is created for each run.
+        max_workers: int
+            Number of workers. If None, that of executor, or the CPU count.
+        '''
+
+        self.executor = executor
+        if max_workers is None:
+            max_workers = getattr(executor, '_max_workers', None) or os.cpu_count()
+        self.max_workers = max_workers
+
+
+    @property
+    def n_workers(self):
+        return self.max_workers
+
+
+    def run(self, func, args_list):
+        if self.executor is None:
+            executor = concurrent.futures.ProcessPoolExecutor(self.max_workers)
+        else:
+            executor = self.executor
+
+        try:
+            futures = [executor.submit(_call_pickled, dill.dumps((func, args)))
+                       for args in args_list]
+            results = [future.result() for future in futures]
+        finally:
+            if self.executor is None:
+                executor.shutdown()
+
+        return results
+
+
+class QueueExecutor(Executor):
+    '''
+    Executor serving chunks over TCP to worker processes, which may run on
+    other nodes. Workers request chunks one at a time and send back results;
+    chunks of workers lost before returning are served again. Checkpoint files,
+    if used, should be on a file system shared by the nodes.
+
+    Attributes
+    ----------
+    address: tuple
+        (host, port) the executor listens on.
+    authkey: bytes
+        Key authenticating workers.
+    '''
+
+    def __init__(self, address=('localhost', 0), authkey=None, n_workers=1,
+                 n_local_workers=0, worker_timeout=WORKER_TIMEOUT):
+        '''
+        Parameters
+        ----------
+        address: tuple
+            (host, port) to listen on. Port 0 picks a free port, which is set
+            once a run starts.
+        authkey: bytes
+            Key authenticating workers. If None, a random key is generated,
+            which suits local workers only.
+        n_workers: int
+            Expected number of workers, used to split items into chunks.
+        n_local_workers: int
+            Number of worker processes started on this machine for each run.
+        worker_timeout: float
+            Seconds to wait for a worker to connect while no worker is
+            connected and no local worker is running. If exceeded with chunks
+            left, e.g., all workers died, the run fails.
+        '''
+
+        self.address = address
+        self.authkey = os.urandom(16) if authkey is None else authkey
+        self.n_workers = max(n_workers, n_local_workers, 1)
+        self.n_local_workers = n_local_workers
+        self.worker_timeout = worker_timeout
+
+
+    def _serve(self, conn, tasks, results, n_tasks, done, connected):
+        '''
+        Send tasks to a worker connection until all tasks are done. The
+        connection is in connected while being served.
+        '''
+
+        connected.add(conn)
+        try:
+            while not done.is_set():
+                try:
+                    idx, payload = tasks.get(timeout=POLL_INTERVAL)
+                except queue.Empty:
+                    continue
+
+                try:
+                    conn.send(payload)
+                    results[idx] = conn.recv()
+                except (EOFError, OSError):
+                    tasks.put((idx, payload))
+                    logging.warning(f'worker lost, chunk {idx} requeued')
+                    return
+
+                if len(results) == n_tasks:
+                    done.set()
+
+            conn.send(None)
+
+        except (EOFError, OSError):
+            pass
+
+        finally:
+            connected.discard(conn)
+            conn.close()
+
+
+    def _accept(self, listener, tasks, results, n_tasks, done, connected):
+        while not done.is_set():
+            try:
+                conn = listener.accept()
+            except OSError:
+                return
+            threading.Thread(
+                target=self._serve,
+                args=(conn, tasks, results, n_tasks, done, connected),
+                daemon=True
+            ).start()
+
+
+    def _start_local_workers(self):
+        env = dict(os.environ)
+        env[AUTHKEY_ENV] = self.authkey.hex()
+        host, port = self.address
+
+        return [subprocess.Popen(
+            [sys.executable, '-m', 'etfba.optim.worker', f'{host}:{port}'],
+            env=env
+        ) for _ in range(self.n_local_workers)]
+
+
+    def run(self, func, args_list):
+        if not args_list:
+            return []
+
+        tasks = queue.Queue()
+        for idx, args in enumerate(args_list):
+            tasks.put((idx, dill.dumps((func, args))))
+        results = {}
+        done = threading.Event()
+        connected = set()
+
+        listener = Listener(self.address, authkey=self.authkey)
+        self.address = listener.address
+        logging.info(f'executor listening on {self.address[0]}:{self.address[1]}')
+
+        threading.Thread(
+            target=self._accept,
+            args=(listener, tasks, results, len(args_list), done, connected),
+            daemon=True
+        ).start()
+        workers = self._start_local_workers()
+
+        try:
+            lastAttended = time.time()
+            while not done.wait(timeout=POLL_INTERVAL):
+                if connected or any(worker.poll() is None for worker in workers):
+                    lastAttended = time.time()
+                elif time.time() - lastAttended > self.worker_timeout:
+                    raise RuntimeError(
+                        f'no worker connected for {self.worker_timeout} s '
+                        f'with {len(args_list) - len(results)} chunks left'
+                    )
+        finally:
+            done.set()
+            listener.close()
+            for worker in workers:
+                try:
+                    worker.wait(timeout=WORKER_EXIT_TIMEOUT)
+                except subprocess.TimeoutExpired:
+                    worker.kill()
+
+        output = []
+        for idx in range(len(args_list)):
+            success, value = results[idx]
+            if not success:
+                raise RuntimeError(f'chunk {idx} failed in worker:\n{value}')
+            output.append(value)
+
+        return output
+
+
+def get_executor(executor=None, n_jobs=1):
+    '''
+    Parameters
+    ----------
+    executor: Executor or concurrent.futures.Executor
+        Executor. If None, a LocalExecutor with n_jobs processes.
+    n_jobs: int or "auto"
+        Number of processes of the default executor.
+    '''
+
+    if executor is None:
+        return LocalExecutor(n_jobs)
+    elif isinstance(executor, Executor):
+        return executor
+    elif isinstance(executor, concurrent.futures.Executor):
+        return FuturesExecutor(executor)
+    else:
+        raise TypeError(
+            'executor should be an Executor or concurrent.futures.Executor'
+        )
+
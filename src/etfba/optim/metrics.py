@@ -0,0 +1,221 @@
+'''Define the timing and metrics records of optimizations.'''
+
+
+import json
+import time
+from contextlib import contextmanager
+from functools import wraps
+from pyomo.environ import Constraint, Var, value
+from pyomo.core.expr.visitor import identify_variables
+from pyomo.repn import generate_standard_repn
+
+
+PHASES = ('build', 'translate', 'solve', 'extract')
+
+
+def _get_number(obj, *attrs):
+    '''
+    Return the numeric attribute of nested pyomo results objects, or None.
+    '''
+
+    try:
+        for attr in attrs:
+            obj = getattr(obj, attr)
+        obj = value(obj)
+    except Exception:
+        return None
+
+    return obj if isinstance(obj, (int, float)) else None
+
+
+class Metrics():
+    '''
+    Durations of phases and statistics of the problem and solver calls of an
+    optimization. Phases are:
+    "build": building Pyomo components;
+    "translate": writing the problem for and reading results from the solver;
+    "solve": time reported by the solver (all the solver call if not reported);
+    "extract": the rest, e.g., reading values and assembling results.
+    Records of parallel workers are merged by summing, so phases may add up 
+    to more than the total.
+
+    Attributes
+    ----------
+    timings: dict
+        Mapping of phases (and "total") to durations in seconds.
+    problem: dict
+        Numbers of rows, columns, nonzeros and binaries of the problem.
+    solver: dict
+        Numbers of solver calls and branch-and-bound nodes.
+    '''
+
+    def __init__(self):
+        self.timings = {phase: 0.0 for phase in PHASES+('total',)}
+        self.problem = {}
+        self.solver = {'calls': 0, 'nodes': 0}
+
+
+    @contextmanager
+    def timer(self, phase):
+        '''
+        Parameters
+        ----------
+        phase: str
+            Phase the time spent in the context is added to.
+        '''
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[phase] = (self.timings.get(phase, 0.0)
+                                   + time.perf_counter() - start)
+
+
+    def record_problem(self, pyo_model):
+        '''
+        Parameters
+        ----------
+        pyo_model: ConcreteModel
+            Built Pyomo model.
+        '''
+
+        nRows = nNonzeros = 0
+        for cstr in pyo_model.component_data_objects(Constraint, active=True):
+            nRows += 1
+            repn = generate_standard_repn(cstr.body, quadratic=False)
+            if repn.is_linear():
+                nNonzeros += sum(1 for coe in repn.linear_coefs if coe != 0)
+            else:
+                nNonzeros += sum(1 for _ in identify_variables(
+                    cstr.body, include_fixed=False
+                ))
+
+        nCols = nBinaries = 0
+        for var in pyo_model.component_data_objects(Var):
+            if not var.fixed:
+                nCols += 1
+                nBinaries += var.is_binary()
+
+        self.problem = {'rows': nRows, 'columns': nCols,
+                        'nonzeros': nNonzeros, 'binaries': nBinaries}
+
+
+    def record_solver_call(self, sol, res, duration):
+        '''
+        Parameters
+        ----------
+        sol: solver
+            Solver called.
+        res: SolverResults
+            Results returned by the solver.
+        duration: float
+            Duration of the solver call in seconds.
+        '''
+
+        solverModel = getattr(sol, '_solver_model', None)
+        if hasattr(solverModel, 'getRunTime'):   # HiGHS
+            solverTime = solverModel.getRunTime()
+            nodes = solverModel.getInfo().mip_node_count
+        else:
+            solverTime = None
+            for attrs in [('solver', 'wallclock_time'), ('solver', 'time')]:
+                solverTime = _get_number(res, *attrs)
+                if solverTime is not None:
+                    break
+            nodes = _get_number(solverModel, 'NodeCount')
+            if nodes is None:
+                nodes = _get_number(res, 'solver', 'statistics', 
+                                    'branch_and_bound', 
+                                    'number_of_created_subproblems')
+        if solverTime is None or solverTime > duration:
+            solverTime = duration
+
+        self.timings['solve'] += solverTime
+        self.timings['translate'] += duration - solverTime
+
+        self.solver['calls'] += 1
+        self.solver['nodes'] += max(int(nodes or 0), 0)   # -1 for LPs
+
+
+    def merge(self, other):
+        '''
+        Add timings (except total) and solver statistics of another record,
+        e.g., of a worker of variability analysis.
+
+        Parameters
+        ----------
+        other: dict
+            Record returned by to_dict.
+        '''
+
+        for phase in PHASES:
+            self.timings[phase] += other['timings'].get(phase, 0.0)
+        for stat, count in other['solver'].items():
+            self.solver[stat] = self.solver.get(stat, 0) + count
+        if not self.problem:
+            self.problem = dict(other['problem'])
+
+
+    def finalize(self):
+        '''
+        Attribute the time of the total not spent in other phases to
+        "extract".
+        '''
+
+        self.timings['extract'] = max(
+            self.timings['total'] - sum(self.timings[phase] for phase in PHASES
+                                        if phase != 'extract'),
+            self.timings['extract']
+        )
+
+
+    def to_dict(self):
+        return {
+            'timings': dict(self.timings),
+            'problem': dict(self.problem),
+            'solver': dict(self.solver)
+        }
+
+
+    def save(self, file, **info):
+        '''
+        Append the record as a JSON line.
+
+        Parameters
+        ----------
+        file: str
+            Path of the log file.
+        info:
+            Additional items of the line, e.g., the optimizer class.
+        '''
+
+        with open(file, 'a') as f:
+            f.write(json.dumps({**info, **self.to_dict()})+'\n')
+
+
+def profiled(solve):
+    '''
+    Decorate the solve method of optimizers so that the metrics of the solve
+    are attached to the results (as the metrics property) and appended to the
+    metrics log of the optimizer if set.
+    '''
+
+    @wraps(solve)
+    def wrapper(self, *args, **kwargs):
+        self.metrics = Metrics()
+        with self.metrics.timer('total'):
+            result = solve(self, *args, **kwargs)
+        self.metrics.finalize()
+
+        result._metrics = self.metrics.to_dict()
+        if getattr(self, 'metrics_log', None) is not None:
+            self.metrics.save(
+                self.metrics_log,
+                optimizer=self.__class__.__name__,
+                time=time.time()
+            )
+
+        return result
+
+    return wrapper
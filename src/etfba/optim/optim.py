@@ -2,16 +2,23 @@
 
 
 import re
+import time
 import numpy as np
-from scipy.stats import norm
-from pyomo.environ import (ConcreteModel, Set, Var, Objective, Constraint, 
-                           SolverFactory, NonNegativeReals, Reals, Binary, 
-                           value, maximize, minimize, log)
+import pandas as pd
+from pyomo.environ import (ConcreteModel, Set, Var, Param, Objective, 
+                           Constraint, ConstraintList, Suffix, SolverFactory, 
+                           NonNegativeReals, Reals, Binary, value, maximize, 
+                           minimize, log)
 from pyomo.opt import SolverStatus, TerminationCondition
 from pyomo.core.expr.numeric_expr import LinearExpression
+from pyomo.repn import generate_standard_repn
+from pyomo.common.collections import ComponentMap
 import logging
-logging.basicConfig(level = logging.INFO, format = '%(levelname)s: %(message)s')
 from ..io.results import FBAResults, TFBAResults, EFBAResults, ETFBAResults
+from ..io.cache import cached
+from .metrics import profiled
+from .aio import get_default_pool
+from ..core.reaction import DEFAULT_KM
 
 
 R = 8.315e-3         # Gas constant in kJ/mol/K
@@ -19,6 +26,32 @@ T = 298.15           # Absolute temperature in K, equivalent to 25 C
 K = 1e6              # A sufficiently large constant
 EPSILON = 1e-3       # Tolerance ensuring reactions proceed with Gibbs energy 
                      # dissipation
+LL_BOUND = 1000      # Bound of pseudo Gibbs energies in loopless constraints
+LL_EPSILON = 1       # Minimum magnitude of pseudo Gibbs energies of active 
+                     # reactions in loopless constraints
+MAX_CUT_ROUNDS = 50  # Maximum rounds of lazily generated enzyme cost cuts
+CUT_TOL = 1e-3       # Relative tolerance of enzyme cost underestimation 
+                     # before a cut is added
+COEF_TOL = 1e-9      # Coefficients of cuts below this value are dropped
+MAX_REV_FACTOR = 100 # Inverse reversibility factor beyond which its logarithm 
+                     # is extended linearly
+FLUX_TOL = 1e-6      # Fluxes above this value are considered active
+SLACK_TOL = 1e-6     # Slacks above this value indicate thermodynamic violations
+SOLVER_OPTION_NAMES = {   # Solver specific names of common options
+    'glpk': {'time_limit': 'tmlim', 'mip_gap': 'mipgap', 'threads': None},
+    'gurobi': {'time_limit': 'TimeLimit', 'mip_gap': 'MIPGap', 
+               'threads': 'Threads'},
+    'highs': {'time_limit': 'time_limit', 'mip_gap': 'mip_rel_gap', 
+              'threads': 'threads'}
+}                         # None if not supported
+RELAXED_SOLVER_OPTIONS = {   # Options of solvers with relaxed tolerances used 
+    'glpk': {},              # to retry failed solves
+    'gurobi': {'FeasibilityTol': 1e-5, 'OptimalityTol': 1e-5, 
+               'IntFeasTol': 1e-4, 'NumericFocus': 3},
+    'highs': {'primal_feasibility_tolerance': 1e-5, 
+              'dual_feasibility_tolerance': 1e-5, 
+              'mip_feasibility_tolerance': 1e-4}
+}
 
 
 class FBAOptimizer():
@@ -38,7 +71,8 @@ class FBAOptimizer():
             irr_reactions, 
             ex_mass_bal_cons,
             parsimonious,
-            slack
+            slack,
+            loopless=False
     ):
         '''
         Parameters
@@ -59,12 +93,23 @@ class FBAOptimizer():
             List of irreversible reaction IDs.
         ex_mass_bal_cons : list
             List of metabolites excluded from mass balance constraints.
+        parsimonious : bool
+            Whether to further estimate parsimonious fluxes.
+        slack : float
+            Relaxation of the objective constraint in parsimonious FBA.
+        loopless : bool
+            Whether to eliminate thermodynamically infeasible internal cycles 
+            using loop law constraints, or by removing cycles from the optimum 
+            if no flux in cycles is in the objective or bounded below by a 
+            positive value.
         '''
         
         self.model = model
         
-        self.rxnIDs = self.model.stoichiometric_matrix.columns.tolist()
-        self.metabIDs = self.model.total_stoichiometric_matrix.index.tolist()
+        self.rxnIndex = self.model.reaction_index
+        self.metabIndex = self.model.metabolite_index
+        self.rxnIDs = list(self.rxnIndex.ids)
+        self.metabIDs = list(self.metabIndex.ids)
         
         self.objective = objective
         self.direction = direction
@@ -81,33 +126,47 @@ class FBAOptimizer():
         else:
             self.preset_flux = preset_flux
         
+        # reversibilities overridden by irr_reactions are kept in the 
+        # optimizer, the model is not modified
         self.irr_reactions = irr_reactions
         if self.irr_reactions is not None:
-            for rxnid in self.rxnIDs:
-                if rxnid in self.irr_reactions:
-                    self.model.reactions[rxnid].rev = False
-                else:
-                    self.model.reactions[rxnid].rev = True
+            self.revMask = ~self.rxnIndex.get_mask(self.irr_reactions)
         else:
-            self.irr_reactions = [rxnid for rxnid in self.rxnIDs 
-                                  if not self.model.reactions[rxnid].rev]
+            self.revMask = np.array(
+                [self.model.reactions[rxnid].rev for rxnid in self.rxnIDs], 
+                dtype=bool
+            )
+            self.irr_reactions = self.rxnIndex.get_ids(~self.revMask)
         
-        self.varFluxIDs = self.model.total_stoichiometric_matrix.columns.tolist()
+        (self.fluxIndex, 
+         self.stoyMat_total, 
+         self.transMat) = self.model.get_flux_structure(irr_reactions)
+        self.varFluxIDs = list(self.fluxIndex.ids)
         
         if ex_mass_bal_cons is None:
             self.ex_mass_bal_cons = []  
         else:
             self.ex_mass_bal_cons = list(set(ex_mass_bal_cons))
         
-        self.cstrMetabIDs = []
-        for metabid in self.metabIDs:
-            if metabid not in self.ex_mass_bal_cons:
-                self.cstrMetabIDs.append(metabid)
-                self.model.metabolites[metabid].is_constrained_by_mass_balance = True
+        self.cstrMetabMask = ~self.metabIndex.get_mask(self.ex_mass_bal_cons)
+        self.cstrMetabIDs = self.metabIndex.get_ids(self.cstrMetabMask)
         
         self.parsimonious = parsimonious
         self.slack = slack
 
+        self.cache = None
+        self.metrics_log = None
+        self.optimArgs = {}
+        self.solver_options = {}
+        self.time_limit = None
+        self.mip_gap = None
+        self.threads = None
+        self.loopless = loopless
+        self.presolve = False
+        self.zeroFluxIDs = set()
+        self.cycleFree = False
+        self.parsimonious_fluxids = None
+
         self.pyoModel = ConcreteModel()
         self.pyoModel.varFluxIDs = Set(initialize=self.varFluxIDs)
         self.pyoModel.cstrMetabIDs = Set(initialize=self.cstrMetabIDs)
@@ -121,42 +180,105 @@ class FBAOptimizer():
             Mapping of reaction IDs to their initial values.
         '''
         
-        if not set(self.preset_flux.keys()).issubset(self.varFluxIDs):
+        if not all(fluxid in self.fluxIndex for fluxid in self.preset_flux):
             logging.warning(
                 'some preset fluxes are not used, note "_f" and "_b" should '
                 'be added as suffix for reversible reactions'
             )
 
+        if self.presolve:
+            presolvedBounds = self._presolve_flux_bounds()
+        else:
+            presolvedBounds = {}
+        self.zeroFluxIDs = {fluxid for fluxid, (_, ub) 
+                            in presolvedBounds.items() if ub == 0}
+
         def flux_bounds_rule(model, fluxid):
-            if fluxid in self.preset_flux:
-                return (self.preset_flux[fluxid],)*2
-            elif fluxid in self.spec_flux_bound:
-                return self.spec_flux_bound[fluxid]
+            if fluxid in presolvedBounds:
+                return presolvedBounds[fluxid]
             else:
-                return self.flux_bound
-          
+                return self._get_flux_bound(fluxid)
+        
         if initial is None:
-            self.pyoModel.fluxes = Var(
-                self.pyoModel.varFluxIDs, 
-                within=NonNegativeReals, 
-                bounds=flux_bounds_rule
-            )
+            initial = {}
         else:
             logging.info('load initial flux values')
 
-            initial = {fluxid: flux for fluxid, flux in initial.items() 
-                       if fluxid in self.pyoModel.varFluxIDs}
-            self.pyoModel.fluxes = Var(
-                self.pyoModel.varFluxIDs, 
-                within=NonNegativeReals,
-                bounds=flux_bounds_rule, 
-                initialize=initial
-            )
+        # fluxes involved in no constraint are not passed to solvers and keep 
+        # their initial values, lower bounds by default
+        def flux_init_rule(model, fluxid):
+            if fluxid in initial:
+                return initial[fluxid]
+            else:
+                return flux_bounds_rule(model, fluxid)[0]
+          
+        self.pyoModel.fluxes = Var(
+            self.pyoModel.varFluxIDs, 
+            within=NonNegativeReals,
+            bounds=flux_bounds_rule, 
+            initialize=flux_init_rule
+        )
+        for fluxid in self.zeroFluxIDs:
+            self.pyoModel.fluxes[fluxid].fix(0)
+
+
+    def _get_flux_bound(self, fluxid):
+        if fluxid in self.preset_flux:
+            return (self.preset_flux[fluxid],)*2
+        elif fluxid in self.spec_flux_bound:
+            return self.spec_flux_bound[fluxid]
+        else:
+            return self.flux_bound
+
+
+    def _get_enzyme_cost_row(self):
+        '''
+        Return coefficients of fluxes (in the order of varFluxIDs) in the 
+        enzyme protein cost and its upper bound, (None, None) if not 
+        constrained.
+        '''
+
+        return None, None
+
+
+    def _presolve_flux_bounds(self):
+        '''
+        Return the mapping of flux IDs to bounds tightened by propagating flux 
+        bounds through mass balance constraints and the enzyme protein cost 
+        constraint, so that big-M constraints on flux bounds are tighter and 
+        fluxes implied to be zero are fixed and dropped from constraints. 
+        Bounds found infeasible are left to solvers.
+        '''
+
+        from .presolve import propagate_flux_bounds
+
+        bounds = np.array([self._get_flux_bound(fluxid) 
+                           for fluxid in self.varFluxIDs], dtype=float)
+        propagated = propagate_flux_bounds(
+            self.stoyMat_total.values[self.cstrMetabMask], 
+            bounds[:, 0], 
+            bounds[:, 1], 
+            *self._get_enzyme_cost_row()
+        )
+        if propagated is None:
+            logging.warning('flux bounds are infeasible, presolve skipped')
+            return {}
+
+        presolvedBounds = {}
+        for fluxid, lb, ub, bound in zip(self.varFluxIDs, *propagated, bounds):
+            if lb != bound[0] or ub != bound[1]:
+                presolvedBounds[fluxid] = (lb, ub)
+        logging.info(
+            f'presolve tightened bounds of {len(presolvedBounds)} fluxes, '
+            f'{sum(ub == 0 for _, ub in presolvedBounds.values())} fixed at 0'
+        )
+
+        return presolvedBounds
         
     
     def _build_objective(self):
         for fluxid in self.objective:
-            if fluxid not in self.varFluxIDs:
+            if fluxid not in self.fluxIndex:
                 raise KeyError(f'{fluxid} in objective not exist in the model')
         
         if self.direction.lower() == 'max':
@@ -174,8 +296,15 @@ class FBAOptimizer():
         
     
     def _build_parsimonious_objective(self):
+        # all fluxes are minimized unless parsimonious_fluxids is given
+        if self.parsimonious_fluxids is None:
+            fluxids = self.varFluxIDs
+        else:
+            fluxids = [fluxid for fluxid in self.varFluxIDs 
+                       if fluxid in self.parsimonious_fluxids]
+
         def obj_rule(model):
-            return sum(model.fluxes[fluxid] for fluxid in self.varFluxIDs)
+            return sum(model.fluxes[fluxid] for fluxid in fluxids)
         
         self.pyoModel.obj = Objective(rule=obj_rule, sense=minimize)
         
@@ -184,12 +313,26 @@ class FBAOptimizer():
         self.pyoModel.del_component(self.pyoModel.obj)
 
 
+    def _is_reversible(self, rxnid):
+        return self.revMask[self.rxnIndex.get_position(rxnid)]
+
+
     def _build_mass_balance_contraints(self):
+        stoyMat_total = self.stoyMat_total.values
+
+        # fluxes fixed at zero by presolve are dropped
+        zeroFluxMask = self.fluxIndex.get_mask(self.zeroFluxIDs)
+
         def mb_rule(model, metabid):
+            row = stoyMat_total[self.metabIndex.get_position(metabid)]
+            cols = np.flatnonzero((row != 0) & ~zeroFluxMask)
+            if cols.size == 0:
+                return Constraint.Skip
+            
             mb_cstr = LinearExpression(
                 constant=0, 
-                linear_coefs=self.model.total_stoichiometric_matrix.loc[metabid, :].tolist(),
-                linear_vars=[model.fluxes[fluxid] for fluxid in self.varFluxIDs]
+                linear_coefs=row[cols].tolist(),
+                linear_vars=[model.fluxes[self.varFluxIDs[col]] for col in cols]
             )
             return mb_cstr == 0
             
@@ -199,6 +342,211 @@ class FBAOptimizer():
         )
 
 
+    def _get_loop_fluxids(self):
+        loopFluxIDs = []
+        for rxnid in self.loopRxnIDs:
+            if self._is_reversible(rxnid):
+                loopFluxIDs.extend([rxnid+'_f', rxnid+'_b'])
+            else:
+                loopFluxIDs.append(rxnid)
+
+        return loopFluxIDs
+
+
+    def _loops_removable(self):
+        '''
+        Whether internal cycles can be removed from the optimum afterwards 
+        rather than excluded by loop law constraints, i.e., no flux in cycles 
+        is in the objective or bounded below by a positive value, so that 
+        the loopless optimum equals the optimum without loop law.
+        '''
+
+        loopFluxIDs = self._get_loop_fluxids()
+        if set(loopFluxIDs) & set(self.objective):
+            return False
+
+        return all(self._get_flux_bound(fluxid)[0] <= 0 
+                   for fluxid in loopFluxIDs)
+
+
+    def _build_loopless_constraints(self):
+        '''
+        Loop law constraints (ll-FBA) built on the precomputed null space of 
+        internal reactions. Only reactions involved in internal cycles are 
+        assigned binary variables and pseudo Gibbs energies. If internal 
+        cycles can be removed from the optimum afterwards, no constraint is 
+        built, see _remove_loops.
+        '''
+
+        nullSpace = self.model.internal_null_space
+        
+        self.loopRxnIDs = nullSpace.index.tolist()
+        if self._loops_removable():
+            self.cycleFree = True
+            return
+
+        revLoopRxnIDs = [rxnid for rxnid in self.loopRxnIDs 
+                         if self._is_reversible(rxnid)]
+        self.pyoModel.loopRxnIDs = Set(initialize=self.loopRxnIDs)
+        self.pyoModel.revLoopRxnIDs = Set(initialize=revLoopRxnIDs)
+        self.pyoModel.loopBasisIDs = Set(initialize=range(nullSpace.shape[1]))
+
+        self.pyoModel.ys = Var(self.pyoModel.loopRxnIDs, within=Binary)
+        self.pyoModel.gs = Var(
+            self.pyoModel.loopRxnIDs, 
+            within=Reals, 
+            bounds=(-LL_BOUND, LL_BOUND)
+        )
+
+        def fwd_bound_rule(model, rxnid):
+            fluxid = rxnid+'_f' if self._is_reversible(rxnid) else rxnid
+            return (
+                model.fluxes[fluxid] 
+                <= model.ys[rxnid]*model.fluxes[fluxid].bounds[1]
+            )
+
+        def bwd_bound_rule(model, rxnid):
+            fluxid = rxnid+'_b'
+            return (
+                model.fluxes[fluxid] 
+                <= (1-model.ys[rxnid])*model.fluxes[fluxid].bounds[1]
+            )
+
+        def gibbs_ub_rule(model, rxnid):
+            return (
+                model.gs[rxnid] 
+                <= (LL_BOUND+LL_EPSILON)*(1-model.ys[rxnid]) - LL_EPSILON
+            )
+
+        def gibbs_lb_rule(model, rxnid):
+            return (
+                model.gs[rxnid] 
+                >= LL_EPSILON - (LL_BOUND+LL_EPSILON)*model.ys[rxnid]
+            )
+
+        def null_space_rule(model, basisid):
+            basis = nullSpace[basisid]
+            basis = basis[basis != 0]
+            ll_cstr = LinearExpression(
+                constant=0, 
+                linear_coefs=basis.tolist(),
+                linear_vars=[model.gs[rxnid] for rxnid in basis.index]
+            )
+            return ll_cstr == 0
+        
+        self.pyoModel.LLFWDcstr = Constraint(
+            self.pyoModel.loopRxnIDs, 
+            rule=fwd_bound_rule
+        )
+        self.pyoModel.LLBWDcstr = Constraint(
+            self.pyoModel.revLoopRxnIDs, 
+            rule=bwd_bound_rule
+        )
+        self.pyoModel.LLGUBcstr = Constraint(
+            self.pyoModel.loopRxnIDs, 
+            rule=gibbs_ub_rule
+        )
+        self.pyoModel.LLGLBcstr = Constraint(
+            self.pyoModel.loopRxnIDs, 
+            rule=gibbs_lb_rule
+        )
+        self.pyoModel.LLNScstr = Constraint(
+            self.pyoModel.loopBasisIDs, 
+            rule=null_space_rule
+        )
+
+
+    def _update_bound_constraints(self, fluxids):
+        '''
+        Update constraints whose coefficients are upper bounds of fluxes (big-M 
+        constraints) after the bounds of fluxes are changed.
+
+        Parameters
+        ----------
+        fluxids: iterable
+            IDs of fluxes whose bounds were changed.
+        '''
+
+        if not self.loopless:
+            return
+
+        fluxids = set(fluxids)
+        if self.cycleFree:
+            if any(self.pyoModel.fluxes[fluxid].lb > 0 
+                   for fluxid in fluxids.intersection(self._get_loop_fluxids())):
+                raise ValueError(
+                    'positive lower bounds of fluxes in internal cycles need '
+                    'loop law constraints, which are only built if given when '
+                    'the problem is built'
+                )
+            return
+        
+        fluxes = self.pyoModel.fluxes
+        ys = self.pyoModel.ys
+        for rxnid in self.pyoModel.loopRxnIDs:
+            if self._is_reversible(rxnid):
+                fwdid, bwdid = rxnid+'_f', rxnid+'_b'
+                if bwdid in fluxids:
+                    self.pyoModel.LLBWDcstr[rxnid].set_value(
+                        fluxes[bwdid] <= (1-ys[rxnid])*fluxes[bwdid].bounds[1]
+                    )
+            else:
+                fwdid = rxnid
+            if fwdid in fluxids:
+                self.pyoModel.LLFWDcstr[rxnid].set_value(
+                    fluxes[fwdid] <= ys[rxnid]*fluxes[fwdid].bounds[1]
+                )
+
+
+    def _remove_loops(self, sol):
+        '''
+        Remove internal cycles from the optimal fluxes (CycleFreeFlux). Fluxes 
+        of reactions in internal cycles are minimized, each bounded by its 
+        optimal value, with other fluxes fixed at their optimal values. Any 
+        cycle left could be further decreased, and the objective is kept 
+        since it involves no flux in cycles.
+
+        Parameters
+        ----------
+        sol: solver
+            Solver returned by _get_solver.
+        '''
+
+        loopFluxIDs = set(self._get_loop_fluxids())
+        fluxes = self.pyoModel.fluxes
+        optValues = {fluxid: value(fluxes[fluxid]) for fluxid in self.varFluxIDs}
+        bounds = {fluxid: fluxes[fluxid].bounds for fluxid in self.varFluxIDs}
+
+        for fluxid in self.varFluxIDs:
+            lb, ub = bounds[fluxid]
+            if fluxid in loopFluxIDs:
+                fluxes[fluxid].setub(max(optValues[fluxid], lb))
+            elif not fluxes[fluxid].fixed:
+                optValue = min(max(optValues[fluxid], lb), ub)
+                fluxes[fluxid].setlb(optValue)
+                fluxes[fluxid].setub(optValue)
+
+        self.pyoModel.obj.deactivate()
+        self.pyoModel.LLobj = Objective(
+            expr=sum(fluxes[fluxid] for fluxid in loopFluxIDs), 
+            sense=minimize
+        )
+
+        optRes = self.res
+        self.res = self._run_solver(sol)
+        if not self._optimization_successful():
+            logging.warning('failed to remove internal cycles from the optimum')
+            for fluxid, optValue in optValues.items():
+                fluxes[fluxid].set_value(optValue, skip_validation=True)
+        self.res = optRes
+
+        self.pyoModel.del_component(self.pyoModel.LLobj)
+        self.pyoModel.obj.activate()
+        for fluxid, (lb, ub) in bounds.items():
+            fluxes[fluxid].setlb(lb)
+            fluxes[fluxid].setub(ub)
+
+
     def _build_objective_constraint(self, opt_obj):
         def obj_cstr_rule(model):
             obj_expr = sum(
@@ -217,20 +565,196 @@ class FBAOptimizer():
             sol = SolverFactory('glpk')
         elif solver == 'gurobi':
             sol = SolverFactory('gurobi_direct')
+        elif solver == 'highs':
+            sol = SolverFactory('appsi_highs')
+            # the solver is persistent, so rows with binaries fixed for 
+            # sensitivities are updated by bounds rather than re-added
+            sol.update_config.treat_fixed_vars_as_params = False
         else:
-            raise ValueError('solver should be "glpk" or "gurobi"')
+            raise ValueError('solver should be "glpk", "gurobi" or "highs"')
         
+        self.solverName = solver
+        sol.options.update(self.solver_options)
+        if self.mip_gap is not None:
+            sol.options[SOLVER_OPTION_NAMES[solver]['mip_gap']] = self.mip_gap
+        self._set_time_limit(sol, self.time_limit)
+        self._set_threads(sol, self.threads)
+
         return sol
 
 
-    def _optimization_successful(self):
+    def _set_time_limit(self, sol, time_limit, solver_name=None):
+        '''
+        Parameters
+        ----------
+        sol: solver
+            Solver returned by _get_solver.
+        time_limit: float or None
+            Time limit in seconds. None removes the limit.
+        solver_name: {"glpk", "gurobi", "highs"}
+            Name of the solver. If None, the one last passed to _get_solver.
+        '''
+
+        if solver_name is None:
+            solver_name = self.solverName
+
+        optName = SOLVER_OPTION_NAMES[solver_name]['time_limit']
+        if time_limit is None:
+            sol.options.pop(optName, None)
+            if optName in self.solver_options:
+                sol.options[optName] = self.solver_options[optName]
+        elif solver_name == 'glpk':
+            sol.options[optName] = max(int(np.ceil(time_limit)), 1)
+        else:
+            sol.options[optName] = max(time_limit, 0)
+
+
+    def _set_threads(self, sol, threads, solver_name=None):
+        '''
+        Parameters
+        ----------
+        sol: solver
+            Solver returned by _get_solver.
+        threads: int or None
+            Number of threads used by the solver. Ignored if None, if the 
+            solver is single-threaded, or if the thread option is set in 
+            solver_options.
+        solver_name: {"glpk", "gurobi", "highs"}
+            Name of the solver. If None, the one last passed to _get_solver.
+        '''
+
+        if solver_name is None:
+            solver_name = self.solverName
+
+        optName = SOLVER_OPTION_NAMES[solver_name]['threads']
+        if (threads is not None and optName is not None 
+            and optName not in self.solver_options):
+            sol.options[optName] = threads
+
+
+    def _get_problem_size(self):
+        '''
+        Return the approximate number of variables of the problem.
+        '''
+
+        return len(self.varFluxIDs)
+
+
+    def _run_solver(self, sol, pyo_model=None):
+        '''
+        Solve pyo_model (the problem if None) and return the solver results.
+        The call is recorded in the metrics of the current solve if any.
+        '''
+
+        if pyo_model is None:
+            pyo_model = self.pyoModel
+
+        metrics = getattr(self, 'metrics', None)
+        if metrics is None:
+            return self._call_solver(sol, pyo_model)
+
+        if not metrics.problem and pyo_model is self.pyoModel:
+            metrics.record_problem(pyo_model)
+
+        start = time.perf_counter()
+        res = self._call_solver(sol, pyo_model)
+        metrics.record_solver_call(sol, res, time.perf_counter() - start)
+
+        return res
+
+
+    @staticmethod
+    def _call_solver(sol, pyo_model):
+        if not hasattr(sol, 'load_vars'):
+            return sol.solve(pyo_model, report_timing=False, tee=False)
+
+        # appsi solvers (i.e., HiGHS) raise if no feasible solution is found, 
+        # so the solution is loaded only if available, and failures are left 
+        # to the termination condition as with other solvers
+        res = sol.solve(pyo_model, load_solutions=False, report_timing=False, 
+                        tee=False)
+        if len(res.solution) > 0:
+            sol.load_vars()
+            for name, getter in [('dual', sol.get_duals), 
+                                 ('rc', sol.get_reduced_costs)]:
+                suffix = getattr(pyo_model, name, None)
+                if suffix is not None and suffix.import_enabled():
+                    suffix.update(getter())
+
+        return res
+
+
+    async def solve_async(self, *args, pool=None, **kwargs):
+        '''
+        Asynchronous version of solve for asyncio applications. The solve runs 
+        in a worker process of pool without blocking the event loop, and 
+        cancelling the awaiting task terminates the worker.
+
+        Parameters
+        ----------
+        args, kwargs:
+            Arguments of solve.
+        pool: AsyncSolverPool
+            Pool of worker processes, which limits the number of concurrent 
+            solves. If None, the default pool with one worker per CPU.
+        '''
+
+        if pool is None:
+            pool = get_default_pool()
+
+        return await pool.run(self.solve, *args, **kwargs)
+
+
+    def set_solver_options(self, solver_options=None, time_limit=None, 
+                           mip_gap=None):
+        '''
+        Parameters
+        ----------
+        solver_options: dict
+            Options passed to the solver as is, e.g., {"Threads": 4} for gurobi.
+        time_limit: float
+            Time limit in seconds of each solver call.
+        mip_gap: float
+            Relative MIP gap at which the solver stops.
+        '''
+
+        self.solver_options = {} if solver_options is None else dict(solver_options)
+        self.time_limit = time_limit
+        self.mip_gap = mip_gap
+
+
+    def _optimization_successful(self, res=None):
+        '''
+        Parameters
+        ----------
+        res: SolverResults
+            Results of a solver call. If None, those of the last solve of the 
+            problem.
+        '''
+
+        if res is None:
+            res = self.res
+
         return (
-            self.res.solver.status == SolverStatus.ok and 
-            self.res.solver.termination_condition in [
+            res.solver.status == SolverStatus.ok and 
+            res.solver.termination_condition in [
                 TerminationCondition.optimal, 
                 TerminationCondition.feasible
             ]
         )
+
+
+    def _optimization_optimal(self):
+        '''
+        Whether the last solve was proven optimal, i.e., not stopped by the
+        time limit or MIP gap with a feasible solution.
+        '''
+
+        return (
+            self.res.solver.status == SolverStatus.ok and 
+            self.res.solver.termination_condition == 
+            TerminationCondition.optimal
+        )
     
 
     def _get_opt_obj(self):
@@ -247,29 +771,136 @@ class FBAOptimizer():
             optTotalFluxes[fluxid] = value(self.pyoModel.fluxes[fluxid])
             
         optNetFluxes = (
-            self.model.transformation_matrix@list(optTotalFluxes.values())
+            self.transMat@list(optTotalFluxes.values())
         ).to_dict()
         
         return optNetFluxes
 
+
+    def _has_binary_variables(self):
+        return any(var.is_binary() 
+                   for var in self.pyoModel.component_data_objects(Var))
+    
+
+    def _build_sensitivity_suffixes(self):
+        self.pyoModel.dual = Suffix(direction=Suffix.IMPORT)
+        self.pyoModel.rc = Suffix(direction=Suffix.IMPORT)
+
+
+    def _remove_sensitivity_suffixes(self):
+        self.pyoModel.del_component(self.pyoModel.dual)
+        self.pyoModel.del_component(self.pyoModel.rc)
+
+
+    def _fix_binaries(self):
+        '''
+        Fix binary variables at their current values so that the problem 
+        becomes an LP, and return the variables fixed.
+        '''
+
+        binVars = [var for var in self.pyoModel.component_data_objects(Var) 
+                   if var.is_binary() and not var.fixed]
+        for var in binVars:
+            var.fix(round(value(var)))
+            var.domain = Reals
+
+        return binVars
+
+
+    @staticmethod
+    def _unfix_binaries(bin_vars):
+        for var in bin_vars:
+            var.domain = Binary
+            var.unfix()
+
+
+    def _solve_with_fixed_binaries(self, sol):
+        '''
+        Fix binary variables at their optimal values and re-solve the resulting 
+        LP with dual values imported.
+        '''
+
+        binVars = self._fix_binaries()
+        self._build_sensitivity_suffixes()
+        self._run_solver(sol)
+        self._unfix_binaries(binVars)
+
+
+    def _get_sensitivities(self, sol):
+        '''
+        Return shadow prices of mass balance constraints and reduced costs of 
+        fluxes. Dual values of LPs are imported along with the solution, while 
+        for MILPs an LP with binary variables fixed is solved once.
+
+        Parameters
+        ----------
+        sol: solver
+            Solver used for the LP with fixed binary variables.
+        '''
+
+        if not hasattr(self.pyoModel, 'dual'):
+            self._solve_with_fixed_binaries(sol)
+
+        # metabolites without any flux have no mass balance constraint
+        mbCstrs = self.pyoModel.MBcstrs
+        sensitivities = {
+            'shadow_prices': {
+                metabid: (self.pyoModel.dual.get(mbCstrs[metabid], 0) 
+                          if metabid in mbCstrs else 0)
+                for metabid in self.pyoModel.cstrMetabIDs
+            },
+            'reduced_costs': {
+                fluxid: self.pyoModel.rc.get(self.pyoModel.fluxes[fluxid], 0) 
+                for fluxid in self.pyoModel.varFluxIDs
+            }
+        }
+        self._remove_sensitivity_suffixes()
+
+        return sensitivities
+
     
-    def solve(self, solver='glpk'):
+    @profiled
+    @cached
+    def solve(self, solver='glpk', sensitivity=False):
         '''
         Parameters
         ----------
-        solver: {"glpk", "gurobi"}
+        solver: {"glpk", "gurobi", "highs"}
             "gurobi" is highly recommended for large models.
+        sensitivity: bool
+            Whether to report shadow prices and reduced costs at the optimum.
         '''    
-        
+
+        with self.metrics.timer('build'):
+            self._build_problem()
+
+        return self._solve_problem(solver, sensitivity)
+
+
+    def _build_problem(self):
         self._build_flux_variables()
         self._build_objective()
         self._build_mass_balance_contraints()
+        if self.loopless:
+            self._build_loopless_constraints()
+
+
+    def _solve_problem(self, solver, sensitivity=False):
+        '''
+        Solve the built problem and return the results.
+        '''
+
+        if sensitivity and not self._has_binary_variables():
+            self._build_sensitivity_suffixes()
         
         sol = self._get_solver(solver)
-        self.res = sol.solve(self.pyoModel, report_timing=False, tee=False)
+        self.res = self._run_solver(sol)
         optObj = self._get_opt_obj()
         optFluxes = self._get_opt_fluxes()
         optSuccess = self._optimization_successful()
+        sensitivities = {}
+        if sensitivity and optSuccess:
+            sensitivities = self._get_sensitivities(sol)
 
         if self.parsimonious and optSuccess:
             logging.info('estimating parsimonious fluxes')
@@ -278,16 +909,21 @@ class FBAOptimizer():
             self._build_parsimonious_objective()
             self._build_objective_constraint(optObj)
 
-            self.res = sol.solve(self.pyoModel, report_timing=False, tee=False)
+            self.res = self._run_solver(sol)
 
             optFluxes = self._get_opt_fluxes()
             optSuccess = self._optimization_successful()
+
+        if self.cycleFree and optSuccess:
+            self._remove_loops(sol)
+            optFluxes = self._get_opt_fluxes()
         
         return FBAResults(
             optObj, 
             optFluxes, 
             optSuccess, 
-            self.model.stoichiometric_matrix
+            self.model.stoichiometric_matrix,
+            **sensitivities
         )    
 
 
@@ -316,6 +952,8 @@ class TFBAOptimizer(FBAOptimizer):
             parsimonious,
             slack, 
             dgpm_conf_level,
+            dgpm_error_basis=None,
+            lazy_thermo=False,
             **kwargs
     ):
         '''
@@ -353,6 +991,14 @@ class TFBAOptimizer(FBAOptimizer):
         dgpm_conf_level : float
             Confidence level for considering uncertainty in standard reaction Gibbs 
             energy.
+        dgpm_error_basis : dict or DataFrame
+            Mapping of reaction IDs to rows of a low-rank square root of the 
+            covariance matrix of standard reaction Gibbs energies. If provided, 
+            correlated errors are modeled with one variable per basis column 
+            instead of one variable per reaction.
+        lazy_thermo : bool
+            Whether to add thermodynamic constraints only for reactions found 
+            to violate thermodynamic feasibility in intermediate solutions.
         '''
         
         super().__init__(
@@ -370,6 +1016,15 @@ class TFBAOptimizer(FBAOptimizer):
         )
 
         self.conf_level = dgpm_conf_level
+        self.lazy_thermo = lazy_thermo
+        if dgpm_error_basis is None:
+            self.dgpm_error_basis = None
+        elif isinstance(dgpm_error_basis, pd.DataFrame):
+            self.dgpm_error_basis = dgpm_error_basis
+        else:
+            self.dgpm_error_basis = pd.DataFrame.from_dict(
+                dgpm_error_basis, orient='index'
+            )
         
         self.conc_bound = conc_bound
         self.lnconc_bounds = tuple(np.log(self.conc_bound))
@@ -397,39 +1052,44 @@ class TFBAOptimizer(FBAOptimizer):
         else:
             self.ex_thermo_cons = list(set(ex_thermo_cons))
         
+        exThermoMask = self.rxnIndex.get_mask(self.ex_thermo_cons)
+        self.cstrRxnIDs = []
         self.cstrFluxIDs = []
-        for rxnid in self.rxnIDs:
+        for rxnid, exThermo in zip(self.rxnIDs, exThermoMask):
             if all([not self.model.reactions[rxnid].is_h2o_transport,
                     not self.model.reactions[rxnid].is_biomass_formation,
                     not self.model.reactions[rxnid].is_exch_reaction,
-                    rxnid not in self.ex_thermo_cons]):
+                    not exThermo]):
 
-                if self.model.reactions[rxnid].rev:
+                if self._is_reversible(rxnid):
                     self.cstrFluxIDs.append(rxnid+'_f')
                     self.cstrFluxIDs.append(rxnid+'_b')
                 else:
                     self.cstrFluxIDs.append(rxnid)
-                self.model.reactions[rxnid].is_constrained_by_thermodynamics = True
+                self.cstrRxnIDs.append(rxnid)
 
         if ex_conc is None:
             self.ex_conc = []
         else: 
             self.ex_conc = list(set(ex_conc))
 
-        totalStoyMat_reduced = self.model.total_stoichiometric_matrix[
-            self.cstrFluxIDs
-        ]
-        self.totalStoyMat_reduced = totalStoyMat_reduced[
-            ~(totalStoyMat_reduced == 0).all(axis = 1)
-        ]
-        self.varMetabIDs = []
-        for metabid in self.totalStoyMat_reduced.index:
-            if all([not self.model.metabolites[metabid].is_h2o,
-                    metabid not in self.ex_conc]):
-                self.varMetabIDs.append(metabid)
+        # metabolites involved in fluxes constrained by thermodynamics
+        stoyMat_total = self.stoyMat_total.values
+        cstrFluxPositions = self.fluxIndex.get_positions(self.cstrFluxIDs)
+        involvedMask = (stoyMat_total[:, cstrFluxPositions] != 0).any(axis=1)
+        h2oMask = np.array(
+            [self.model.metabolites[metabid].is_h2o for metabid in self.metabIDs], 
+            dtype=bool
+        )
+        self.varMetabMask = (involvedMask & ~h2oMask 
+                             & ~self.metabIndex.get_mask(self.ex_conc))
+        self.varMetabIDs = self.metabIndex.get_ids(self.varMetabMask)
 
         self.pyoModel.varMetabIDs = Set(initialize=self.varMetabIDs)
-        self.pyoModel.cstrFluxIDs = Set(initialize=self.cstrFluxIDs)
+        if self.lazy_thermo:
+            self.pyoModel.cstrFluxIDs = Set(initialize=[])
+        else:
+            self.pyoModel.cstrFluxIDs = Set(initialize=self.cstrFluxIDs)
         
     
     def _build_conc_variables(self, initial=None):
@@ -449,41 +1109,98 @@ class TFBAOptimizer(FBAOptimizer):
                 return self.lnconc_bounds
             
         if initial is None:
-            self.pyoModel.lnconcs = Var(
-                self.pyoModel.varMetabIDs, 
-                bounds=conc_bounds_rule
-            )
+            initial = {}
         else:
             logging.info('load initial conc. values')
-            
-            initial = {metabid: conc for metabid, conc in initial.items() 
-                       if metabid in self.pyoModel.varMetabIDs}
-            self.pyoModel.lnconcs = Var(
-                self.pyoModel.varMetabIDs, 
-                bounds=conc_bounds_rule, 
-                initialize=initial
-            )
+
+        # concentrations involved in no constraint (e.g., only in fluxes fixed 
+        # at zero by presolve) keep their initial values, centers of bounds by 
+        # default
+        def conc_init_rule(model, metabid):
+            if metabid in initial:
+                return initial[metabid]
+            else:
+                return np.mean(conc_bounds_rule(model, metabid))
+
+        self.pyoModel.lnconcs = Var(
+            self.pyoModel.varMetabIDs, 
+            bounds=conc_bounds_rule, 
+            initialize=conc_init_rule
+        )
                 
     
     def _build_binary_variables(self):
+        # fluxes fixed at zero by presolve need no direction
+        for fluxid in self.zeroFluxIDs:
+            self.pyoModel.cstrFluxIDs.discard(fluxid)
+
         self.pyoModel.xs = Var(self.pyoModel.cstrFluxIDs, within = Binary)
 
 
     def _build_error_variables(self):
+        # scipy.stats is slow to import and only needed here
+        from scipy.stats import norm
+
         z = norm.ppf((1+self.conf_level)/2)
         
-        def error_bounds_rule(model, fluxid):
-            rxnid = re.sub(r'_[fb]$', '', fluxid)
-            dgpm_err = self.model.reactions[rxnid].dgpm_error
-            return [-z*dgpm_err, z*dgpm_err]
+        if self.dgpm_error_basis is None:
+            dgpm_errs = np.array(
+                [self.model.reactions[rxnid].dgpm_error 
+                 for rxnid in self.cstrRxnIDs], 
+                dtype=float
+            )
+            dgpm_errs = np.nan_to_num(dgpm_errs, nan=0.0)
+            errBounds = dict(zip(self.cstrRxnIDs, zip(-z*dgpm_errs, z*dgpm_errs)))
+
+            self.pyoModel.cstrRxnIDs = Set(initialize=self.cstrRxnIDs)
+            self.pyoModel.errors = Var(
+                self.pyoModel.cstrRxnIDs, 
+                within=Reals, 
+                bounds=lambda model, rxnid: errBounds[rxnid]
+            )
+        
+        else:
+            basis = self.dgpm_error_basis.reindex(self.cstrRxnIDs).fillna(0.0)
+            basis = basis.loc[:, ~(basis == 0).all(axis=0)].values
+            rows, cols = np.nonzero(basis)
+            self.errBasisCoes = {rxnid: [] for rxnid in self.cstrRxnIDs}
+            for row, col in zip(rows, cols):
+                self.errBasisCoes[self.cstrRxnIDs[row]].append(
+                    (col, basis[row, col])
+                )
+            
+            self.pyoModel.errBasisIDs = Set(initialize=range(basis.shape[1]))
+            self.pyoModel.errors = Var(
+                self.pyoModel.errBasisIDs, 
+                within=Reals, 
+                bounds=(-z, z)
+            )
+        
 
-        self.pyoModel.errors = Var(
-            self.pyoModel.cstrFluxIDs, 
-            within=Reals, 
-            bounds=error_bounds_rule
-        )
+    def _calculate_dgpm_error(self, model, rxnid):
+        '''
+        Parameters
+        ----------
+        model: pyomo model
+            The Pyomo model object.
+        rxnid: str
+            Reaction ID.
+        '''
+
+        if self.conf_level is None:
+            return 0
+        
+        if self.dgpm_error_basis is None:
+            return model.errors[rxnid]
+        else:
+            return sum(coe*model.errors[basisid] 
+                       for basisid, coe in self.errBasisCoes[rxnid])
         
         
+    def _is_var_metabolite(self, metabid):
+        return self.varMetabMask[self.metabIndex.get_position(metabid)]
+
+
     def _calculate_gibbs_energy(self, model, fluxid):
         '''
         Parameters
@@ -501,11 +1218,12 @@ class TFBAOptimizer(FBAOptimizer):
         dgpm = self.model.reactions[rxnid].dgpm
 
         subsSum = sum([subs[subid].coe*model.lnconcs[subid] for subid in subs 
-                       if subid in self.varMetabIDs])
+                       if self._is_var_metabolite(subid)])
         prosSum = sum([pros[proid].coe*model.lnconcs[proid] for proid in pros 
-                       if proid in self.varMetabIDs])
+                       if self._is_var_metabolite(proid)])
 
-        dgp = dgpm + (prosSum - subsSum)*R*T
+        dgp = (dgpm + self._calculate_dgpm_error(model, rxnid) 
+               + (prosSum - subsSum)*R*T)
 
         if re.match(r'.+_b$', fluxid):
             return -dgp
@@ -526,6 +1244,18 @@ class TFBAOptimizer(FBAOptimizer):
         )
 
 
+    def _update_bound_constraints(self, fluxids):
+        super()._update_bound_constraints(fluxids)
+
+        for fluxid in fluxids:
+            if fluxid in self.pyoModel.FLUXBNDcstr:
+                self.pyoModel.FLUXBNDcstr[fluxid].set_value(
+                    self.pyoModel.fluxes[fluxid] 
+                    <= self.pyoModel.xs[fluxid]
+                    *self.pyoModel.fluxes[fluxid].bounds[1]
+                )
+
+
     def _build_thermodynamics_constraints(self):
         def thmd_rule(model, fluxid):
             return (
@@ -539,19 +1269,6 @@ class TFBAOptimizer(FBAOptimizer):
         )
 
 
-    def _build_thermodynamics_constraints_with_uncertainty(self):
-        def thmd_rule(model, fluxid):
-            return (
-                self._calculate_gibbs_energy(model, fluxid) + model.errors[fluxid] 
-                <= K*(1-model.xs[fluxid]) - EPSILON
-            )
-
-        self.pyoModel.THMDcstr = Constraint(
-            self.pyoModel.cstrFluxIDs, 
-            rule=thmd_rule
-        )    
-
-    
     def _build_ratio_constraint(self):
         if self.preset_conc_ratio:
             def ratio_rule(model, ratioid):
@@ -567,6 +1284,170 @@ class TFBAOptimizer(FBAOptimizer):
             )
 
 
+    def _check_thermodynamic_feasibility(self, sol):
+        '''
+        Check whether the active fluxes of the current solution are 
+        thermodynamically feasible by minimizing the total violation of Gibbs 
+        energy constraints over log concentrations. Constraints already in the 
+        optimization problem are imposed without violation. If feasible, log 
+        concentrations (and errors) of the problem are updated with the 
+        feasible ones.
+
+        Parameters
+        ----------
+        sol: solver
+            Solver used for the feasibility problem.
+
+        Returns
+        -------
+        violFluxIDs: list
+            IDs of active fluxes violating thermodynamic constraints. All 
+            active fluxes not constrained yet if the check fails.
+        '''
+
+        actFluxIDs = [fluxid for fluxid in self.cstrFluxIDs 
+                      if value(self.pyoModel.fluxes[fluxid]) > FLUX_TOL]
+        lazyFluxIDs = [fluxid for fluxid in actFluxIDs 
+                       if fluxid not in self.pyoModel.cstrFluxIDs]
+        if not lazyFluxIDs:
+            return []
+        lazyFluxMask = self.fluxIndex.get_mask(lazyFluxIDs)
+
+        chkModel = ConcreteModel()
+        chkModel.lnconcs = Var(
+            self.pyoModel.varMetabIDs, 
+            bounds=lambda model, metabid: self.pyoModel.lnconcs[metabid].bounds,
+            initialize=lambda model, metabid: np.mean(
+                self.pyoModel.lnconcs[metabid].bounds
+            )
+        )
+        if self.conf_level is not None:
+            chkModel.errors = Var(
+                self.pyoModel.errors.index_set(), 
+                bounds=lambda model, errid: self.pyoModel.errors[errid].bounds,
+                initialize=0
+            )
+        chkModel.slacks = Var(lazyFluxIDs, within=NonNegativeReals)
+        
+        def thmd_rule(model, fluxid):
+            if lazyFluxMask[self.fluxIndex.get_position(fluxid)]:
+                return (self._calculate_gibbs_energy(model, fluxid) 
+                        - model.slacks[fluxid] <= -EPSILON)
+            else:
+                return self._calculate_gibbs_energy(model, fluxid) <= -EPSILON
+        
+        chkModel.THMDcstr = Constraint(actFluxIDs, rule=thmd_rule)
+        if self.preset_conc_ratio:
+            def ratio_rule(model, ratioid):
+                num, den = ratioid.split(':')
+                return (
+                    model.lnconcs[num] - model.lnconcs[den] 
+                    == log(self.preset_conc_ratio[ratioid])
+                )
+            
+            chkModel.RATIOcstr = Constraint(
+                self.preset_conc_ratio.keys(), 
+                rule=ratio_rule
+            )
+        chkModel.obj = Objective(
+            expr=sum(chkModel.slacks[fluxid] for fluxid in lazyFluxIDs), 
+            sense=minimize
+        )
+
+        chkRes = self._run_solver(sol, chkModel)
+        if not self._optimization_successful(chkRes):
+            # values of a failed check are not reliable, so all lazy fluxes 
+            # are constrained rather than taken as feasible
+            logging.warning(
+                'thermodynamic feasibility check failed '
+                f'({chkRes.solver.termination_condition}), constraints are '
+                f'added for all {len(lazyFluxIDs)} active fluxes'
+            )
+            return lazyFluxIDs
+        
+        violFluxIDs = [fluxid for fluxid in lazyFluxIDs 
+                       if value(chkModel.slacks[fluxid]) > SLACK_TOL]
+        if not violFluxIDs:
+            for metabid in self.pyoModel.varMetabIDs:
+                self.pyoModel.lnconcs[metabid].set_value(
+                    value(chkModel.lnconcs[metabid])
+                )
+            if self.conf_level is not None:
+                for errid in self.pyoModel.errors:
+                    self.pyoModel.errors[errid].set_value(
+                        value(chkModel.errors[errid])
+                    )
+
+        return violFluxIDs
+    
+
+    def _add_thermodynamics_cuts(self, flux_ids):
+        '''
+        Add direction binaries, flux bound and thermodynamic constraints for 
+        fluxes of reactions involved in thermodynamic violations.
+
+        Parameters
+        ----------
+        flux_ids: list
+            Flux IDs violating thermodynamic constraints.
+        '''
+
+        rxnids = {re.sub(r'_[fb]$', '', fluxid) for fluxid in flux_ids}
+        for fluxid in self.cstrFluxIDs:
+            if (re.sub(r'_[fb]$', '', fluxid) in rxnids 
+                and fluxid not in self.pyoModel.cstrFluxIDs
+                and fluxid not in self.zeroFluxIDs):
+                self.pyoModel.cstrFluxIDs.add(fluxid)
+                self.pyoModel.FLUXBNDcstr.add(
+                    fluxid, 
+                    self.pyoModel.fluxes[fluxid] 
+                    <= self.pyoModel.xs[fluxid]
+                    *self.pyoModel.fluxes[fluxid].bounds[1]
+                )
+                self.pyoModel.THMDcstr.add(
+                    fluxid, 
+                    self._calculate_gibbs_energy(self.pyoModel, fluxid) 
+                    <= K*(1-self.pyoModel.xs[fluxid]) - EPSILON
+                )
+
+
+    def _solve_model(self, sol):
+        self.res = self._run_solver(sol)
+    
+
+    def _solve_with_thermodynamics_cuts(self, sol):
+        '''
+        Solve the problem. In lazy mode, thermodynamic constraints are added for 
+        violating reactions and the problem is re-solved until the solution is 
+        thermodynamically feasible. Since the problem solved is a relaxation of 
+        the fully constrained one, the final solution is optimal for the latter.
+        '''
+
+        while True:
+            self._solve_model(sol)
+            if not self.lazy_thermo or not self._optimization_successful():
+                break
+            
+            violFluxIDs = self._check_thermodynamic_feasibility(sol)
+            if not violFluxIDs:
+                break
+            
+            logging.info(
+                f'adding thermodynamic constraints for {len(violFluxIDs)} fluxes'
+            )
+            self._add_thermodynamics_cuts(violFluxIDs)
+
+
+    def _get_problem_size(self):
+        '''
+        Return the approximate number of variables of the problem, including 
+        log concentrations and direction binaries.
+        '''
+
+        return (super()._get_problem_size() + len(self.varMetabIDs) 
+                + len(self.cstrFluxIDs))
+
+
     def _get_opt_lnconcs(self):
         optLnconcs = {metabid: value(self.pyoModel.lnconcs[metabid]) 
                       for metabid in self.pyoModel.varMetabIDs}
@@ -574,34 +1455,40 @@ class TFBAOptimizer(FBAOptimizer):
         return optLnconcs
     
 
-    def _get_opt_gibbis_energies(self, error=False):
+    def _get_opt_gibbis_energies(self):
         fluxids_filtered = list(
             filter(lambda fluxid: not re.match(r'.+_b$', fluxid), self.cstrFluxIDs)
         )
         optDgps = {}
         for fluxid in fluxids_filtered:
-            opt_dgp = value(self._calculate_gibbs_energy(self.pyoModel, fluxid))
-            if error:
-                opt_dgp_err = value(self.pyoModel.errors[fluxid])
-            else:
-                opt_dgp_err = 0
-                    
             rxnid = re.sub(r'_[fb]$', '', fluxid)
-            optDgps[rxnid] = opt_dgp + opt_dgp_err
+            optDgps[rxnid] = value(
+                self._calculate_gibbs_energy(self.pyoModel, fluxid)
+            )
 
         return optDgps
             
                 
-    def solve(self, solver='glpk'):    
+    @profiled
+    @cached
+    def solve(self, solver='glpk', sensitivity=False):
         '''
         Parameters
         ----------
-        solver: {"glpk", "gurobi"}
+        solver: {"glpk", "gurobi", "highs"}
             "gurobi" is highly recommended for large models.
+        sensitivity: bool
+            Whether to report shadow prices and reduced costs at the optimum, 
+            evaluated with directions fixed.
         '''
 
-        if_error = not bool(self.conf_level is None)
+        with self.metrics.timer('build'):
+            self._build_problem()
+
+        return self._solve_problem(solver, sensitivity)
+
 
+    def _build_problem(self):
         self._build_flux_variables()
         self._build_conc_variables()
         self._build_binary_variables()
@@ -609,19 +1496,22 @@ class TFBAOptimizer(FBAOptimizer):
         self._build_mass_balance_contraints()
         self._build_flux_bound_constraints()
         self._build_ratio_constraint()
-        if self.conf_level is None:
-            self._build_thermodynamics_constraints()
-        else:
+        if self.conf_level is not None:
             self._build_error_variables()
-            self._build_thermodynamics_constraints_with_uncertainty()
-        
+        self._build_thermodynamics_constraints()
+
+
+    def _solve_problem(self, solver, sensitivity=False):
         sol = self._get_solver(solver)
-        self.res = sol.solve(self.pyoModel, report_timing=False, tee=False)
+        self._solve_with_thermodynamics_cuts(sol)
         optObj = self._get_opt_obj()
         optFluxes = self._get_opt_fluxes()
         optLnconcs = self._get_opt_lnconcs()    
-        optDgps = self._get_opt_gibbis_energies(if_error)
+        optDgps = self._get_opt_gibbis_energies()
         optSuccess = self._optimization_successful()
+        sensitivities = {}
+        if sensitivity and optSuccess:
+            sensitivities = self._get_sensitivities(sol)
             
         if self.parsimonious and optSuccess:
             logging.info('estimating parsimonious fluxes')
@@ -630,11 +1520,11 @@ class TFBAOptimizer(FBAOptimizer):
             self._build_parsimonious_objective()
             self._build_objective_constraint(optObj)
 
-            self.res = sol.solve(self.pyoModel, report_timing=False, tee=False)
+            self._solve_with_thermodynamics_cuts(sol)
 
             optFluxes = self._get_opt_fluxes()
             optLnconcs = self._get_opt_lnconcs()    
-            optDgps = self._get_opt_gibbis_energies(if_error)
+            optDgps = self._get_opt_gibbis_energies()
             optSuccess = self._optimization_successful()
         
         return TFBAResults(
@@ -642,7 +1532,8 @@ class TFBAOptimizer(FBAOptimizer):
             optFluxes, 
             optLnconcs, 
             optDgps, optSuccess, 
-            self.model.stoichiometric_matrix
+            self.model.stoichiometric_matrix,
+            **sensitivities
         )
 
 
@@ -666,6 +1557,7 @@ class EFBAOptimizer(FBAOptimizer):
             enz_prot_lb,
             parsimonious,
             slack, 
+            loopless=False,
             **kwargs
     ):
         '''
@@ -691,6 +1583,11 @@ class EFBAOptimizer(FBAOptimizer):
             List of reactions included in the enzyme protein cost constraint.
         enz_prot_lb : float
             Upper bound of enzyme protein fraction.
+        loopless : bool
+            Whether to eliminate thermodynamically infeasible internal cycles 
+            using loop law constraints, or by removing cycles from the optimum 
+            if no flux in cycles is in the objective or bounded below by a 
+            positive value.
         '''
         
         super().__init__(
@@ -704,6 +1601,7 @@ class EFBAOptimizer(FBAOptimizer):
             ex_mass_bal_cons=ex_mass_bal_cons,
             parsimonious=parsimonious,
             slack=slack, 
+            loopless=loopless,
             **kwargs
         )
         
@@ -724,7 +1622,7 @@ class EFBAOptimizer(FBAOptimizer):
             Reaction ID.
         '''
         
-        if self.model.reactions[rxnid].rev:
+        if self._is_reversible(rxnid):
             fflux = model.fluxes[rxnid+'_f']
             bflux = model.fluxes[rxnid+'_b']
             fkcat = self.model.reactions[rxnid].fkcat
@@ -741,6 +1639,38 @@ class EFBAOptimizer(FBAOptimizer):
         return cost
 
     
+    def _get_enzyme_cost_coefficient(self, fluxid):
+        rxnid = re.sub(r'_[fb]$', '', fluxid)
+        if re.match(r'.+_b$', fluxid):
+            kcat = self.model.reactions[rxnid].bkcat
+        else:
+            kcat = self.model.reactions[rxnid].fkcat
+
+        return 1/3600*self.model.reactions[rxnid].mw/kcat
+    
+
+    def _get_enzyme_fluxids(self, rxnid):
+        if self._is_reversible(rxnid):
+            return [rxnid+'_f', rxnid+'_b']
+        else:
+            return [rxnid]
+    
+
+    def _get_enzyme_cost_row(self):
+        costCoes = np.zeros(len(self.varFluxIDs))
+        for rxnid in self.inc_enz_cons:
+            # left to _build_enzyme_cost_constraint to raise
+            rxn = self.model.reactions[rxnid]
+            if rxn.is_biomass_formation or rxn.is_exch_reaction:
+                continue
+            for fluxid in self._get_enzyme_fluxids(rxnid):
+                costCoes[self.fluxIndex.get_position(fluxid)] = (
+                    self._get_enzyme_cost_coefficient(fluxid)
+                )
+
+        return costCoes, self.q
+
+
     def _build_enzyme_cost_constraint(self):
         for rxnid in self.inc_enz_cons:
             if self.model.reactions[rxnid].is_biomass_formation:
@@ -772,26 +1702,68 @@ class EFBAOptimizer(FBAOptimizer):
         return optTotalEcost, optEcosts
     
 
-    def solve(self, solver='glpk'):
+    def _get_sensitivities(self, sol):
         '''
+        Return shadow prices of mass balance constraints and the enzyme protein 
+        cost constraint, and reduced costs of fluxes.
+
         Parameters
         ----------
-        solver: {"glpk", "gurobi"}
+        sol: solver
+            Solver used for the LP with fixed binary variables.
+        '''
+
+        if not hasattr(self.pyoModel, 'dual'):
+            self._solve_with_fixed_binaries(sol)
+        
+        epcShadowPrice = self.pyoModel.dual.get(self.pyoModel.EPCcstr, 0)
+        sensitivities = super()._get_sensitivities(sol)
+        sensitivities['epc_shadow_price'] = epcShadowPrice
+
+        return sensitivities
+    
+
+    @profiled
+    @cached
+    def solve(self, solver='glpk', sensitivity=False):
+        '''
+        Parameters
+        ----------
+        solver: {"glpk", "gurobi", "highs"}
             "gurobi" is highly recommended for large models.
+        sensitivity: bool
+            Whether to report shadow prices and reduced costs at the optimum.
         '''
 
+        with self.metrics.timer('build'):
+            self._build_problem()
+
+        return self._solve_problem(solver, sensitivity)
+
+
+    def _build_problem(self):
         self._build_flux_variables()
         self._build_objective()
         self._build_mass_balance_contraints()
         self._build_enzyme_cost_constraint()
+        if self.loopless:
+            self._build_loopless_constraints()
+
+
+    def _solve_problem(self, solver, sensitivity=False):
+        if sensitivity and not self._has_binary_variables():
+            self._build_sensitivity_suffixes()
         
         sol = self._get_solver(solver)
-        self.res = sol.solve(self.pyoModel, report_timing=False, tee=False)
+        self.res = self._run_solver(sol)
         
         optObj = self._get_opt_obj()
         optFluxes = self._get_opt_fluxes()
         optTotalEcost, optEcosts = self._get_opt_enzyme_protein_cost()
         optSuccess = self._optimization_successful()
+        sensitivities = {}
+        if sensitivity and optSuccess:
+            sensitivities = self._get_sensitivities(sol)
 
         if self.parsimonious and optSuccess:
             logging.info('estimating parsimonious fluxes')
@@ -800,10 +1772,15 @@ class EFBAOptimizer(FBAOptimizer):
             self._build_parsimonious_objective()
             self._build_objective_constraint(optObj)
 
-            self.res = sol.solve(self.pyoModel, report_timing=False, tee=False)
+            self.res = self._run_solver(sol)
 
             optFluxes = self._get_opt_fluxes()    
             optTotalEcost, optEcosts = self._get_opt_enzyme_protein_cost()
+
+        if self.cycleFree and optSuccess:
+            self._remove_loops(sol)
+            optFluxes = self._get_opt_fluxes()    
+            optTotalEcost, optEcosts = self._get_opt_enzyme_protein_cost()
         
         return EFBAResults(
             optObj, 
@@ -811,7 +1788,8 @@ class EFBAOptimizer(FBAOptimizer):
             optTotalEcost, 
             optEcosts, 
             optSuccess,
-            self.model.stoichiometric_matrix
+            self.model.stoichiometric_matrix,
+            **sensitivities
         )
 
 
@@ -842,7 +1820,10 @@ class ETFBAOptimizer(TFBAOptimizer, EFBAOptimizer):
             enz_prot_lb,
             parsimonious,
             slack,
-            dgpm_conf_level
+            dgpm_conf_level,
+            dgpm_error_basis=None,
+            kinetic_cost=False,
+            lazy_thermo=False
     ):
         '''
         Parameters
@@ -883,6 +1864,15 @@ class ETFBAOptimizer(TFBAOptimizer, EFBAOptimizer):
         dgpm_conf_level : float
             Confidence level for considering uncertainty in standard reaction Gibbs 
             energy.
+        dgpm_error_basis : dict or DataFrame
+            Mapping of reaction IDs to rows of a low-rank square root of the 
+            covariance matrix of standard reaction Gibbs energies.
+        kinetic_cost : bool
+            Whether to account for substrate saturation and thermodynamic 
+            reversibility in enzyme protein costs.
+        lazy_thermo : bool
+            Whether to add thermodynamic constraints only for reactions found 
+            to violate thermodynamic feasibility in intermediate solutions.
         '''
 
         super().__init__(
@@ -904,18 +1894,516 @@ class ETFBAOptimizer(TFBAOptimizer, EFBAOptimizer):
             enz_prot_lb=enz_prot_lb,
             parsimonious=parsimonious,
             slack=slack,
-            dgpm_conf_level=dgpm_conf_level
+            dgpm_conf_level=dgpm_conf_level,
+            dgpm_error_basis=dgpm_error_basis,
+            lazy_thermo=lazy_thermo
         )
 
+        self.kinetic_cost = kinetic_cost
 
-    def solve(self, solver='glpk'):
+
+    def _get_kinetic_reactants(self, fluxid):
         '''
+        Return stoichiometric coefficients and Km values of reactants in the 
+        direction of flux.
+
         Parameters
         ----------
-        solver: {"glpk", "gurobi"}
-            "gurobi" is highly recommended for large models.
+        fluxid: str
+            Flux ID.
+        '''
+        
+        rxnid = re.sub(r'_[fb]$', '', fluxid)
+        if re.match(r'.+_b$', fluxid):
+            reacs = self.model.reactions[rxnid].products
+        else:
+            reacs = self.model.reactions[rxnid].substrates
+
+        reacInfos = []
+        for reacid in reacs:
+            if self._is_var_metabolite(reacid):
+                reac = reacs[reacid]
+                km = reac.kms[rxnid]
+                reacInfos.append(
+                    (reacid, abs(reac.coes[rxnid]), DEFAULT_KM if km is None else km)
+                )
+
+        return reacInfos
+    
+
+    def _calculate_saturation_factor(self, fluxid):
+        '''
+        Return the natural logarithm of the inverse saturation factor and its 
+        gradient with respect to log concentrations at the current solution.
+
+        Parameters
+        ----------
+        fluxid: str
+            Flux ID.
         '''
+
+        lnFactor = 0
+        grads = ComponentMap()
+        for reacid, coe, km in self._get_kinetic_reactants(fluxid):
+            lnconc = self.pyoModel.lnconcs[reacid]
+            lnKmRatio = np.log(km) - value(lnconc)
+            lnFactor += coe*np.logaddexp(0, lnKmRatio)
+            grads[lnconc] = -coe/(1 + np.exp(-lnKmRatio))
+
+        return lnFactor, grads
+    
+
+    def _calculate_reversibility_factor(self, fluxid):
+        '''
+        Return the natural logarithm of the inverse reversibility factor and its 
+        gradient with respect to variables of Gibbs energy at the current 
+        solution.
+
+        Parameters
+        ----------
+        fluxid: str
+            Flux ID.
+        '''
+
+        dgp = self._calculate_gibbs_energy(self.pyoModel, fluxid)
+        # directions not chosen may have positive Gibbs energies
+        theta = min(value(dgp), 0)/(R*T)
+        
+        # the logarithm is extended by its tangent near equilibrium, so that 
+        # it stays finite and convex with a bounded gradient
+        thetaMax = np.log1p(-1/MAX_REV_FACTOR)
+        if theta < thetaMax:
+            lnFactor = -np.log(-np.expm1(theta))
+            slope = np.exp(theta)/(-np.expm1(theta))
+        else:
+            slope = MAX_REV_FACTOR - 1
+            lnFactor = np.log(MAX_REV_FACTOR) + slope*(theta - thetaMax)
         
+        dgpRepn = generate_standard_repn(dgp)
+        coe = slope/(R*T)
+        grads = ComponentMap(
+            (var, coe*var_coe) 
+            for var, var_coe in zip(dgpRepn.linear_vars, dgpRepn.linear_coefs)
+        )
+
+        return lnFactor, grads
+    
+
+    def _calculate_min_saturation_factor(self, fluxid):
+        '''
+        Return the lower bound of the inverse saturation factor over the bounds 
+        of log concentrations.
+
+        Parameters
+        ----------
+        fluxid: str
+            Flux ID.
+        '''
+
+        lnFactor = 0
+        for reacid, coe, km in self._get_kinetic_reactants(fluxid):
+            lnconc_ub = self.pyoModel.lnconcs[reacid].bounds[1]
+            lnFactor += coe*np.logaddexp(0, np.log(km) - lnconc_ub)
+
+        return np.exp(lnFactor)
+
+
+    def _build_kinetic_enzyme_cost_constraints(self):
+        '''
+        Enzyme costs are modeled by variables bounded below by kcat based costs 
+        scaled with the minimum inverse saturation factors. For fluxes with 
+        direction binaries, log fluxes and log costs are added as auxiliary 
+        variables, and cuts accounting for saturation and reversibility at 
+        candidate solutions are added lazily by _add_enzyme_cost_cuts.
+        '''
+
+        for rxnid in self.inc_enz_cons:
+            if self.model.reactions[rxnid].is_biomass_formation:
+                raise ValueError(
+                    "biomass formation can't be included in enzyme protein cost"
+                )
+                
+            if self.model.reactions[rxnid].is_exch_reaction:
+                raise ValueError(
+                    f"exchange reaction {rxnid} can't be included in "
+                    "enzyme protein cost"
+                )
+
+        self.pyoModel.incEnzRxnIDs = Set(initialize=self.inc_enz_cons)
+        self.pyoModel.ecosts = Var(
+            self.pyoModel.incEnzRxnIDs, 
+            within=NonNegativeReals
+        )
+
+        def ecost_rule(model, rxnid):
+            cost = sum(
+                self._get_enzyme_cost_coefficient(fluxid)
+                *self._calculate_min_saturation_factor(fluxid)
+                *model.fluxes[fluxid] 
+                for fluxid in self._get_enzyme_fluxids(rxnid)
+            )
+            return model.ecosts[rxnid] >= cost
+        
+        def epc_rule(model):
+            return (0, sum(model.ecosts[rxnid] for rxnid in self.inc_enz_cons), 
+                    self.q)
+
+        self.pyoModel.ECOSTcstr = Constraint(
+            self.pyoModel.incEnzRxnIDs, 
+            rule=ecost_rule
+        )
+        self.pyoModel.EPCcstr = Constraint(rule=epc_rule)
+
+        kinFluxIDs = [fluxid for rxnid in self.inc_enz_cons 
+                      for fluxid in self._get_enzyme_fluxids(rxnid)
+                      if fluxid in self.cstrFluxIDs 
+                      and fluxid not in self.zeroFluxIDs
+                      and self.pyoModel.fluxes[fluxid].ub > FLUX_TOL]
+        self.pyoModel.kinFluxIDs = Set(initialize=kinFluxIDs)
+        self.pyoModel.lnfluxes = Var(
+            self.pyoModel.kinFluxIDs, 
+            bounds=lambda model, fluxid: (
+                np.log(FLUX_TOL), np.log(model.fluxes[fluxid].ub)
+            )
+        )
+        self.pyoModel.lncosts = Var(
+            self.pyoModel.kinFluxIDs, 
+            bounds=lambda model, fluxid: (
+                np.log(self._get_enzyme_cost_coefficient(fluxid)*FLUX_TOL), 
+                None
+            )
+        )
+        self.pyoModel.fluxTangents = Param(
+            self.pyoModel.kinFluxIDs, 
+            mutable=True, 
+            initialize=lambda model, fluxid: model.fluxes[fluxid].ub
+        )
+
+        def lnflux_rule(model, fluxid):
+            tangent = model.fluxTangents[fluxid]
+            return (model.lnfluxes[fluxid] 
+                    >= log(tangent) - 1 + model.fluxes[fluxid]/tangent)
+
+        self.pyoModel.LNFLUXcstr = Constraint(
+            self.pyoModel.kinFluxIDs, 
+            rule=lnflux_rule
+        )
+        self.pyoModel.LNCOSTcuts = ConstraintList()
+        self.pyoModel.EPCcuts = ConstraintList()
+        self.cutFluxIDs = set()
+
+
+    def _calculate_kinetic_enzyme_cost(self, fluxid):
+        '''
+        Return the enzyme cost of flux considering saturation and reversibility, 
+        and the gradient of its natural logarithmic factor at the current 
+        solution.
+
+        Parameters
+        ----------
+        fluxid: str
+            Flux ID.
+        '''
+
+        lnFactor, grads = self._calculate_saturation_factor(fluxid)
+        lnRevFactor, revGrads = self._calculate_reversibility_factor(fluxid)
+        lnFactor += lnRevFactor
+        for var, grad in revGrads.items():
+            grads[var] = grads.get(var, 0) + grad
+        
+        cost = (self._get_enzyme_cost_coefficient(fluxid)*np.exp(lnFactor)
+                *value(self.pyoModel.fluxes[fluxid]))
+        
+        return cost, np.exp(lnFactor), grads
+
+
+    def _update_log_flux(self, fluxid, flux):
+        '''
+        Log fluxes are bounded below by tangents of logarithm, which are exact 
+        at tangent points and overestimate elsewhere, so enzyme costs are 
+        never underestimated. The tangent point is moved to the current flux 
+        if the tangent overestimates by more than CUT_TOL.
+
+        Parameters
+        ----------
+        fluxid: str
+            Flux ID.
+        flux: float
+            Current flux.
+
+        Returns
+        -------
+        updated: bool
+            Whether the tangent point was moved.
+        '''
+
+        tangent = self.pyoModel.fluxTangents[fluxid]
+        ratio = flux/value(tangent)
+        if ratio - 1 - np.log(ratio) <= np.log1p(CUT_TOL):
+            return False
+
+        tangent.set_value(flux)
+
+        return True
+
+
+    def _add_log_cost_cut(self, fluxid, ln_factor, grads):
+        '''
+        Add the outer approximation cut of the log cost, which is convex in 
+        log flux, log concentrations and errors, at the current solution. The 
+        cut is only active if the flux direction is chosen (binary variable 
+        equals 1). Terms with gradients below COEF_TOL are dropped with their 
+        largest contribution moved to the constant, so the cut stays valid.
+
+        Parameters
+        ----------
+        fluxid: str
+            Flux ID.
+        ln_factor: float
+            Log of the inverse saturation and reversibility factor.
+        grads: ComponentMap
+            Gradient of ln_factor with respect to variables.
+        '''
+
+        const = ln_factor
+        bigM = ln_factor + np.log(self.pyoModel.lnfluxes[fluxid].ub/FLUX_TOL)
+        terms = []
+        for var, grad in grads.items():
+            lb, ub = var.bounds
+            varValue = value(var)
+            devs = (grad*(lb - varValue), grad*(ub - varValue))
+            bigM += max(devs)
+            if abs(grad) < COEF_TOL:
+                const += min(devs)
+            else:
+                const -= grad*varValue
+                terms.append((grad, var))
+
+        lncost = self.pyoModel.lncosts[fluxid]
+        self.pyoModel.LNCOSTcuts.add(
+            lncost - np.log(self._get_enzyme_cost_coefficient(fluxid))
+            - self.pyoModel.lnfluxes[fluxid]
+            - sum(grad*var for grad, var in terms)
+            + bigM*(1 - self.pyoModel.xs[fluxid])
+            >= const
+        )
+
+
+    def _add_enzyme_cost_cuts(self):
+        '''
+        Add cuts for thermodynamically constrained fluxes whose enzyme costs are 
+        underestimated at the current solution. Costs are approximated in log 
+        space, where the log cost is convex in log flux, log concentrations and 
+        errors: an outer approximation cut of the log cost and a tangent of the 
+        exponential at the log cost are added, both valid everywhere, so the 
+        loop converges as cuts accumulate. Tangents of log fluxes are moved to 
+        current fluxes as well.
+
+        Returns
+        -------
+        ncuts: int
+            Number of cuts added and tangent points moved.
+        '''
+        
+        ncuts = 0
+        for rxnid in self.inc_enz_cons:
+            ecost = value(self.pyoModel.ecosts[rxnid])
+            for fluxid in self._get_enzyme_fluxids(rxnid):
+                if (fluxid not in self.pyoModel.cstrFluxIDs 
+                    or fluxid not in self.pyoModel.kinFluxIDs):
+                    continue
+                
+                flux = value(self.pyoModel.fluxes[fluxid])
+                if flux <= FLUX_TOL:
+                    continue
+
+                cost, factor, grads = self._calculate_kinetic_enzyme_cost(fluxid)
+                if cost - ecost > max(CUT_TOL*cost, COEF_TOL):
+                    self._add_log_cost_cut(fluxid, np.log(factor), grads)
+                    lnCost = np.log(cost)
+                    self.pyoModel.EPCcuts.add(
+                        self.pyoModel.ecosts[rxnid] 
+                        >= cost*(1 + self.pyoModel.lncosts[fluxid] - lnCost)
+                    )
+                    self.cutFluxIDs.add(fluxid)
+                    ncuts += 1
+
+                # log fluxes only matter in costs once cut
+                if fluxid in self.cutFluxIDs:
+                    ncuts += self._update_log_flux(fluxid, flux)
+
+        return ncuts
+    
+
+    def _set_remaining_time(self, sol, start):
+        '''
+        Limit the time of the next solve to what is left of the time limit 
+        since start, and return False if nothing is left.
+        '''
+
+        if self.time_limit is None:
+            return True
+
+        remaining = self.time_limit - (time.perf_counter() - start)
+        if remaining <= 0:
+            return False
+        self._set_time_limit(sol, remaining)
+
+        return True
+
+
+    def _refine_enzyme_cost_cuts(self, sol, start):
+        '''
+        Add enzyme cost cuts with flux directions fixed at their current values, 
+        so that only LPs are solved.
+
+        Parameters
+        ----------
+        sol: solver
+            Solver returned by _get_solver.
+        start: float
+            Start time of the rounds of cuts.
+
+        Returns
+        -------
+        directions: list or None
+            Pairs of binary variables and their values if enzyme costs are no 
+            longer underestimated, otherwise None.
+        '''
+
+        binVars = self._fix_binaries()
+        directions = None
+        for _ in range(MAX_CUT_ROUNDS):
+            if not self._set_remaining_time(sol, start):
+                break
+
+            super()._solve_model(sol)
+            if not self._optimization_successful():
+                break
+
+            if self._add_enzyme_cost_cuts() == 0:
+                directions = [(var, value(var)) for var in binVars]
+                break
+        self._unfix_binaries(binVars)
+
+        return directions
+
+
+    def _solve_model(self, sol):
+        '''
+        Solve the problem. With kinetic enzyme costs, cuts are added until 
+        enzyme costs of the solution are no longer underestimated. After each 
+        MILP, cuts are refined by LPs with flux directions fixed, which are 
+        much cheaper, and the MILP is re-solved with all cuts to update the 
+        directions. If the MILP does not improve the objective by more than 
+        CUT_TOL, the directions of the last refined solution are restored. The 
+        time limit applies to all the rounds.
+        '''
+
+        if not self.kinetic_cost:
+            super()._solve_model(sol)
+            return
+
+        sign = 1 if self.pyoModel.obj.sense == maximize else -1
+        start = time.perf_counter()
+        bestObj = bestDirections = None
+        for _ in range(MAX_CUT_ROUNDS):
+            if not self._set_remaining_time(sol, start):
+                logging.warning(
+                    'time limit reached in rounds of enzyme cost cuts, enzyme '
+                    'costs may be underestimated'
+                )
+                break
+
+            super()._solve_model(sol)
+            if not self._optimization_successful():
+                break
+
+            if (bestObj is not None 
+                and sign*(self._get_opt_obj() - bestObj) 
+                <= CUT_TOL*abs(bestObj)):
+                for var, direction in bestDirections:
+                    var.set_value(direction)
+                self._refine_enzyme_cost_cuts(sol, start)
+                break
+
+            if self._add_enzyme_cost_cuts() == 0:
+                break
+            
+            directions = self._refine_enzyme_cost_cuts(sol, start)
+            if directions is not None:
+                bestObj, bestDirections = self._get_opt_obj(), directions
+        else:
+            logging.warning(
+                'maximum rounds of enzyme cost cuts reached, enzyme costs may be '
+                'underestimated'
+            )
+        
+        self._set_time_limit(sol, self.time_limit)
+    
+
+    def _update_bound_constraints(self, fluxids):
+        super()._update_bound_constraints(fluxids)
+
+        # log fluxes are widened with fluxes, but never narrowed since tangents 
+        # of fluxes set to zero remain above the lower bounds of log fluxes
+        if self.kinetic_cost:
+            for fluxid in fluxids:
+                if fluxid in self.pyoModel.kinFluxIDs:
+                    lnflux = self.pyoModel.lnfluxes[fluxid]
+                    lnflux.setub(max(
+                        lnflux.ub, 
+                        np.log(max(self.pyoModel.fluxes[fluxid].ub, FLUX_TOL))
+                    ))
+
+
+    def _get_opt_kinetic_enzyme_protein_cost(self):
+        optEcosts = {}
+        for rxnid in self.inc_enz_cons:
+            optEcosts[rxnid] = 0
+            for fluxid in self._get_enzyme_fluxids(rxnid):
+                if fluxid in self.pyoModel.cstrFluxIDs:
+                    optEcosts[rxnid] += self._calculate_kinetic_enzyme_cost(
+                        fluxid
+                    )[0]
+                else:
+                    optEcosts[rxnid] += (
+                        self._get_enzyme_cost_coefficient(fluxid)
+                        *self._calculate_min_saturation_factor(fluxid)
+                        *value(self.pyoModel.fluxes[fluxid])
+                    )
+        optTotalEcost = sum(optEcosts.values())
+
+        return optTotalEcost, optEcosts
+
+
+    def _get_opt_enzyme_protein_cost(self):
+        if self.kinetic_cost:
+            return self._get_opt_kinetic_enzyme_protein_cost()
+        else:
+            return super()._get_opt_enzyme_protein_cost()
+
+
+    @profiled
+    @cached
+    def solve(self, solver='glpk', sensitivity=False):
+        '''
+        Parameters
+        ----------
+        solver: {"glpk", "gurobi", "highs"}
+            "gurobi" is highly recommended for large models.
+        sensitivity: bool
+            Whether to report shadow prices and reduced costs at the optimum, 
+            evaluated with directions fixed.
+        '''
+
+        with self.metrics.timer('build'):
+            self._build_problem()
+
+        return self._solve_problem(solver, sensitivity)
+
+
+    def _build_problem(self):
         self._build_flux_variables()
         self._build_conc_variables()
         self._build_binary_variables()
@@ -923,22 +2411,28 @@ class ETFBAOptimizer(TFBAOptimizer, EFBAOptimizer):
         self._build_mass_balance_contraints()
         self._build_flux_bound_constraints()
         self._build_ratio_constraint()
-        if self.conf_level is None:
-            self._build_thermodynamics_constraints()
-        else:
+        if self.conf_level is not None:
             self._build_error_variables()
-            self._build_thermodynamics_constraints_with_uncertainty()
-        self._build_enzyme_cost_constraint()
-        
+        self._build_thermodynamics_constraints()
+        if self.kinetic_cost:
+            self._build_kinetic_enzyme_cost_constraints()
+        else:
+            self._build_enzyme_cost_constraint()
+
+
+    def _solve_problem(self, solver, sensitivity=False):
         sol = self._get_solver(solver)
-        self.res = sol.solve(self.pyoModel, report_timing=False, tee=False)
+        self._solve_with_thermodynamics_cuts(sol)
         
         optObj = self._get_opt_obj()
         optFluxes = self._get_opt_fluxes()
         optLnconcs = self._get_opt_lnconcs()    
-        optDgps = self._get_opt_gibbis_energies(not self.conf_level is None)
+        optDgps = self._get_opt_gibbis_energies()
         optTotalEcost, optEcosts = self._get_opt_enzyme_protein_cost()
         optSuccess = self._optimization_successful()
+        sensitivities = {}
+        if sensitivity and optSuccess:
+            sensitivities = self._get_sensitivities(sol)
 
         if self.parsimonious and optSuccess:
             logging.info('estimating parsimonious fluxes')
@@ -947,11 +2441,11 @@ class ETFBAOptimizer(TFBAOptimizer, EFBAOptimizer):
             self._build_parsimonious_objective()
             self._build_objective_constraint(optObj)
 
-            self.res = sol.solve(self.pyoModel, report_timing=False, tee=False)
+            self._solve_with_thermodynamics_cuts(sol)
 
             optFluxes = self._get_opt_fluxes()
             optLnconcs = self._get_opt_lnconcs()    
-            optDgps = self._get_opt_gibbis_energies(not self.conf_level is None)    
+            optDgps = self._get_opt_gibbis_energies()    
             optTotalEcost, optEcosts = self._get_opt_enzyme_protein_cost()
         
         return ETFBAResults(
@@ -962,5 +2456,6 @@ class ETFBAOptimizer(TFBAOptimizer, EFBAOptimizer):
             optTotalEcost, 
             optEcosts, 
             optSuccess,
-            self.model.stoichiometric_matrix
+            self.model.stoichiometric_matrix,
+            **sensitivities
         )
@@ -0,0 +1,105 @@
+'''Define functions to distribute CPU cores among parallel workers.'''
+
+
+import os
+import platform
+
+
+SMALL_MODEL_SIZE = 2000    # Problems with fewer variables are solved by one
+                           # thread per worker in auto mode
+LARGE_MODEL_SIZE = 10000   # Problems with more variables are solved by
+                           # MAX_AUTO_THREADS threads per worker in auto mode
+MAX_AUTO_THREADS = 4
+
+
+def get_available_cores():
+    '''
+    Return the IDs of CPU cores the current process is allowed to run on.
+    '''
+
+    if platform.system() == 'Linux':
+        return sorted(os.sched_getaffinity(0))
+    else:
+        return list(range(os.cpu_count()))
+
+
+def plan_workers(n_jobs, n_items, problem_size=None, threads=None):
+    '''
+    Return the number of workers and the number of solver threads per worker,
+    so that workers x threads does not exceed the available cores.
+
+    Parameters
+    ----------
+    n_jobs: int or "auto"
+        Number of workers. If "auto", the number of threads per worker is
+        chosen by problem_size, and the available cores are filled with
+        workers.
+    n_items: int
+        Number of items (e.g., reactions or scenarios) to solve. No more
+        workers than items are started.
+    problem_size: int
+        Number of variables of the problem. Only used if n_jobs is "auto".
+    threads: int
+        Number of solver threads per worker. If None, the available cores are
+        evenly divided among workers.
+    '''
+
+    nCores = len(get_available_cores())
+    n_items = max(n_items, 1)
+
+    if n_jobs == 'auto':
+        if threads is None:
+            if problem_size is None or problem_size < SMALL_MODEL_SIZE:
+                threads = 1
+            elif problem_size < LARGE_MODEL_SIZE:
+                threads = 2
+            else:
+                threads = MAX_AUTO_THREADS
+            threads = min(threads, nCores)
+        n_jobs = max(nCores//threads, 1)
+
+    elif not isinstance(n_jobs, int) or n_jobs < 1:
+        raise ValueError('n_jobs should be a positive int or "auto"')
+
+    n_jobs = min(n_jobs, n_items)
+    if threads is None:
+        threads = max(nCores//n_jobs, 1)
+
+    return n_jobs, threads
+
+
+def partition_cores(n_workers, threads):
+    '''
+    Return a list of core IDs for each worker. Each worker gets a block of
+    threads cores, and blocks wrap around the available cores if workers x
+    threads exceeds them.
+
+    Parameters
+    ----------
+    n_workers: int
+        Number of workers.
+    threads: int
+        Number of cores per worker.
+    '''
+
+    cores = get_available_cores()
+    threads = min(threads, len(cores))
+
+    return [[cores[(i*threads+j) % len(cores)] for j in range(threads)]
+            for i in range(n_workers)]
+
+
+def set_cpu_affinity(cores=None):
+    '''
+    Bind the current process to cores. Only effective on Linux.
+
+    Parameters
+    ----------
+    cores: list
+        Core IDs. If None, all cores of the machine are used.
+    '''
+
+    if platform.system() == 'Linux':
+        if cores is None:
+            cores = range(os.cpu_count())
+        os.sched_setaffinity(os.getpid(), cores)
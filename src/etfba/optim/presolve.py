@@ -0,0 +1,115 @@
+'''Define the bound propagation presolve of fluxes.'''
+
+
+import numpy as np
+
+
+MAX_PRESOLVE_ROUNDS = 50   # Maximum rounds of bound propagation
+MIN_TIGHTENING = 1e-3      # Bounds are only tightened by more than this
+                           # fraction of the flux range (at least 1)
+BOUND_MARGIN = 1e-9        # Tightened bounds are relaxed by this value against
+                           # rounding errors, and upper bounds below it are
+                           # set to zero
+INFEAS_TOL = 1e-6          # Lower bounds exceeding upper bounds by more than
+                           # this value indicate infeasible bounds
+
+
+def _get_row_bounds(rows, cols, coes, lbs, ubs, nrows):
+    '''
+    Return bounds of fluxes implied by rows sum(coes*fluxes) = 0, i.e., for
+    each nonzero, the flux balances the rest of the row.
+
+    Parameters
+    ----------
+    rows, cols, coes: array
+        Row indices, column indices and values of nonzeros of the rows.
+    lbs, ubs: array
+        Lower and upper bounds of fluxes.
+    nrows: int
+        Number of rows.
+    '''
+
+    minTerms = np.where(coes > 0, coes*lbs[cols], coes*ubs[cols])
+    maxTerms = np.where(coes > 0, coes*ubs[cols], coes*lbs[cols])
+    minActs = np.bincount(rows, minTerms, minlength=nrows)
+    maxActs = np.bincount(rows, maxTerms, minlength=nrows)
+
+    # coe*flux = -rest, where rest is within [restMin, restMax]
+    restMins = minActs[rows] - minTerms
+    restMaxs = maxActs[rows] - maxTerms
+    impliedLbs = np.where(coes > 0, -restMaxs/coes, -restMins/coes)
+    impliedUbs = np.where(coes > 0, -restMins/coes, -restMaxs/coes)
+
+    newLbs = lbs.copy()
+    newUbs = ubs.copy()
+    np.maximum.at(newLbs, cols, impliedLbs)
+    np.minimum.at(newUbs, cols, impliedUbs)
+
+    return newLbs, newUbs
+
+
+def propagate_flux_bounds(
+        stoy_mat,
+        lbs,
+        ubs,
+        cost_coes=None,
+        cost_ub=None,
+        max_rounds=MAX_PRESOLVE_ROUNDS
+):
+    '''
+    Return lower and upper bounds of fluxes tightened by propagating bounds
+    through mass balance rows and the enzyme protein cost row, or None if the
+    bounds are found infeasible. Upper bounds implied to be zero are set to
+    exactly zero.
+
+    Parameters
+    ----------
+    stoy_mat: array
+        Stoichiometric matrix of mass balance rows with columns of fluxes.
+    lbs, ubs: array
+        Lower and upper bounds of fluxes (nonnegative).
+    cost_coes: array
+        Coefficients of fluxes in the enzyme protein cost,
+        sum(cost_coes*fluxes) <= cost_ub. If None, no cost row.
+    cost_ub: float
+        Upper bound of the enzyme protein cost.
+    max_rounds: int
+        Maximum rounds of propagation.
+    '''
+
+    rows, cols = np.nonzero(stoy_mat)
+    coes = stoy_mat[rows, cols]
+    nrows = stoy_mat.shape[0]
+    lbs = np.array(lbs, dtype=float)
+    ubs = np.array(ubs, dtype=float)
+
+    if cost_coes is not None:
+        cost_coes = np.asarray(cost_coes, dtype=float)
+        costCols = np.flatnonzero(cost_coes > 0)
+        costCoes = cost_coes[costCols]
+
+    for _ in range(max_rounds):
+        newLbs, newUbs = _get_row_bounds(rows, cols, coes, lbs, ubs, nrows)
+
+        if cost_coes is not None:
+            terms = costCoes*lbs[costCols]
+            impliedUbs = (cost_ub - (terms.sum() - terms))/costCoes
+            newUbs[costCols] = np.minimum(newUbs[costCols], impliedUbs)
+
+        if np.any(newLbs > newUbs + INFEAS_TOL*np.maximum(1, np.abs(newUbs))):
+            return None
+
+        minSteps = MIN_TIGHTENING*np.maximum(ubs - lbs, 1)
+        tighterLbs = newLbs > lbs + minSteps
+        tighterUbs = newUbs < ubs - minSteps
+        if not (tighterLbs.any() or tighterUbs.any()):
+            break
+
+        lbs[tighterLbs] = newLbs[tighterLbs] - BOUND_MARGIN
+        ubs[tighterUbs] = newUbs[tighterUbs] + BOUND_MARGIN
+
+    # the implied zero upper bounds are up to rounding errors
+    ubs[ubs <= BOUND_MARGIN] = 0
+    lbs = np.minimum(np.maximum(lbs, 0), ubs)
+
+    return lbs, ubs
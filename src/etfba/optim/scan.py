@@ -0,0 +1,361 @@
+'''Define classes for batch scans of scenarios.'''
+
+
+import time
+import logging
+from copy import copy
+import numpy as np
+from ..io.results import ScanResults
+from ..io.cache import make_key
+from ..io.checkpoint import Checkpoint
+from .parallel import set_cpu_affinity
+from .executor import get_executor
+from .aio import get_default_pool
+from .optim import FLUX_TOL
+
+
+REF_SLACK = 1e-6   # Relative relaxation of the objective at alternative 
+                   # reference optima
+
+
+class ScanOptimizer():
+    '''
+    Scan solves a batch of optimization problems of the same kind. Each scenario
+    overrides some arguments of optimize shared by all scenarios.
+    '''
+
+    def __init__(self, model, kind, scenarios, common_args):
+        '''
+        Parameters
+        ----------
+        model: Model
+            The model that calls ScanOptimizer.
+        kind: {'fba', 'tfba', 'efba', 'etfba'}
+            Type of optimization.
+        scenarios: dict
+            Mapping of scenario IDs (str) to dicts of arguments of optimize.
+            Dict arguments (e.g., preset_flux) update the common ones, while
+            others replace the common ones.
+        common_args: dict
+            Arguments of optimize shared by all scenarios.
+        '''
+
+        self.model = model
+        self.kind = kind
+        self.scenarios = scenarios
+        self.common_args = common_args
+
+        self.checkpoint = None
+        self.deadline = None
+        self.threads = None
+        # scenarios not solved, mapped to results copied instead
+        self.skipped = {}
+
+
+    def _get_scenario_args(self, scenid):
+        args = dict(self.common_args)
+        for name, arg in self.scenarios[scenid].items():
+            if isinstance(arg, dict) and isinstance(args.get(name), dict):
+                args[name] = {**args[name], **arg}
+            else:
+                args[name] = arg
+
+        return args
+
+
+    def _solve_scenario(self, solver, scenid):
+        try:
+            optimizer = self.model.optimize(
+                self.kind,
+                **self._get_scenario_args(scenid)
+            )
+            if self.deadline is not None:
+                timeLeft = self.deadline - time.time()
+                if optimizer.time_limit is None or optimizer.time_limit > timeLeft:
+                    # results under the capped time limit are not cached
+                    optimizer.time_limit = timeLeft
+                    optimizer.cache = None
+            optimizer.threads = self.threads
+            res = optimizer.solve(solver)
+        except Exception as e:
+            logging.warning(f'scenario {scenid} failed: {e}')
+            return None
+
+        res._stoy_mat = None
+
+        return res
+
+
+    def _individual_solve(self, solver, scenids, deadline=None, cores=None, 
+                          threads=None):
+        # cores of the worker are kept unless assigned by the executor
+        if cores is not None:
+            set_cpu_affinity(cores)
+        
+        self.deadline = deadline
+        self.threads = threads
+
+        results = {}
+        for scenid in scenids:
+            if self.deadline is not None and time.time() >= self.deadline:
+                break
+            results[scenid] = self._solve_scenario(solver, scenid)
+            if self.checkpoint is not None:
+                self.checkpoint.write(scenid, results[scenid])
+
+        return results
+
+
+    def solve(
+            self, 
+            solver='glpk', 
+            n_jobs=1, 
+            threads=None, 
+            checkpoint=None, 
+            resume=None, 
+            time_budget=None, 
+            executor=None
+    ):
+        '''
+        Parameters
+        ----------
+        solver: {"glpk", "gurobi", "highs"}
+            "gurobi" is highly recommended for large models.
+        n_jobs: int or "auto"
+            Number of jobs to run in parallel. Available CPU cores are divided
+            among jobs, each bound to its own cores. If "auto", the number of
+            jobs and solver threads per job are chosen by the problem size.
+        threads: int
+            Number of solver threads per job (not effective with "glpk").
+            If None, the cores of each job.
+        checkpoint: str
+            File where results of scenarios are recorded as soon as they are
+            solved.
+        resume: str
+            Checkpoint file of an interrupted run. Scenarios recorded in it are
+            skipped, and new results are appended to it unless checkpoint is
+            given.
+        time_budget: float
+            Time in seconds allowed for the whole scan. Scenarios left unsolved
+            when it runs out are reported as unfinished, and the time limit of
+            each solver call is capped by the time left.
+        executor: Executor or concurrent.futures.Executor
+            Executor running chunks of scenarios in parallel, e.g., 
+            QueueExecutor whose workers span multiple nodes. If given, n_jobs 
+            is ignored.
+        '''
+
+        deadline = None if time_budget is None else time.time() + time_budget
+
+        key = make_key(
+            self.model.fingerprint(),
+            self.kind,
+            self.common_args,
+            self.scenarios,
+            solver
+        )
+        self.checkpoint, results = Checkpoint.open(key, checkpoint, resume)
+
+        scenids_left = [scenid for scenid in self.scenarios
+                        if scenid not in results and scenid not in self.skipped]
+        if scenids_left:
+            problemSize = self.model.optimize(
+                self.kind, 
+                **self._get_scenario_args(scenids_left[0])
+            )._get_problem_size()
+            executor = get_executor(executor, n_jobs)
+            nChunks, coreSets, threads = executor.partition(
+                len(scenids_left), problemSize, threads
+            )
+            scenid_chunks = np.array_split(scenids_left, nChunks)
+
+            chunkResults = executor.run(
+                self._individual_solve,
+                [(solver, scenid_chunk.tolist(), deadline, cores, threads)
+                 for scenid_chunk, cores in zip(scenid_chunks, coreSets)]
+            )
+            for chunkResult in chunkResults:
+                results.update(chunkResult)
+
+        solved = [scenid for scenid in self.scenarios if scenid in results]
+        results.update({scenid: copy(res) 
+                        for scenid, res in self.skipped.items()})
+
+        stoyMat = self.model.stoichiometric_matrix
+        for res in results.values():
+            if res is not None:
+                res._stoy_mat = stoyMat
+
+        unfinished = [scenid for scenid in self.scenarios 
+                      if scenid not in results]
+
+        return ScanResults(
+            {scenid: results[scenid] for scenid in self.scenarios 
+             if scenid in results},
+            unfinished,
+            solved
+        )
+
+
+    async def solve_async(self, *args, pool=None, **kwargs):
+        '''
+        Asynchronous version of solve, see FBAOptimizer.solve_async.
+        '''
+
+        if pool is None:
+            pool = get_default_pool()
+
+        return await pool.run(self.solve, *args, **kwargs)
+
+
+class KnockoutScanOptimizer(ScanOptimizer):
+    '''
+    Knockout scan solves reference optima without knockouts first, and 
+    knockouts whose reactions carry no net flux in any of them are skipped 
+    with the reference results copied, since knocking out reactions can not 
+    improve the objective, and the reference optimum stays feasible. 
+    Alternative optima are found by minimizing fluxes of reactions in 
+    knockouts not skipped yet with the objective kept within REF_SLACK of its 
+    optimum, so objectives of results copied from them are exact within 
+    REF_SLACK.
+    '''
+
+    def __init__(self, model, kind, scenarios, common_args, knockouts, 
+                 n_references):
+        '''
+        Parameters
+        ----------
+        model: Model
+            The model that calls KnockoutScanOptimizer.
+        kind: {'fba', 'tfba', 'efba', 'etfba'}
+            Type of optimization.
+        scenarios: dict
+            Mapping of knockout IDs to dicts of arguments of optimize with 
+            fluxes of knocked out reactions preset to 0.
+        common_args: dict
+            Arguments of optimize shared by all knockouts.
+        knockouts: dict
+            Mapping of knockout IDs to lists of reaction IDs knocked out.
+        n_references: int
+            Maximum number of reference optima.
+        '''
+
+        super().__init__(model, kind, scenarios, common_args)
+
+        self.knockouts = knockouts
+        self.n_references = n_references
+
+
+    def _solve_reference(self, solver, threads, rxnids):
+        '''
+        Solve the problem without knockouts and return the results, or None 
+        if failed.
+
+        Parameters
+        ----------
+        solver: {"glpk", "gurobi", "highs"}
+            Solver name.
+        threads: int
+            Number of solver threads.
+        rxnids: set
+            Reactions whose fluxes are minimized at the optimum to find an 
+            alternative optimum. If None, the reference optimum.
+        '''
+
+        try:
+            optimizer = self.model.optimize(self.kind, **self.common_args)
+            if rxnids is not None:
+                optimizer.parsimonious = True
+                # the objective fixed exactly at its optimum can be 
+                # numerically infeasible, especially with binaries
+                optimizer.slack = REF_SLACK
+                optimizer.parsimonious_fluxids = {
+                    fluxid for rxnid in rxnids 
+                    for fluxid in (rxnid, rxnid+'_f', rxnid+'_b')
+                }
+                # alternative optima are not identified by arguments
+                optimizer.cache = None
+            optimizer.threads = threads
+            res = optimizer.solve(solver)
+        except Exception as e:
+            logging.warning(f'reference optimization failed: {e}')
+            return None
+
+        if not res.optimization_successful:
+            logging.warning('reference optimization failed')
+            return None
+
+        return res
+
+
+    def _get_skipped(self, solver, threads):
+        '''
+        Return the mapping of knockout IDs to reference results for knockouts 
+        which carry no flux in reference optima.
+        '''
+
+        # alternative optima are not parsimonious
+        if self.common_args.get('parsimonious'):
+            nReferences = min(self.n_references, 1)
+        else:
+            nReferences = self.n_references
+
+        # knockouts are skipped only if their presets are fluxes of the 
+        # reference problem, i.e., applied by their own solves
+        fluxIndex = self.model.get_flux_structure(
+            self.common_args.get('irr_reactions')
+        )[0]
+
+        skipped = {}
+        koidsLeft = [
+            koid for koid in self.knockouts 
+            if all(fluxid in fluxIndex 
+                   for fluxid in self.scenarios[koid]['preset_flux'])
+        ]
+        for i in range(nReferences):
+            if i == 0:
+                rxnids = None
+            else:
+                rxnids = {rxnid for koid in koidsLeft 
+                          for rxnid in self.knockouts[koid]}
+            res = self._solve_reference(solver, threads, rxnids)
+            if res is None:
+                break
+
+            fluxes = res.opt_fluxes
+            for koid in koidsLeft:
+                if all(abs(fluxes[rxnid]) <= FLUX_TOL 
+                       for rxnid in self.knockouts[koid]):
+                    skipped[koid] = res
+            koidsLeft = [koid for koid in koidsLeft if koid not in skipped]
+            if not koidsLeft:
+                break
+
+        logging.info(
+            f'{len(skipped)} of {len(self.knockouts)} knockouts skipped by '
+            f'reference optima'
+        )
+
+        return skipped
+
+
+    def solve(
+            self, 
+            solver='glpk', 
+            n_jobs=1, 
+            threads=None, 
+            checkpoint=None, 
+            resume=None, 
+            time_budget=None, 
+            executor=None
+    ):
+        '''
+        Parameters are the same as ScanOptimizer.solve. Reference optima are 
+        solved first in the calling process.
+        '''
+
+        self.skipped = self._get_skipped(solver, threads)
+
+        return super().solve(
+            solver, n_jobs, threads, checkpoint, resume, time_budget, executor
+        )
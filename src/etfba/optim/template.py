@@ -0,0 +1,158 @@
+'''Define the problem template for repeated optimizations with different bounds.'''
+
+
+import numpy as np
+from .metrics import profiled
+
+
+OVERRIDE_ARGS = ('preset_flux', 'spec_flux_bound', 'preset_conc',
+                 'spec_conc_bound')
+
+
+@profiled
+def _solve_compiled(optimizer, solver, sensitivity):
+    return optimizer._solve_problem(solver, sensitivity)
+
+
+class ProblemTemplate():
+    '''
+    Optimization problem built once and solved repeatedly with bounds of fluxes
+    and concentrations overridden, so that the Pyomo model is not rebuilt for
+    each query. Big-M constraints involving changed flux bounds are updated
+    accordingly, and thermodynamic or enzyme cost cuts generated lazily are
+    kept across solves. With kinetic enzyme costs, concentration bounds should
+    not be widened beyond the compiled ones, which the minimum saturation of
+    enzymes is based on.
+
+    Attributes
+    ----------
+    optimizer: optimizer
+        Optimizer holding the built problem.
+    '''
+
+    def __init__(self, optimizer):
+        '''
+        Parameters
+        ----------
+        optimizer: FBAOptimizer, TFBAOptimizer, EFBAOptimizer or ETFBAOptimizer
+            Optimizer returned by Model.optimize.
+        '''
+
+        if optimizer.presolve:
+            raise ValueError(
+                "presolve can't be used in templates, bounds tightened by "
+                "presolve are only valid for the compiled bounds"
+            )
+
+        self.optimizer = optimizer
+        self.optimizer._build_problem()
+
+        pyoModel = self.optimizer.pyoModel
+        self._baseFluxBounds = {fluxid: pyoModel.fluxes[fluxid].bounds
+                                for fluxid in pyoModel.varFluxIDs}
+        if hasattr(pyoModel, 'lnconcs'):
+            self._baseLnconcBounds = {metabid: pyoModel.lnconcs[metabid].bounds
+                                      for metabid in pyoModel.varMetabIDs}
+        else:
+            self._baseLnconcBounds = {}
+
+        self._changedFluxIDs = set()
+        self._changedMetabIDs = set()
+
+
+    def _get_override_bounds(self, overrides):
+        '''
+        Return new bounds of fluxes and log concentrations given by overrides.
+        '''
+
+        unknownArgs = set(overrides) - set(OVERRIDE_ARGS)
+        if unknownArgs:
+            raise ValueError(
+                f'{", ".join(sorted(unknownArgs))} cannot be overridden, only '
+                f'{", ".join(OVERRIDE_ARGS)} can'
+            )
+
+        fluxBounds = {}
+        for fluxid, bounds in (overrides.get('spec_flux_bound') or {}).items():
+            fluxBounds[fluxid] = tuple(bounds)
+        for fluxid, flux in (overrides.get('preset_flux') or {}).items():
+            fluxBounds[fluxid] = (flux, flux)
+
+        lnconcBounds = {}
+        for metabid, bounds in (overrides.get('spec_conc_bound') or {}).items():
+            lnconcBounds[metabid] = tuple(np.log(bounds))
+        for metabid, conc in (overrides.get('preset_conc') or {}).items():
+            lnconcBounds[metabid] = (np.log(conc),)*2
+
+        unknownFluxIDs = set(fluxBounds) - set(self._baseFluxBounds)
+        if unknownFluxIDs:
+            raise ValueError(
+                f'unknown fluxes {", ".join(sorted(unknownFluxIDs))}, note "_f" '
+                'and "_b" should be added as suffix for reversible reactions'
+            )
+        unknownMetabIDs = set(lnconcBounds) - set(self._baseLnconcBounds)
+        if unknownMetabIDs:
+            raise ValueError(
+                f'concentrations of {", ".join(sorted(unknownMetabIDs))} are not '
+                'variables of the problem'
+            )
+
+        return fluxBounds, lnconcBounds
+
+
+    def _set_bounds(self, flux_bounds, lnconc_bounds):
+        pyoModel = self.optimizer.pyoModel
+
+        fluxids = self._changedFluxIDs | set(flux_bounds)
+        for fluxid in fluxids:
+            lb, ub = flux_bounds.get(fluxid, self._baseFluxBounds[fluxid])
+            pyoModel.fluxes[fluxid].setlb(lb)
+            pyoModel.fluxes[fluxid].setub(ub)
+        self.optimizer._update_bound_constraints(fluxids)
+
+        for metabid in self._changedMetabIDs | set(lnconc_bounds):
+            lb, ub = lnconc_bounds.get(metabid, self._baseLnconcBounds[metabid])
+            pyoModel.lnconcs[metabid].setlb(lb)
+            pyoModel.lnconcs[metabid].setub(ub)
+
+        self._changedFluxIDs = set(flux_bounds)
+        self._changedMetabIDs = set(lnconc_bounds)
+
+
+    def _restore_problem(self):
+        '''
+        Remove components added by the last solve, i.e., the objective
+        constraint of parsimonious optimization and sensitivity suffixes.
+        '''
+
+        pyoModel = self.optimizer.pyoModel
+        if hasattr(pyoModel, 'OBJcstr'):
+            pyoModel.del_component(pyoModel.OBJcstr)
+            self.optimizer._remove_objective()
+            self.optimizer._build_objective()
+        if hasattr(pyoModel, 'dual'):
+            self.optimizer._remove_sensitivity_suffixes()
+
+
+    def solve(self, overrides=None, solver='glpk', sensitivity=False):
+        '''
+        Parameters
+        ----------
+        overrides: dict
+            Mapping of argument names of optimize ("preset_flux",
+            "spec_flux_bound", "preset_conc" and "spec_conc_bound") to dicts
+            which update those the template was compiled with. Bounds not
+            overridden are restored to those of the template.
+        solver: {"glpk", "gurobi", "highs"}
+            "gurobi" is highly recommended for large models.
+        sensitivity: bool
+            Whether to report shadow prices and reduced costs at the optimum.
+        '''
+
+        fluxBounds, lnconcBounds = self._get_override_bounds(overrides or {})
+        self._set_bounds(fluxBounds, lnconcBounds)
+
+        try:
+            return _solve_compiled(self.optimizer, solver, sensitivity)
+        finally:
+            self._restore_problem()
@@ -2,12 +2,19 @@
 
 
 import re
-import platform
+import time
+import logging
 import numpy as np
-from multiprocess import Pool
 from pyomo.environ import Objective, maximize, minimize, Constraint
-from .optim import FBAOptimizer, TFBAOptimizer, EFBAOptimizer
+from pyomo.opt import TerminationCondition
+from .optim import (FBAOptimizer, TFBAOptimizer, EFBAOptimizer, 
+                    RELAXED_SOLVER_OPTIONS)
 from ..io.results import FVAResults, TVAResults, EVAResults
+from ..io.cache import cached, make_key
+from .metrics import Metrics, profiled
+from ..io.checkpoint import Checkpoint
+from .parallel import set_cpu_affinity
+from .executor import get_executor
 
 
 class FVAOptimizer(FBAOptimizer):
@@ -78,11 +85,13 @@ class FVAOptimizer(FBAOptimizer):
 
         self.obj_value = obj_value
         self.gamma = gamma
+        self.checkpoint = None
+        self.deadline = None
 
 
     def _build_objective(self, rxnid, direction):
         def obj_rule(model):
-            if self.model.reactions[rxnid].rev:
+            if self._is_reversible(rxnid):
                 return model.fluxes[rxnid+'_f'] - model.fluxes[rxnid+'_b']
             else:
                 return model.fluxes[rxnid]
@@ -107,65 +116,353 @@ class FVAOptimizer(FBAOptimizer):
         self.pyoModel.OBJcstr = Constraint(rule=obj_cstr_rule)
 
 
-    def _individual_solve(self, solver, rxnids):
-        if platform.system() == 'Linux':
-            import os
-            os.sched_setaffinity(os.getpid(), range(os.cpu_count()))
-        
+    def _build_problem(self):
         self._build_flux_variables()
         self._build_mass_balance_contraints()
         self._build_objective_constraint()
 
-        flux_range = {}
-        for rxnid in rxnids:
-            self._build_objective(rxnid, maximize)
-            solver.solve(self.pyoModel, report_timing=False)
-            flux_max = self._get_opt_obj()
-            self._remove_objective()
 
-            self._build_objective(rxnid, minimize)
-            solver.solve(self.pyoModel, report_timing=False)
-            flux_min = self._get_opt_obj()
-            self._remove_objective()
+    def _get_time_left(self):
+        '''
+        Return the time limit of the next solver call, which is the smaller one of 
+        time_limit and the time left before the deadline, or None if unlimited.
+        '''
 
-            flux_range[rxnid] = [flux_min, flux_max]
+        limits = []
+        if self.time_limit is not None:
+            limits.append(self.time_limit)
+        if self.deadline is not None:
+            limits.append(self.deadline - time.time())
+        
+        return min(limits) if limits else None
 
-        return flux_range
-    
 
-    def solve(self, solver='glpk', n_jobs=1):
+    def _get_solvers(self, solver, fallback_solver):
         '''
+        Return the list of (solver name, solver) tried in turn for each bound: 
+        the solver, the solver with relaxed tolerances (if supported) and the 
+        fallback solver.
+
         Parameters
         ----------
-        solver: {"glpk", "gurobi"}
-            "gurobi" is highly recommended for large models.
-        n_jobs: int
-            Number of jobs to run in parallel.
+        solver: {"glpk", "gurobi", "highs"}
+            Solver name.
+        fallback_solver: {"glpk", "gurobi", "highs"} or None
+            Name of the solver tried last.
         '''
 
-        sol = self._get_solver(solver)
+        solvers = [(solver, self._get_solver(solver))]
+        if RELAXED_SOLVER_OPTIONS[solver]:
+            relaxedSol = self._get_solver(solver)
+            relaxedSol.options.update(RELAXED_SOLVER_OPTIONS[solver])
+            solvers.append((solver, relaxedSol))
+        if fallback_solver is not None and fallback_solver != solver:
+            solvers.append((fallback_solver, self._get_solver(fallback_solver)))
+        self.solverName = solver
 
-        pool = Pool(processes=n_jobs)
+        return solvers
+
+
+    def _solve_objective(self, solver_name, solver, direction):
+        '''
+        Solve the problem with the current objective and return its status 
+        record with keys:
+        "status": "optimal", "time_limit", "infeasible", "unbounded" or "error";
+        "value": value reported in the range, i.e., the optimal objective, the 
+        best bound found if the time limit was reached (infinite if unknown), 
+        or nan if failed;
+        "bound": best bound reported by the solver, None if unknown;
+        "gap": relative gap between the best solution and the best bound, None 
+        if unknown;
+        "solver": name of the solver.
+
+        Parameters
+        ----------
+        solver_name: {"glpk", "gurobi", "highs"}
+            Solver name.
+        solver: solver
+            Solver.
+        direction: maximize or minimize
+            Direction of optimization.
+        '''
 
-        rxnid_chunks = np.array_split(self.rxnIDs, n_jobs)   
+        self._set_time_limit(solver, self._get_time_left(), solver_name)
+        try:
+            self.res = self._run_solver(solver)
+        except Exception as e:
+            logging.debug(f'solver {solver_name} failed: {e}')
+            return {'status': 'error', 'value': np.nan, 'bound': None, 
+                    'gap': None, 'solver': solver_name}
+
+        lb = self.res.problem.lower_bound
+        ub = self.res.problem.upper_bound
+        if direction == maximize:
+            bound, incumbent = ub, lb
+        else:
+            bound, incumbent = lb, ub
+        if bound is None or not np.isfinite(bound):
+            bound = None
+        if incumbent is None or not np.isfinite(incumbent):
+            incumbent = None
+
+        condition = self.res.solver.termination_condition
+        if condition in [TerminationCondition.optimal, 
+                         TerminationCondition.locallyOptimal, 
+                         TerminationCondition.globallyOptimal]:
+            status = 'optimal'
+            value = self._get_opt_obj()
+            incumbent = value
+        elif condition == TerminationCondition.maxTimeLimit:
+            status = 'time_limit'
+            if bound is not None:
+                value = bound
+            else:
+                value = np.inf if direction == maximize else -np.inf
+        elif condition in [TerminationCondition.infeasible, 
+                           TerminationCondition.infeasibleOrUnbounded]:
+            status = 'infeasible'
+            value = np.nan
+        elif condition == TerminationCondition.unbounded:
+            status = 'unbounded'
+            value = np.inf if direction == maximize else -np.inf
+        else:
+            status = 'error'
+            value = np.nan
+
+        if bound is not None and incumbent is not None:
+            gap = abs(bound - incumbent)/max(abs(incumbent), 1e-10)
+        else:
+            gap = None
         
-        async_res = []
-        for rxnid_chunk in rxnid_chunks:
-            res = pool.apply_async(
-                func = self._individual_solve,
-                args = (sol, rxnid_chunk)
+        return {'status': status, 'value': value, 'bound': bound, 'gap': gap, 
+                'solver': solver_name}
+
+
+    def _solve_bound(self, solvers, itemid, direction):
+        '''
+        Return the status record of the bound of the item in the direction 
+        (see _solve_objective), with the number of attempts under the key 
+        "attempts". Solvers are tried in turn until the bound is solved to 
+        optimality or the time limit is reached.
+
+        Parameters
+        ----------
+        solvers: list
+            List of (solver name, solver) returned by _get_solvers.
+        itemid: str
+            Item ID.
+        direction: maximize or minimize
+            Direction of optimization.
+        '''
+
+        self._build_objective(itemid, direction)
+        for attempt, (solverName, sol) in enumerate(solvers, start=1):
+            record = self._solve_objective(solverName, sol, direction)
+            record['attempts'] = attempt
+            if record['status'] in ['optimal', 'time_limit', 'unbounded']:
+                break
+            if attempt < len(solvers):
+                logging.debug(
+                    f'{record["status"]} for bound of {itemid}, retrying'
+                )
+        self._remove_objective()
+
+        return record
+
+
+    def _individual_solve(self, solvers, itemids, deadline=None, cores=None, 
+                          threads=None):
+        '''
+        Parameters
+        ----------
+        solvers: list
+            List of (solver name, solver) returned by _get_solvers.
+        itemids: list
+            IDs of reactions (or fluxes) whose objective is minimized and 
+            maximized.
+        deadline: float
+            Time (since the epoch) after which no more items are solved.
+        cores: list
+            IDs of CPU cores the worker is bound to. If None, the affinity
+            of the worker is kept.
+        threads: int
+            Number of solver threads.
+        '''
+        
+        # cores of the worker are kept unless assigned by the executor
+        if cores is not None:
+            set_cpu_affinity(cores)
+        for solverName, sol in solvers:
+            self._set_threads(sol, threads, solverName)
+        
+        self.deadline = deadline
+        self.metrics = Metrics()
+        with self.metrics.timer('build'):
+            self._build_problem()
+
+        ranges = {}
+        statuses = {}
+        for itemid in itemids:
+            if self.deadline is not None and time.time() >= self.deadline:
+                break
+
+            statuses[itemid] = {
+                'max': self._solve_bound(solvers, itemid, maximize),
+                'min': self._solve_bound(solvers, itemid, minimize)
+            }
+            ranges[itemid] = [statuses[itemid]['min']['value'], 
+                              statuses[itemid]['max']['value']]
+            if self.checkpoint is not None:
+                self.checkpoint.write(itemid, (ranges[itemid], statuses[itemid]))
+
+        return ranges, statuses, self.metrics.to_dict()
+    
+
+    def _solve_items(
+            self, 
+            solver, 
+            itemids, 
+            n_jobs, 
+            threads, 
+            checkpoint, 
+            resume, 
+            time_budget,
+            fallback_solver,
+            executor
+    ):
+        '''
+        Estimate ranges of items in parallel. Items completed in the resumed 
+        checkpoint are skipped, and newly completed items are recorded in the 
+        checkpoint as soon as they are solved. Return ranges, status records 
+        of bounds and IDs of items left unsolved when the time budget ran out.
+
+        Parameters
+        ----------
+        solver: {"glpk", "gurobi", "highs"}
+            Solver name.
+        itemids: list
+            Item IDs.
+        n_jobs: int or "auto"
+            Number of jobs to run in parallel.
+        threads: int
+            Number of solver threads per job.
+        checkpoint: str
+            File where completed items are recorded.
+        resume: str
+            Checkpoint file of a previous run whose completed items are skipped.
+        time_budget: float
+            Time in seconds allowed for the whole analysis.
+        fallback_solver: {"glpk", "gurobi", "highs"} or None
+            Solver tried last for failed bounds.
+        executor: Executor or concurrent.futures.Executor
+            Executor running chunks of items. If None, n_jobs local processes.
+        '''
+        
+        deadline = None if time_budget is None else time.time() + time_budget
+
+        # the time limit is left out so that a timed out run can be resumed 
+        # with a larger one
+        key = make_key(
+            self.model.fingerprint(), 
+            self.__class__.__name__, 
+            {name: arg for name, arg in self.optimArgs.items() 
+             if name != 'time_limit'}, 
+            self.obj_value, 
+            self.gamma
+        )
+        self.checkpoint, records = Checkpoint.open(key, checkpoint, resume)
+        
+        # only items with both bounds solved to optimality are skipped
+        ranges = {}
+        statuses = {}
+        for itemid, (itemRange, itemStatus) in records.items():
+            if all(record['status'] == 'optimal' 
+                   for record in itemStatus.values()):
+                ranges[itemid] = itemRange
+                statuses[itemid] = itemStatus
+        
+        itemids_left = [itemid for itemid in itemids if itemid not in ranges]
+        if itemids_left:
+            solvers = self._get_solvers(solver, fallback_solver)
+
+            executor = get_executor(executor, n_jobs)
+            nChunks, coreSets, threads = executor.partition(
+                len(itemids_left), self._get_problem_size(), threads
+            )
+            itemid_chunks = np.array_split(itemids_left, nChunks)
+            
+            metrics = self.metrics
+            chunkResults = executor.run(
+                self._individual_solve, 
+                [(solvers, itemid_chunk.tolist(), deadline, cores, threads) 
+                 for itemid_chunk, cores in zip(itemid_chunks, coreSets)]
             )
-            async_res.append(res)
+            self.metrics = metrics
+            for chunkRanges, chunkStatuses, chunkMetrics in chunkResults:
+                ranges.update(chunkRanges)
+                statuses.update(chunkStatuses)
+                self.metrics.merge(chunkMetrics)
+
+        unfinished = [itemid for itemid in itemids if itemid not in ranges]
+
+        return (
+            {itemid: ranges[itemid] for itemid in itemids if itemid in ranges},
+            {itemid: statuses[itemid] for itemid in itemids 
+             if itemid in statuses},
+            unfinished
+        )
+    
 
-        pool.close()
-        pool.join()
+    @profiled
+    @cached
+    def solve(
+            self, 
+            solver='glpk', 
+            n_jobs=1, 
+            threads=None, 
+            checkpoint=None, 
+            resume=None, 
+            time_budget=None, 
+            fallback_solver=None, 
+            executor=None
+    ):
+        '''
+        Parameters
+        ----------
+        solver: {"glpk", "gurobi", "highs"}
+            "gurobi" is highly recommended for large models.
+        n_jobs: int or "auto"
+            Number of jobs to run in parallel. Available CPU cores are divided 
+            among jobs, each bound to its own cores. If "auto", the number of 
+            jobs and solver threads per job are chosen by the problem size.
+        threads: int
+            Number of solver threads per job (not effective with "glpk"). 
+            If None, the cores of each job.
+        checkpoint: str
+            File where flux ranges are recorded as soon as they are estimated.
+        resume: str
+            Checkpoint file of an interrupted run. Reactions recorded in it are 
+            skipped, and new ranges are appended to it unless checkpoint is 
+            given.
+        time_budget: float
+            Time in seconds allowed for the whole analysis. Items left 
+            unsolved when it runs out are reported as unfinished.
+        fallback_solver: {"glpk", "gurobi", "highs"}
+            Solver tried for bounds which are still infeasible or failed after 
+            a retry with relaxed tolerances.
+        executor: Executor or concurrent.futures.Executor
+            Executor running chunks of items in parallel, e.g., QueueExecutor 
+            whose workers span multiple nodes. If given, n_jobs is ignored.
+        '''
 
-        async_res = [res.get() for res in async_res]
-        flux_ranges = {rxnid: flux_range 
-                       for res in async_res 
-                       for rxnid, flux_range in res.items()}
+        flux_ranges, statuses, unfinished = self._solve_items(
+            solver, self.rxnIDs, n_jobs, threads, checkpoint, resume, 
+            time_budget, fallback_solver, executor
+        )
         
-        return FVAResults(self.obj_value, self.gamma, flux_ranges)
+        return FVAResults(
+            self.obj_value, self.gamma, flux_ranges, statuses, unfinished
+        )
     
 
 class TFVAOptimizer(FVAOptimizer, TFBAOptimizer):
@@ -197,7 +494,8 @@ class TFVAOptimizer(FVAOptimizer, TFBAOptimizer):
             ex_conc, 
             ex_mass_bal_cons, 
             ex_thermo_cons, 
-            dgpm_conf_level, 
+            dgpm_conf_level,
+            dgpm_error_basis=None,
             **kwargs
     ):
         '''
@@ -239,6 +537,9 @@ class TFVAOptimizer(FVAOptimizer, TFBAOptimizer):
         dgpm_conf_level : float
             Confidence level considered if uncertainty of standard reaction Gibbs 
             energy is taken into account.
+        dgpm_error_basis : dict or DataFrame
+            Mapping of reaction IDs to rows of a low-rank square root of the 
+            covariance matrix of standard reaction Gibbs energies.
         '''
 
         super().__init__(
@@ -259,40 +560,23 @@ class TFVAOptimizer(FVAOptimizer, TFBAOptimizer):
             ex_mass_bal_cons=ex_mass_bal_cons, 
             ex_thermo_cons=ex_thermo_cons, 
             dgpm_conf_level=dgpm_conf_level,
+            dgpm_error_basis=dgpm_error_basis,
             **kwargs
         )
 
 
-    def _individual_solve(self, solver, rxnids):
-        if platform.system() == 'Linux':
-            import os
-            os.sched_setaffinity(os.getpid(), range(os.cpu_count()))
-        
+    def _build_problem(self):
         self._build_flux_variables()
         self._build_conc_variables()
         self._build_binary_variables()
         self._build_mass_balance_contraints()
         self._build_flux_bound_constraints()
         self._build_ratio_constraint()
+        if self.conf_level is not None:
+            self._build_error_variables()
         self._build_thermodynamics_constraints()
         self._build_objective_constraint()
 
-        flux_range = {}
-        for rxnid in rxnids:
-            self._build_objective(rxnid, maximize)
-            solver.solve(self.pyoModel, report_timing=False)
-            flux_max = self._get_opt_obj()
-            self._remove_objective()
-
-            self._build_objective(rxnid, minimize)
-            solver.solve(self.pyoModel, report_timing=False)
-            flux_min = self._get_opt_obj()
-            self._remove_objective()
-
-            flux_range[rxnid] = [flux_min, flux_max]
-
-        return flux_range
-
 
 class EFVAOptimizer(FVAOptimizer, EFBAOptimizer):
     '''
@@ -370,32 +654,12 @@ class EFVAOptimizer(FVAOptimizer, EFBAOptimizer):
         )
 
 
-    def _individual_solve(self, solver, rxnids):
-        if platform.system() == 'Linux':
-            import os
-            os.sched_setaffinity(os.getpid(), range(os.cpu_count()))
-        
+    def _build_problem(self):
         self._build_flux_variables()
         self._build_mass_balance_contraints()
         self._build_objective_constraint()
         self._build_enzyme_cost_constraint()
 
-        flux_range = {}
-        for rxnid in rxnids:
-            self._build_objective(rxnid, maximize)
-            solver.solve(self.pyoModel, report_timing=False)
-            flux_max = self._get_opt_obj()
-            self._remove_objective()
-
-            self._build_objective(rxnid, minimize)
-            solver.solve(self.pyoModel, report_timing=False)
-            flux_min = self._get_opt_obj()
-            self._remove_objective()
-
-            flux_range[rxnid] = [flux_min, flux_max]
-
-        return flux_range
-
 
 class ETFVAOptimizer(TFVAOptimizer, EFVAOptimizer):
     '''
@@ -430,6 +694,7 @@ class ETFVAOptimizer(TFVAOptimizer, EFVAOptimizer):
             inc_enz_cons, 
             enz_prot_lb, 
             dgpm_conf_level,
+            dgpm_error_basis=None,
     ):
         '''
         Parameters
@@ -474,6 +739,9 @@ class ETFVAOptimizer(TFVAOptimizer, EFVAOptimizer):
         dgpm_conf_level : float
             Confidence level considered if uncertainty of standard reaction Gibbs 
             energy is taken into account.
+        dgpm_error_basis : dict or DataFrame
+            Mapping of reaction IDs to rows of a low-rank square root of the 
+            covariance matrix of standard reaction Gibbs energies.
         '''
 
         super().__init__(
@@ -496,40 +764,23 @@ class ETFVAOptimizer(TFVAOptimizer, EFVAOptimizer):
             inc_enz_cons=inc_enz_cons,
             enz_prot_lb=enz_prot_lb, 
             dgpm_conf_level=dgpm_conf_level,
+            dgpm_error_basis=dgpm_error_basis,
         )
 
 
-    def _individual_solve(self, solver, rxnids):
-        if platform.system() == 'Linux':
-            import os
-            os.sched_setaffinity(os.getpid(), range(os.cpu_count()))
-        
+    def _build_problem(self):
         self._build_flux_variables()
         self._build_conc_variables()
         self._build_binary_variables()
         self._build_mass_balance_contraints()
         self._build_flux_bound_constraints()
         self._build_ratio_constraint()
+        if self.conf_level is not None:
+            self._build_error_variables()
         self._build_thermodynamics_constraints()
         self._build_enzyme_cost_constraint()
         self._build_objective_constraint()
 
-        flux_range = {}
-        for rxnid in rxnids:
-            self._build_objective(rxnid, maximize)
-            solver.solve(self.pyoModel, report_timing=False)
-            flux_max = self._get_opt_obj()
-            self._remove_objective()
-
-            self._build_objective(rxnid, minimize)
-            solver.solve(self.pyoModel, report_timing=False)
-            flux_min = self._get_opt_obj()
-            self._remove_objective()
-
-            flux_range[rxnid] = [flux_min, flux_max]
-
-        return flux_range    
-
 
 class TVAOptimizer(TFVAOptimizer):
     '''
@@ -559,7 +810,8 @@ class TVAOptimizer(TFVAOptimizer):
             ex_conc, 
             ex_mass_bal_cons, 
             ex_thermo_cons, 
-            dgpm_conf_level, 
+            dgpm_conf_level,
+            dgpm_error_basis=None,
             **kwargs
     ):
         '''
@@ -601,6 +853,9 @@ class TVAOptimizer(TFVAOptimizer):
         dgpm_conf_level : float
             Confidence level considered if uncertainty of standard reaction Gibbs 
             energy is taken into account.
+        dgpm_error_basis : dict or DataFrame
+            Mapping of reaction IDs to rows of a low-rank square root of the 
+            covariance matrix of standard reaction Gibbs energies.
         '''
 
         super().__init__(
@@ -621,6 +876,7 @@ class TVAOptimizer(TFVAOptimizer):
             ex_mass_bal_cons=ex_mass_bal_cons, 
             ex_thermo_cons=ex_thermo_cons, 
             dgpm_conf_level=dgpm_conf_level,
+            dgpm_error_basis=dgpm_error_basis,
             **kwargs
         )
 
@@ -632,42 +888,65 @@ class TVAOptimizer(TFVAOptimizer):
         self.pyoModel.obj = Objective(rule=obj_rule, sense=direction)
 
 
-    def solve(self, solver='glpk', n_jobs=1):
+    @profiled
+    @cached
+    def solve(
+            self, 
+            solver='glpk', 
+            n_jobs=1, 
+            threads=None, 
+            checkpoint=None, 
+            resume=None, 
+            time_budget=None, 
+            fallback_solver=None, 
+            executor=None
+    ):
         '''
         Parameters
         ----------
-        solver: {"glpk", "gurobi"}
+        solver: {"glpk", "gurobi", "highs"}
             "gurobi" is highly recommended for large models.
-        n_jobs: int
-            Number of jobs to run in parallel.
+        n_jobs: int or "auto"
+            Number of jobs to run in parallel. Available CPU cores are divided 
+            among jobs, each bound to its own cores. If "auto", the number of 
+            jobs and solver threads per job are chosen by the problem size.
+        threads: int
+            Number of solver threads per job (not effective with "glpk"). 
+            If None, the cores of each job.
+        checkpoint: str
+            File where Gibbs energy ranges are recorded as soon as they are 
+            estimated.
+        resume: str
+            Checkpoint file of an interrupted run. Reactions recorded in it are 
+            skipped, and new ranges are appended to it unless checkpoint is 
+            given.
+        time_budget: float
+            Time in seconds allowed for the whole analysis. Items left 
+            unsolved when it runs out are reported as unfinished.
+        fallback_solver: {"glpk", "gurobi", "highs"}
+            Solver tried for bounds which are still infeasible or failed after 
+            a retry with relaxed tolerances.
+        executor: Executor or concurrent.futures.Executor
+            Executor running chunks of items in parallel, e.g., QueueExecutor 
+            whose workers span multiple nodes. If given, n_jobs is ignored.
         '''
 
-        sol = self._get_solver(solver)
-
-        pool = Pool(processes=n_jobs)
-
         fluxids_filtered = list(
             filter(lambda fluxid: not re.match(r'.+_b$', fluxid), self.cstrFluxIDs)
         )
-        fluxid_chunks = np.array_split(fluxids_filtered, n_jobs)
-        
-        async_res = []
-        for fluxid_chunk in fluxid_chunks:
-            res = pool.apply_async(
-                func=self._individual_solve,
-                args=(sol, fluxid_chunk)
-            )
-            async_res.append(res)
-
-        pool.close()
-        pool.join()    
-
-        async_res = [res.get() for res in async_res]
+        ranges, statuses, unfinished = self._solve_items(
+            solver, fluxids_filtered, n_jobs, threads, checkpoint, resume, 
+            time_budget, fallback_solver, executor
+        )
         dgp_ranges = {re.sub(r'_[fb]$', '', fluxid): dgp_range 
-                      for res in async_res 
-                      for fluxid, dgp_range in res.items()}
+                      for fluxid, dgp_range in ranges.items()}
+        statuses = {re.sub(r'_[fb]$', '', fluxid): itemStatus 
+                    for fluxid, itemStatus in statuses.items()}
+        unfinished = [re.sub(r'_[fb]$', '', fluxid) for fluxid in unfinished]
         
-        return TVAResults(self.obj_value, self.gamma, dgp_ranges)
+        return TVAResults(
+            self.obj_value, self.gamma, dgp_ranges, statuses, unfinished
+        )
 
         
 class ETVAOptimizer(TVAOptimizer, EFBAOptimizer):
@@ -701,7 +980,8 @@ class ETVAOptimizer(TVAOptimizer, EFBAOptimizer):
             ex_thermo_cons,
             inc_enz_cons, 
             enz_prot_lb, 
-            dgpm_conf_level, 
+            dgpm_conf_level,
+            dgpm_error_basis=None,
     ):
         '''
         Parameters
@@ -746,6 +1026,9 @@ class ETVAOptimizer(TVAOptimizer, EFBAOptimizer):
         dgpm_conf_level : float
             Confidence level considered if uncertainty of standard reaction Gibbs 
             energy is taken into account.
+        dgpm_error_basis : dict or DataFrame
+            Mapping of reaction IDs to rows of a low-rank square root of the 
+            covariance matrix of standard reaction Gibbs energies.
         '''
 
         super().__init__(
@@ -768,39 +1051,22 @@ class ETVAOptimizer(TVAOptimizer, EFBAOptimizer):
             inc_enz_cons=inc_enz_cons,
             enz_prot_lb=enz_prot_lb, 
             dgpm_conf_level=dgpm_conf_level,
+            dgpm_error_basis=dgpm_error_basis,
         )
 
 
-    def _individual_solve(self, solver, fluxids):
-        if platform.system() == 'Linux':
-            import os
-            os.sched_setaffinity(os.getpid(), range(os.cpu_count()))
-        
+    def _build_problem(self):
         self._build_flux_variables()
         self._build_conc_variables()
         self._build_binary_variables()
         self._build_mass_balance_contraints()
         self._build_flux_bound_constraints()
         self._build_ratio_constraint()
+        if self.conf_level is not None:
+            self._build_error_variables()
         self._build_thermodynamics_constraints()
         self._build_enzyme_cost_constraint()
         self._build_objective_constraint()
-
-        dgp_range = {}
-        for fluxid in fluxids:
-            self._build_objective(fluxid, maximize)
-            solver.solve(self.pyoModel, report_timing=False)
-            dgp_max = self._get_opt_obj()
-            self._remove_objective()
-
-            self._build_objective(fluxid, minimize)
-            solver.solve(self.pyoModel, report_timing=False)
-            dgp_min = self._get_opt_obj()
-            self._remove_objective()
-
-            dgp_range[fluxid] = [dgp_min, dgp_max]
-
-        return dgp_range
     
 
 class EVAOptimizer(EFVAOptimizer):
@@ -883,39 +1149,57 @@ class EVAOptimizer(EFVAOptimizer):
         self.pyoModel.obj = Objective(rule=obj_rule, sense=direction)
 
 
-    def solve(self, solver='glpk', n_jobs=1):
+    @profiled
+    @cached
+    def solve(
+            self, 
+            solver='glpk', 
+            n_jobs=1, 
+            threads=None, 
+            checkpoint=None, 
+            resume=None, 
+            time_budget=None, 
+            fallback_solver=None, 
+            executor=None
+    ):
         '''
         Parameters
         ----------
-        solver: {"glpk", "gurobi"}
+        solver: {"glpk", "gurobi", "highs"}
             "gurobi" is highly recommended for large models.
-        n_jobs: int
-            Number of jobs to run in parallel.
+        n_jobs: int or "auto"
+            Number of jobs to run in parallel. Available CPU cores are divided 
+            among jobs, each bound to its own cores. If "auto", the number of 
+            jobs and solver threads per job are chosen by the problem size.
+        threads: int
+            Number of solver threads per job (not effective with "glpk"). 
+            If None, the cores of each job.
+        checkpoint: str
+            File where enzyme protein cost ranges are recorded as soon as they 
+            are estimated.
+        resume: str
+            Checkpoint file of an interrupted run. Reactions recorded in it are 
+            skipped, and new ranges are appended to it unless checkpoint is 
+            given.
+        time_budget: float
+            Time in seconds allowed for the whole analysis. Items left 
+            unsolved when it runs out are reported as unfinished.
+        fallback_solver: {"glpk", "gurobi", "highs"}
+            Solver tried for bounds which are still infeasible or failed after 
+            a retry with relaxed tolerances.
+        executor: Executor or concurrent.futures.Executor
+            Executor running chunks of items in parallel, e.g., QueueExecutor 
+            whose workers span multiple nodes. If given, n_jobs is ignored.
         '''
 
-        sol = self._get_solver(solver)
-
-        pool = Pool(processes=n_jobs)
-
-        rxnid_chunks = np.array_split(self.inc_enz_cons, n_jobs)
-        
-        async_res = []
-        for rxnid_chunk in rxnid_chunks:
-            res = pool.apply_async(
-                func = self._individual_solve,
-                args = (sol, rxnid_chunk)
-            )
-            async_res.append(res)
-
-        pool.close()
-        pool.join()
-
-        async_res = [res.get() for res in async_res]
-        epc_ranges = {rxnid: epc_range 
-                      for res in async_res 
-                      for rxnid, epc_range in res.items()}
+        epc_ranges, statuses, unfinished = self._solve_items(
+            solver, self.inc_enz_cons, n_jobs, threads, checkpoint, resume, 
+            time_budget, fallback_solver, executor
+        )
         
-        return EVAResults(self.obj_value, self.gamma, epc_ranges)
+        return EVAResults(
+            self.obj_value, self.gamma, epc_ranges, statuses, unfinished
+        )
 
 
 class TEVAOptimizer(EVAOptimizer, TFBAOptimizer):
@@ -948,7 +1232,8 @@ class TEVAOptimizer(EVAOptimizer, TFBAOptimizer):
             ex_thermo_cons,
             inc_enz_cons, 
             enz_prot_lb, 
-            dgpm_conf_level, 
+            dgpm_conf_level,
+            dgpm_error_basis=None,
     ):
         '''
         Parameters
@@ -993,6 +1278,9 @@ class TEVAOptimizer(EVAOptimizer, TFBAOptimizer):
         dgpm_conf_level : float
             Confidence level if uncertainty of standard reaction Gibbs energy is 
             considered.
+        dgpm_error_basis : dict or DataFrame
+            Mapping of reaction IDs to rows of a low-rank square root of the 
+            covariance matrix of standard reaction Gibbs energies.
         '''
 
         super().__init__(
@@ -1015,37 +1303,18 @@ class TEVAOptimizer(EVAOptimizer, TFBAOptimizer):
             inc_enz_cons=inc_enz_cons,
             enz_prot_lb=enz_prot_lb, 
             dgpm_conf_level=dgpm_conf_level,
+            dgpm_error_basis=dgpm_error_basis,
         )
 
-    def _individual_solve(self, solver, rxnids):
-        if platform.system() == 'Linux':
-            import os
-            os.sched_setaffinity(os.getpid(), range(os.cpu_count()))
-        
+    def _build_problem(self):
         self._build_flux_variables()
         self._build_conc_variables()
         self._build_binary_variables()
         self._build_mass_balance_contraints()
         self._build_flux_bound_constraints()
         self._build_ratio_constraint()
+        if self.conf_level is not None:
+            self._build_error_variables()
         self._build_thermodynamics_constraints()
         self._build_enzyme_cost_constraint()
-        self._build_objective_constraint()
-
-        epc_range = {}
-        for rxnid in rxnids:
-            self._build_objective(rxnid, maximize)
-            solver.solve(self.pyoModel, report_timing=False)
-            epc_max = self._get_opt_obj()
-            self._remove_objective()
-
-            self._build_objective(rxnid, minimize)
-            solver.solve(self.pyoModel, report_timing=False)
-            epc_min = self._get_opt_obj()
-            self._remove_objective()
-
-            epc_range[rxnid] = [epc_min, epc_max]
-
-        return epc_range
-
-                        
\ No newline at end of file
+        self._build_objective_constraint()
\ No newline at end of file
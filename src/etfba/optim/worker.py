@@ -0,0 +1,61 @@
+'''Define the worker of QueueExecutor, started on any node by:
+python -m etfba.optim.worker HOST:PORT
+with the authentication key of the executor in the ETFBA_AUTHKEY environment
+variable (hex encoded).
+'''
+
+
+import os
+import sys
+import time
+import traceback
+from multiprocessing.connection import Client
+from .executor import AUTHKEY_ENV, _call_pickled
+
+
+CONNECT_RETRY_INTERVAL = 1   # Seconds between attempts to connect
+
+
+def run_worker(address, authkey, max_wait=None):
+    '''
+    Run chunks served by a QueueExecutor until it finishes.
+
+    Parameters
+    ----------
+    address: tuple
+        (host, port) of the executor.
+    authkey: bytes
+        Key of the executor.
+    max_wait: float
+        Seconds to keep trying to connect before giving up. If None, forever.
+    '''
+
+    start = time.time()
+    while True:
+        try:
+            conn = Client(address, authkey=authkey)
+            break
+        except (ConnectionRefusedError, OSError):
+            if max_wait is not None and time.time() - start > max_wait:
+                raise
+            time.sleep(CONNECT_RETRY_INTERVAL)
+
+    with conn:
+        while True:
+            try:
+                payload = conn.recv()
+            except EOFError:
+                return
+            if payload is None:
+                return
+
+            try:
+                result = (True, _call_pickled(payload))
+            except Exception:
+                result = (False, traceback.format_exc())
+            conn.send(result)
+
+
+if __name__ == '__main__':
+    host, port = sys.argv[1].rsplit(':', 1)
+    run_worker((host, int(port)), bytes.fromhex(os.environ[AUTHKEY_ENV]))
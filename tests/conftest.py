@@ -0,0 +1,36 @@
+import pytest
+from etfba import generate_model
+
+
+N_REACTIONS = 60   # Number of reactions of the synthetic model
+SEED = 0           # Seed of the synthetic model
+
+
+@pytest.fixture
+def model():
+    return generate_model(N_REACTIONS, seed=SEED)
+
+
+@pytest.fixture
+def settings(model):
+    return {
+        'objective': {rxnid: 1 for rxnid, rxn in model.reactions.items()
+                      if rxn.is_biomass_formation},
+        'spec_flux_bound': {rxnid: (0, 10) for rxnid in model.reactions
+                            if rxnid.startswith('EX_S')},
+        'inc_enz_cons': [rxnid for rxnid, rxn in model.reactions.items()
+                         if rxn.forward_kcat is not None],
+        'enz_prot_lb': 0.1
+    }
+
+
+def get_optimize_args(kind, settings):
+    args = {
+        'objective': settings['objective'],
+        'spec_flux_bound': settings['spec_flux_bound']
+    }
+    if kind in ['efba', 'etfba', 'eva']:
+        args['inc_enz_cons'] = settings['inc_enz_cons']
+        args['enz_prot_lb'] = settings['enz_prot_lb']
+
+    return args
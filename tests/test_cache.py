@@ -0,0 +1,88 @@
+import os
+from conftest import get_optimize_args
+from etfba import ResultCache
+from etfba.optim.optim import FBAOptimizer
+from pyomo.opt import TerminationCondition
+
+
+def _fail(*args, **kwargs):
+    raise AssertionError('problem solved despite cached result')
+
+
+def test_result_reused(model, settings, tmp_path, monkeypatch):
+    cache = ResultCache(str(tmp_path))
+    args = get_optimize_args('fba', settings)
+    res = model.optimize('fba', **args, cache=cache).solve(solver='highs')
+    assert len(cache.keys()) == 1
+
+    monkeypatch.setattr(FBAOptimizer, '_solve_problem', _fail)
+    hit = model.optimize('fba', **args, cache=cache).solve(solver='highs')
+
+    assert len(cache.keys()) == 1
+    assert hit.opt_objective == res.opt_objective
+    assert dict(hit.opt_fluxes) == dict(res.opt_fluxes)
+
+
+def test_key_changes_with_problem(model, settings, tmp_path):
+    cache = ResultCache(str(tmp_path))
+    args = get_optimize_args('fba', settings)
+    model.optimize('fba', **args, cache=cache).solve(solver='highs')
+
+    exchid = next(iter(args['spec_flux_bound']))
+    args['spec_flux_bound'] = {**args['spec_flux_bound'], exchid: (0, 5)}
+    model.optimize('fba', **args, cache=cache).solve(solver='highs')
+    model.optimize('tfba', **args, cache=cache).solve(solver='highs')
+
+    assert len(cache.keys()) == 3
+
+
+def test_corrupted_entry_discarded(model, settings, tmp_path):
+    cache = ResultCache(str(tmp_path))
+    args = get_optimize_args('fba', settings)
+    res = model.optimize('fba', **args, cache=cache).solve(solver='highs')
+
+    key, = cache.keys()
+    with open(os.path.join(str(tmp_path), key+'.bin'), 'r+b') as f:
+        f.seek(-8, os.SEEK_END)
+        f.write(b'\0'*8)
+    
+    assert cache.get(key) is None
+    assert cache.keys() == []
+    
+    res2 = model.optimize('fba', **args, cache=cache).solve(solver='highs')
+    assert res2.opt_objective == res.opt_objective
+    assert len(cache.keys()) == 1
+
+
+def test_failed_result_not_saved(model, settings, tmp_path):
+    cache = ResultCache(str(tmp_path))
+    args = get_optimize_args('fba', settings)
+    biomassID = next(iter(args['objective']))
+    res = model.optimize(
+        'fba', **args, preset_flux={biomassID: 1e4}, cache=cache
+    ).solve(solver='highs')
+
+    assert not res.optimization_successful
+    assert cache.keys() == []
+
+
+def test_result_not_proven_optimal_not_saved(model, settings, tmp_path, 
+                                             monkeypatch):
+    runSolver = FBAOptimizer._run_solver
+
+    def run_solver_stopped(self, *args, **kwargs):
+        # as if stopped by time_limit or mip_gap with a feasible solution
+        res = runSolver(self, *args, **kwargs)
+        res.solver.termination_condition = TerminationCondition.feasible
+        
+        return res
+
+    monkeypatch.setattr(FBAOptimizer, '_run_solver', run_solver_stopped)
+    cache = ResultCache(str(tmp_path))
+    res = model.optimize(
+        'fba', **get_optimize_args('fba', settings), time_limit=60, 
+        cache=cache
+    ).solve(solver='highs')
+
+    assert res.optimization_successful
+    assert cache.keys() == []
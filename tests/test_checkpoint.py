@@ -0,0 +1,87 @@
+import json
+import pytest
+from conftest import get_optimize_args
+
+
+def _interrupt(file):
+    '''
+    Keep about half of the records of the checkpoint file, with the last one 
+    cut in the middle as left by an interrupted write.
+    '''
+
+    with open(file, 'rb') as f:
+        lines = f.read().splitlines(keepends=True)
+    
+    nkept = len(lines)//2
+    with open(file, 'wb') as f:
+        f.write(b''.join(lines[:nkept]) + lines[nkept][:len(lines[nkept])//2])
+
+
+def _count_records(file):
+    with open(file) as f:
+        lines = f.read().splitlines()[1:]
+    
+    count = 0
+    for line in lines:
+        try:
+            json.loads(line)
+            count += 1
+        except ValueError:
+            pass
+
+    return count
+
+
+def test_variability_resumed(model, settings, tmp_path):
+    args = get_optimize_args('fba', settings)
+    objValue = model.optimize('fba', **args).solve(solver='highs').opt_objective
+    optimizer = model.evaluate_variability(
+        'fva', obj_value=objValue, gamma=0.9, **args
+    )
+    file = str(tmp_path/'fva.ckpt')
+    res = optimizer.solve(solver='highs', checkpoint=file)
+    _interrupt(file)
+
+    resumed = model.evaluate_variability(
+        'fva', obj_value=objValue, gamma=0.9, **args
+    ).solve(solver='highs', resume=file)
+
+    assert resumed.is_complete
+    assert resumed.flux_ranges.keys() == res.flux_ranges.keys()
+    for rxnid, (lb, ub) in res.flux_ranges.items():
+        assert resumed.flux_ranges[rxnid] == pytest.approx([lb, ub], abs=1e-6)
+    assert _count_records(file) == len(res.flux_ranges)
+
+
+def test_knockouts_resumed(model, settings, tmp_path):
+    args = get_optimize_args('fba', settings)
+    knockouts = [rxnid for rxnid, rxn in model.reactions.items()
+                 if not rxn.is_exch_reaction 
+                 and not rxn.is_biomass_formation][:10]
+    file = str(tmp_path/'knockouts.ckpt')
+    res = model.evaluate_knockouts(
+        'fba', knockouts, n_references=0, **args
+    ).solve(solver='highs', checkpoint=file)
+    _interrupt(file)
+
+    resumed = model.evaluate_knockouts(
+        'fba', knockouts, n_references=0, **args
+    ).solve(solver='highs', resume=file)
+
+    assert resumed.is_complete
+    assert resumed.opt_objectives == pytest.approx(res.opt_objectives, abs=1e-6)
+    assert _count_records(file) == len(knockouts)
+
+
+def test_checkpoint_of_other_problem_rejected(model, settings, tmp_path):
+    args = get_optimize_args('fba', settings)
+    knockouts = list(model.reactions)[:3]
+    file = str(tmp_path/'knockouts.ckpt')
+    model.evaluate_knockouts(
+        'fba', knockouts, n_references=0, **args
+    ).solve(solver='highs', checkpoint=file)
+
+    with pytest.raises(ValueError):
+        model.evaluate_knockouts(
+            'tfba', knockouts, n_references=0, **args
+        ).solve(solver='highs', resume=file)
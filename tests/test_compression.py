@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+from conftest import get_optimize_args
+
+
+@pytest.mark.parametrize('kind', ['fba', 'efba'])
+def test_expanded_optimum_unchanged(model, settings, kind):
+    args = get_optimize_args(kind, settings)
+    compression = model.compress(
+        spec_flux_bound=args['spec_flux_bound'], 
+        protected_reactions=list(args['objective']), 
+        solver='highs'
+    )
+    assert compression.lumped_reactions
+
+    compArgs = dict(args)
+    if 'inc_enz_cons' in args:
+        compArgs['inc_enz_cons'] = compression.map_reactions(
+            args['inc_enz_cons']
+        )
+    res = model.optimize(kind, **args).solve(solver='highs')
+    compRes = compression.expand_results(
+        compression.model.optimize(kind, **compArgs).solve(solver='highs')
+    )
+
+    assert compRes.opt_objective == pytest.approx(res.opt_objective)
+    assert set(compRes.opt_fluxes) == set(model.reactions)
+
+    stoyMat = model.stoichiometric_matrix
+    fluxes = np.array([compRes.opt_fluxes[rxnid] for rxnid in stoyMat.columns])
+    assert stoyMat.values@fluxes == pytest.approx(0, abs=1e-9)
+
+    if kind == 'efba':
+        assert sum(compRes.opt_enzyme_costs.values()) == pytest.approx(
+            sum(res.opt_enzyme_costs.values())
+        )
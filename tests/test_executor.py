@@ -0,0 +1,62 @@
+import os
+import concurrent.futures
+import pytest
+from conftest import get_optimize_args
+from etfba.optim import variability
+from etfba.optim.executor import Executor, FuturesExecutor, QueueExecutor
+
+
+def _solve_fva(model, settings, **kwargs):
+    args = get_optimize_args('fba', settings)
+    objValue = model.optimize('fba', **args).solve(solver='highs').opt_objective
+
+    return model.evaluate_variability(
+        'fva', obj_value=objValue, gamma=0.9, **args
+    ).solve(solver='highs', **kwargs)
+
+
+def _assert_same_ranges(res, ref):
+    assert res.is_complete
+    assert res.flux_ranges.keys() == ref.flux_ranges.keys()
+    for rxnid, (lb, ub) in ref.flux_ranges.items():
+        assert res.flux_ranges[rxnid] == pytest.approx([lb, ub], abs=1e-6)
+
+
+def test_executor_is_abstract():
+    class IncompleteExecutor(Executor):
+        pass
+
+    with pytest.raises(TypeError):
+        Executor()
+    with pytest.raises(TypeError):
+        IncompleteExecutor()
+
+
+def test_queue_executor_with_local_workers(model, settings):
+    ref = _solve_fva(model, settings)
+    executor = QueueExecutor(n_local_workers=2)
+    res = _solve_fva(model, settings, executor=executor)
+
+    _assert_same_ranges(res, ref)
+    assert executor.address[1] != 0
+
+
+def test_worker_affinity_kept_without_cores(model, settings, monkeypatch):
+    ref = _solve_fva(model, settings)
+    calls = []
+    monkeypatch.setattr(variability, 'set_cpu_affinity', calls.append)
+
+    # chunks run in a thread of this process, so calls are recorded
+    with concurrent.futures.ThreadPoolExecutor(1) as pool:
+        res = _solve_fva(model, settings, executor=FuturesExecutor(pool))
+
+    _assert_same_ranges(res, ref)
+    assert calls == []
+
+
+def test_queue_executor_fails_without_workers():
+    executor = QueueExecutor(n_local_workers=2, worker_timeout=1)
+
+    # each worker exits on its first chunk, so chunks are left unserved
+    with pytest.raises(RuntimeError):
+        executor.run(os._exit, [(1,)]*4)
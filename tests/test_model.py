@@ -0,0 +1,48 @@
+import pytest
+from conftest import get_optimize_args
+
+
+def test_optimize_leaves_model_unchanged(model, settings):
+    fingerprint = model.fingerprint()
+    revs = {rxnid: rxn.rev for rxnid, rxn in model.reactions.items()}
+    
+    revRxnIDs = [rxnid for rxnid, rev in revs.items() if rev]
+    metabid = next(iter(model.metabolites))
+    optimizer = model.optimize(
+        'tfba', 
+        **get_optimize_args('tfba', settings), 
+        irr_reactions=[rxnid for rxnid in model.reactions 
+                       if rxnid not in revRxnIDs[:3]],
+        ex_mass_bal_cons=[metabid], 
+        ex_thermo_cons=revRxnIDs[:1]
+    )
+    res = optimizer.solve(solver='highs')
+
+    assert res.optimization_successful
+    assert metabid not in optimizer.cstrMetabIDs
+    assert revRxnIDs[0] not in optimizer.cstrRxnIDs
+    assert model.fingerprint() == fingerprint
+    assert {rxnid: rxn.rev for rxnid, rxn in model.reactions.items()} == revs
+
+
+def test_problems_built_on_one_model_independent(model, settings):
+    args = get_optimize_args('fba', settings)
+    expected = model.optimize('fba', **args).solve(solver='highs')
+
+    optimizer = model.optimize('fba', **args)
+    model.optimize(
+        'fba', **args, irr_reactions=list(model.reactions)
+    ).solve(solver='highs')
+    res = optimizer.solve(solver='highs')
+
+    assert res.opt_objective == pytest.approx(expected.opt_objective)
+
+
+def test_constraint_flags_deprecated(model):
+    metab = next(iter(model.metabolites.values()))
+    rxn = next(iter(model.reactions.values()))
+
+    with pytest.warns(DeprecationWarning):
+        assert metab.is_constrained_by_mass_balance is False
+    with pytest.warns(DeprecationWarning):
+        assert rxn.is_constrained_by_thermodynamics is False
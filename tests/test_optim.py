@@ -0,0 +1,55 @@
+import logging
+import pytest
+from conftest import get_optimize_args
+from pyomo.opt import TerminationCondition
+from etfba.optim.optim import CUT_TOL, FBAOptimizer
+
+
+def test_kinetic_enzyme_cost_converges(model, settings, caplog):
+    args = get_optimize_args('etfba', settings)
+    res = model.optimize('etfba', **args).solve(solver='highs')
+    with caplog.at_level(logging.WARNING):
+        kinRes = model.optimize(
+            'etfba', **args, kinetic_enz_cost=True
+        ).solve(solver='highs')
+
+    assert kinRes.optimization_successful
+    assert 'enzyme costs may be underestimated' not in caplog.text
+    assert (kinRes.opt_total_enzyme_cost 
+            <= settings['enz_prot_lb']*(1 + CUT_TOL))
+    assert kinRes.opt_objective <= res.opt_objective + 1e-6
+
+
+def test_lazy_thermodynamics_exact(model, settings):
+    args = get_optimize_args('tfba', settings)
+    res = model.optimize('tfba', **args).solve(solver='highs')
+    lazyRes = model.optimize('tfba', **args, lazy_thermo=True).solve(
+        solver='highs'
+    )
+
+    assert lazyRes.optimization_successful
+    assert lazyRes.opt_objective == pytest.approx(res.opt_objective)
+
+
+def test_failed_feasibility_check_not_trusted(model, settings, caplog, 
+                                              monkeypatch):
+    runSolver = FBAOptimizer._run_solver
+
+    def run_solver_failing_checks(self, sol, pyo_model=None):
+        res = runSolver(self, sol, pyo_model)
+        if pyo_model is not None and pyo_model is not self.pyoModel:
+            res.solver.termination_condition = TerminationCondition.error
+        
+        return res
+
+    args = get_optimize_args('tfba', settings)
+    res = model.optimize('tfba', **args).solve(solver='highs')
+    monkeypatch.setattr(FBAOptimizer, '_run_solver', run_solver_failing_checks)
+    with caplog.at_level(logging.WARNING):
+        lazyRes = model.optimize('tfba', **args, lazy_thermo=True).solve(
+            solver='highs'
+        )
+
+    assert 'feasibility check failed' in caplog.text
+    assert lazyRes.optimization_successful
+    assert lazyRes.opt_objective == pytest.approx(res.opt_objective)
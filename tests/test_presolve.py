@@ -0,0 +1,36 @@
+import logging
+import pytest
+from conftest import get_optimize_args
+
+
+@pytest.mark.parametrize('kind', ['fba', 'tfba', 'efba', 'etfba'])
+def test_optimum_unchanged(model, settings, caplog, kind):
+    args = get_optimize_args(kind, settings)
+    res = model.optimize(kind, **args).solve(solver='highs')
+    with caplog.at_level(logging.INFO):
+        preRes = model.optimize(kind, **args, presolve=True).solve(
+            solver='highs'
+        )
+
+    assert 'presolve tightened bounds' in caplog.text
+    assert preRes.optimization_successful
+    assert preRes.opt_objective == pytest.approx(res.opt_objective)
+
+
+def test_presolved_bounds_contain_optimum(model, settings):
+    args = get_optimize_args('efba', settings)
+    res = model.optimize('efba', **args).solve(solver='highs')
+    
+    optimizer = model.optimize('efba', **args)
+    presolvedBounds = {fluxid: bounds for fluxid, bounds 
+                       in optimizer._presolve_flux_bounds().items()
+                       if fluxid in res.opt_fluxes}
+    
+    assert presolvedBounds
+    for fluxid, (lb, ub) in presolvedBounds.items():
+        assert lb - 1e-6 <= res.opt_fluxes[fluxid] <= ub + 1e-6
+
+def test_template_rejected(model, settings):
+    with pytest.raises(ValueError):
+        model.compile('fba', **get_optimize_args('fba', settings), 
+                      presolve=True)
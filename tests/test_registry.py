@@ -0,0 +1,59 @@
+import pickle
+from etfba import generate_model
+from conftest import N_REACTIONS, SEED
+
+
+def _get_metabolite(model, metab):
+    return model.get_metabolite(
+        metab.metabid, metab.name, metab.compartment, 
+        is_h=metab.is_h, is_h2o=metab.is_h2o
+    )
+
+
+def test_metabolites_not_shared_between_models(model):
+    other = generate_model(N_REACTIONS, seed=SEED)
+    fingerprint = model.fingerprint()
+
+    for metabid, metab in model.metabolites.items():
+        assert other.metabolites[metabid] is not metab
+
+    metabid, metab = next((metabid, metab) 
+                          for metabid, metab in other.metabolites.items()
+                          if any(km is not None for km in metab.kms.values()))
+    rxnid = next(rxnid for rxnid, km in metab.kms.items() if km is not None)
+    metab.kms[rxnid] *= 2
+
+    assert model.fingerprint() == fingerprint
+    assert other.fingerprint() != fingerprint
+
+
+def test_metabolite_interned_per_model(model):
+    other = generate_model(N_REACTIONS, seed=SEED)
+    metabid, metab = next(iter(model.metabolites.items()))
+
+    assert _get_metabolite(model, metab) is metab
+    assert _get_metabolite(other, metab) is other.metabolites[metabid]
+    assert model.get_metabolite('new') is model.get_metabolite('new')
+    assert model.get_metabolite('new') is not other.get_metabolite('new')
+
+
+def test_fork_isolated(model):
+    fingerprint = model.fingerprint()
+    forked = model.fork()
+    
+    for metab in forked.metabolites.values():
+        metab.coes = {rxnid: 2*coe for rxnid, coe in metab.coes.items()}
+
+    assert model.fingerprint() == fingerprint
+    assert forked.fingerprint() != fingerprint
+
+
+def test_registry_rebuilt_on_unpickling(model):
+    model.stoichiometric_matrix
+    restored = pickle.loads(pickle.dumps(model))
+
+    assert '_cache' not in restored.__dict__
+    assert restored.fingerprint() == model.fingerprint()
+    for metabid, metab in restored.metabolites.items():
+        assert _get_metabolite(restored, metab) is metab
+        assert metab is not model.metabolites[metabid]
@@ -0,0 +1,110 @@
+import logging
+import pytest
+from conftest import get_optimize_args
+from etfba.optim.scan import KnockoutScanOptimizer, REF_SLACK
+
+
+@pytest.mark.parametrize('kind, n_references', [
+    ('fba', 1), 
+    ('fba', 3), 
+    ('tfba', 1), 
+    ('tfba', 3), 
+    ('efba', 2)
+])
+def test_pruned_knockouts_exact(model, settings, caplog, kind, n_references):
+    args = get_optimize_args(kind, settings)
+    full = model.evaluate_knockouts(
+        kind, n_references=0, **args
+    ).solve(solver='highs')
+    with caplog.at_level(logging.WARNING):
+        pruned = model.evaluate_knockouts(
+            kind, n_references=n_references, **args
+        ).solve(solver='highs')
+
+    assert 'reference optimization failed' not in caplog.text
+    assert pruned.is_complete
+    assert set(pruned.solved) < set(full.solved)
+    assert pruned.opt_objectives == pytest.approx(full.opt_objectives, 
+                                                  rel=REF_SLACK, abs=1e-6)
+
+
+def test_pruned_gene_knockouts_exact(model, settings):
+    args = get_optimize_args('fba', settings)
+    rxnids = [rxnid for rxnid, rxn in model.reactions.items()
+              if not rxn.is_exch_reaction and not rxn.is_biomass_formation]
+    knockouts = {f'g{i}': rxnids[i:i+2] for i in range(0, len(rxnids), 3)}
+    
+    full = model.evaluate_knockouts(
+        'fba', knockouts, n_references=0, **args
+    ).solve(solver='highs')
+    pruned = model.evaluate_knockouts(
+        'fba', knockouts, **args
+    ).solve(solver='highs')
+
+    assert set(full.solved) == set(knockouts)
+    assert set(pruned.solved) <= set(knockouts)
+    assert pruned.opt_objectives == pytest.approx(full.opt_objectives, 
+                                                  abs=1e-6)
+
+
+def test_knockouts_follow_irr_reactions(model, settings):
+    args = get_optimize_args('fba', settings)
+    args['irr_reactions'] = list(model.reactions)
+    knockouts = [rxnid for rxnid, rxn in model.reactions.items() 
+                 if rxn.rev and not rxn.is_exch_reaction]
+    
+    scan = model.evaluate_knockouts(
+        'fba', knockouts, n_references=0, **args
+    ).solve(solver='highs')
+
+    for rxnid in knockouts:
+        res = model.optimize(
+            'fba', **args, preset_flux={rxnid: 0}
+        ).solve(solver='highs')
+        assert scan.opt_objectives[rxnid] == pytest.approx(res.opt_objective, 
+                                                           abs=1e-6)
+    assert any(obj < 1 for obj in scan.opt_objectives.values())
+
+
+def test_unknown_knockout_reaction_rejected(model, settings):
+    with pytest.raises(ValueError):
+        model.evaluate_knockouts(
+            'fba', ['unknown'], **get_optimize_args('fba', settings)
+        )
+
+
+@pytest.mark.parametrize('kind', ['fba', 'tfba'])
+def test_pruned_knockouts_with_irr_reactions_exact(model, settings, kind):
+    args = get_optimize_args(kind, settings)
+    revRxnIDs = [rxnid for rxnid, rxn in model.reactions.items() if rxn.rev]
+    args['irr_reactions'] = [rxnid for rxnid in model.reactions 
+                             if rxnid not in revRxnIDs[::2]]
+    
+    full = model.evaluate_knockouts(
+        kind, n_references=0, **args
+    ).solve(solver='highs')
+    pruned = model.evaluate_knockouts(
+        kind, n_references=2, **args
+    ).solve(solver='highs')
+
+    assert set(pruned.solved) < set(full.solved)
+    assert pruned.opt_objectives == pytest.approx(full.opt_objectives, 
+                                                  rel=REF_SLACK, abs=1e-6)
+
+
+def test_knockouts_not_applied_never_skipped(model, settings):
+    args = get_optimize_args('fba', settings)
+    rxnid = next(rxnid for rxnid, rxn in model.reactions.items() 
+                 if not rxn.rev and not rxn.is_exch_reaction 
+                 and not rxn.is_biomass_formation)
+    
+    scan = KnockoutScanOptimizer(
+        model, 
+        'fba', 
+        {rxnid: {'preset_flux': {rxnid+'_f': 0.0, rxnid+'_b': 0.0}}}, 
+        args, 
+        {rxnid: [rxnid]}, 
+        1
+    )
+
+    assert scan._get_skipped('highs', None) == {}
@@ -0,0 +1,39 @@
+import sys
+import json
+import subprocess
+import numpy as np
+
+
+STARTUP_BUDGET = 0.5   # Median time (in seconds) of "import etfba" allowed
+N_IMPORTS = 3          # Number of fresh interpreters timing the import
+LAZY_MODULES = ['pandas', 'pyomo', 'pyomo.environ', 'scipy', 'scipy.stats', 
+                'multiprocess', 'dill']   # Dependencies imported lazily
+
+PROBE = f'''
+import sys
+import json
+import time
+start = time.perf_counter()
+import etfba
+duration = time.perf_counter() - start
+print(json.dumps({{
+    'time': duration,
+    'loaded': [name for name in {LAZY_MODULES!r} if name in sys.modules]
+}}))
+'''
+
+
+def _probe_import():
+    out = subprocess.run(
+        [sys.executable, '-c', PROBE], capture_output=True, text=True, 
+        check=True
+    ).stdout
+
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def test_import_within_budget():
+    probes = [_probe_import() for _ in range(N_IMPORTS)]
+
+    assert probes[0]['loaded'] == []
+    assert np.median([probe['time'] for probe in probes]) <= STARTUP_BUDGET